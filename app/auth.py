@@ -0,0 +1,258 @@
+"""
+Service-account authentication for the Google Spreadsheet Monitor
+Keeps one OAuth access token per credentials file, shared by every client in
+the process and refreshed in the background well before it expires.
+"""
+import logging
+import threading
+import time
+from datetime import timezone
+
+from app.clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+# Read-only access to spreadsheets, plus Drive for push notification channels
+SCOPES = (
+    'https://www.googleapis.com/auth/spreadsheets.readonly',
+    'https://www.googleapis.com/auth/drive.readonly',
+)
+
+# A token this close to expiry is not handed out any more
+EXPIRY_SKEW = 30
+
+# Longest wait between retries of a failed background refresh
+MAX_RETRY_DELAY = 60
+
+
+def _default_request():
+    """Transport used to refresh tokens"""
+    from google.auth.transport.requests import Request
+    return Request()
+
+
+class TokenProvider:
+    """
+    Access tokens for one set of credentials.
+
+    A background thread refreshes the token refresh_margin seconds before it
+    expires (at the latest half-way through its lifetime), so callers only
+    refresh synchronously when the token could not be renewed in time. Such
+    refreshes, and the time callers spent waiting on them, are counted.
+    """
+
+    def __init__(self, credentials, refresh_margin=300, clock=None, request_factory=None):
+        """
+        Initialize the provider
+
+        Args:
+            credentials: google.auth credentials supporting refresh()
+            refresh_margin (float): Seconds before expiry to refresh in the background
+            clock: Time source (default: the system clock)
+            request_factory (callable): Returns the transport passed to refresh()
+        """
+        self.credentials = credentials
+        self.refresh_margin = refresh_margin
+        self.clock = clock or SYSTEM_CLOCK
+        self.request_factory = request_factory or _default_request
+        self.lock = threading.Lock()  # one refresh at a time
+        self.access_token = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stats = {
+            'refreshes': 0,
+            'background_refreshes': 0,
+            'sync_refreshes': 0,
+            'failures': 0,
+            'last_refresh_seconds': None,
+            'max_refresh_seconds': 0.0,
+            'blocked_calls': 0,
+            'blocked_seconds': 0.0,
+            'last_error': None
+        }
+
+    def _valid(self):
+        return self.access_token is not None and self.clock.time() < self.expires_at - EXPIRY_SKEW
+
+    def token(self):
+        """
+        Return a valid access token, refreshing it only if the background refresh fell behind
+
+        Returns:
+            str: The bearer token
+
+        Raises:
+            google.auth.exceptions.RefreshError: If a needed refresh failed
+        """
+        if self._valid():
+            return self.access_token
+        started = time.perf_counter()
+        with self.lock:
+            try:
+                if not self._valid():
+                    self._refresh(background=False)
+                return self.access_token
+            finally:
+                self.stats['blocked_calls'] += 1
+                self.stats['blocked_seconds'] += time.perf_counter() - started
+
+    def invalidate(self):
+        """Forget the current token, e.g. after the API rejected it"""
+        with self.lock:
+            self.access_token = None
+            self.refresh_at = 0.0
+
+    def refresh_if_due(self):
+        """
+        Refresh the token if it is within its refresh margin (caller: the background thread)
+
+        Returns:
+            bool: True if a refresh was made
+        """
+        if self._valid() and self.clock.time() < self.refresh_at:
+            return False
+        with self.lock:
+            if self._valid() and self.clock.time() < self.refresh_at:
+                return False
+            self._refresh(background=True)
+        return True
+
+    def _refresh(self, background):
+        """Fetch a new token (caller holds the lock)"""
+        started = time.perf_counter()
+        try:
+            self.credentials.refresh(self.request_factory())
+        except Exception as e:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(e)
+            raise
+        duration = time.perf_counter() - started
+
+        now = self.clock.time()
+        expiry = self.credentials.expiry
+        self.expires_at = expiry.replace(tzinfo=timezone.utc).timestamp() if expiry else now + 3600
+        lifetime = max(0.0, self.expires_at - now)
+        self.refresh_at = self.expires_at - max(min(self.refresh_margin, lifetime / 2), EXPIRY_SKEW)
+        self.access_token = self.credentials.token
+
+        self.stats['refreshes'] += 1
+        self.stats['background_refreshes' if background else 'sync_refreshes'] += 1
+        self.stats['last_refresh_seconds'] = duration
+        self.stats['max_refresh_seconds'] = max(self.stats['max_refresh_seconds'], duration)
+        self.stats['last_error'] = None
+        logger.info(f"Refreshed access token in {duration * 1000:.0f} ms"
+                    f"{'' if background else ' (synchronously)'}; valid for {lifetime:.0f} s")
+
+    def start(self):
+        """Start refreshing in the background; the first token is fetched right away"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._refresh_loop, name='token-refresh', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+
+    def _refresh_loop(self):
+        retry_delay = 1.0
+        while not self.stop_event.is_set():
+            try:
+                self.refresh_if_due()
+                retry_delay = 1.0
+                delay = self.refresh_at - self.clock.time()
+            except Exception as e:
+                logger.error(f"Background token refresh failed; retrying in {retry_delay:.0f} s: {str(e)}")
+                delay = retry_delay
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+            if self.clock.wait(self.stop_event, max(delay, 1.0)):
+                return
+
+    def get_stats(self):
+        """
+        Get token refresh metrics
+
+        Returns:
+            dict: Refresh counts (background/sync/failures), refresh durations,
+            calls that had to wait for a token and how long they waited, and
+            seconds until the current token expires
+        """
+        stats = dict(self.stats)
+        stats['expires_in'] = max(0.0, self.expires_at - self.clock.time()) if self.access_token else 0.0
+        return stats
+
+
+class AuthorizedHttp:
+    """
+    httplib2.Http wrapper adding the provider's bearer token to every request
+
+    Cheap to create, so callers can wrap their thread's connection per request.
+    """
+
+    def __init__(self, provider, http):
+        """
+        Args:
+            provider (TokenProvider): Source of access tokens
+            http: The httplib2.Http connection to send requests on
+        """
+        self.provider = provider
+        self.http = http
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        for attempt in range(2):
+            request_headers = dict(headers or {})
+            request_headers['authorization'] = f"Bearer {self.provider.token()}"
+            response, content = self.http.request(uri, method, body=body, headers=request_headers, **kwargs)
+            if response.status != 401 or attempt:
+                return response, content
+            logger.warning("Access token was rejected; refreshing it")
+            self.provider.invalidate()
+
+    def __getattr__(self, name):
+        # timeout, redirect_codes, ... as on the wrapped connection
+        return getattr(self.http, name)
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+def get_token_provider(service_account_file, refresh_margin=300):
+    """
+    Return the process-wide, running token provider for a service account key file
+
+    Args:
+        service_account_file (str): Path of the service account JSON key
+        refresh_margin (float): Seconds before expiry to refresh
+
+    Returns:
+        TokenProvider: The shared provider
+
+    Raises:
+        ValueError, OSError: If the key file cannot be loaded
+    """
+    with _providers_lock:
+        provider = _providers.get(service_account_file)
+        if provider is None:
+            from google.oauth2 import service_account
+            credentials = service_account.Credentials.from_service_account_file(
+                service_account_file, scopes=list(SCOPES)
+            )
+            provider = _providers[service_account_file] = TokenProvider(credentials, refresh_margin)
+            provider.start()
+            logger.info(f"Authenticating as {credentials.service_account_email}")
+        return provider
+
+def get_auth_stats():
+    """
+    Get the metrics of every token provider in this process
+
+    Returns:
+        dict: {service account file: TokenProvider.get_stats()}, or None without service accounts
+    """
+    with _providers_lock:
+        providers = dict(_providers)
+    return {path: provider.get_stats() for path, provider in providers.items()} or None
@@ -0,0 +1,81 @@
+"""
+Time sources for the Google Spreadsheet Monitor
+The real system clock, and a virtual clock that lets simulations run days of
+monitoring in seconds.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """Wall-clock time; waiting blocks the calling thread"""
+
+    def monotonic(self):
+        """Seconds from an arbitrary fixed point, for measuring intervals"""
+        return time.monotonic()
+
+    def time(self):
+        """Seconds since the epoch"""
+        return time.time()
+
+    def now(self):
+        """Current local datetime"""
+        return datetime.now()
+
+    def wait(self, event, timeout):
+        """
+        Wait until the event is set or the timeout elapses
+
+        Args:
+            event (threading.Event): Event to wait for
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: True if the event was set
+        """
+        return event.wait(timeout)
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when advanced.
+
+    wait() never blocks: if the event is not already set, the clock jumps
+    forward by the timeout, as if nothing happened in the meantime.
+    """
+
+    def __init__(self, start=None):
+        """
+        Initialize the clock
+
+        Args:
+            start (float): Epoch seconds the simulation starts at (default: now)
+        """
+        self.start = time.time() if start is None else start
+        self.elapsed = 0.0
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.elapsed
+
+    def time(self):
+        return self.start + self.elapsed
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def advance(self, seconds):
+        """Move time forward"""
+        with self.lock:
+            self.elapsed += max(0.0, seconds)
+
+    def wait(self, event, timeout):
+        if event.is_set():
+            return True
+        if timeout is not None:
+            self.advance(timeout)
+        return event.is_set()
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -2,10 +2,14 @@
 Configuration management for the Google Spreadsheet Monitor
 Handles loading configuration from environment variables, config files, and API keys.
 """
+import atexit
 import os
+import queue
 import sys
+import tempfile
 import yaml
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 try:
     # python-dotenv allows loading environment variables from a .env file
@@ -13,23 +17,83 @@ try:
 except ImportError:  # pragma: no cover - handled gracefully if not installed
     load_dotenv = None
 
-def setup_logging():
-    """Set up logging configuration"""
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir, exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(os.path.join(log_dir, "app.log")),
-            logging.StreamHandler()
-        ]
-    )
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves message formatting to the writer thread."""
+
+    def prepare(self, record):
+        # The queue never leaves this process, so the record can be passed as-is;
+        # %-style arguments are merged and timestamps rendered by the listener.
+        return record
+
+
+_log_listener = None
+_log_handler = None
+_log_process_name = None
+
+
+def setup_logging(process_name=None):
+    """Set up logging configuration
+
+    Records are put on an in-memory queue and written by a background thread
+    to a size-rotated file and the console, so disk stalls never block the
+    caller. Safe to call repeatedly: only the first call installs handlers,
+    unless a later call names a different process, whose file replaces them.
+    Importing this module configures nothing; entry points call this.
+
+    Args:
+        process_name (str): Optional suffix giving this process its own log file
+            (e.g. a shard), since rotation is not safe across processes
+    """
+    global _log_listener, _log_handler, _log_process_name
+    if _log_listener is not None and process_name and process_name != _log_process_name:
+        shutdown_logging()
+    if _log_listener is None:
+        log_dir = os.environ.get('LOG_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        if not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        log_name = f"app-{process_name}.log" if process_name else "app.log"
+
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = RotatingFileHandler(
+            os.path.join(log_dir, log_name),
+            maxBytes=int(os.environ.get('LOG_MAX_BYTES', 5 * 1024 * 1024)),
+            backupCount=int(os.environ.get('LOG_BACKUP_COUNT', 3))
+        )
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _log_handler = _DeferredQueueHandler(log_queue)
+        _log_listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+        _log_listener.start()
+        _log_process_name = process_name
+
+        root = logging.getLogger()
+        root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+        root.addHandler(_log_handler)
+        atexit.register(shutdown_logging)
     return logging.getLogger(__name__)
 
-logger = setup_logging()
+
+def shutdown_logging():
+    """Flush queued log records and detach the background writer."""
+    global _log_listener, _log_handler
+    if _log_listener is None:
+        return
+    logging.getLogger().removeHandler(_log_handler)
+    _log_listener.stop()  # drains the queue before returning
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_listener = None
+    _log_handler = None
+
+logger = logging.getLogger(__name__)
+
+# Variables set by the real process environment; .env files never override these,
+# even on reload, while values that came from .env may be replaced by a newer .env
+_PROCESS_ENV_KEYS = frozenset(os.environ)
+_dotenv_keys = set()
 
 def _mask(value: str, keep: int = 4) -> str:
     """Mask sensitive values for logging (keeps last N chars)."""
@@ -41,6 +105,54 @@ def _mask(value: str, keep: int = 4) -> str:
     return f"***{v[-keep:]}"
 
 
+def _parse_bool(value) -> bool:
+    """Interpret common truthy strings (1/true/yes/on) from env vars."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _read_dotenv_keys(path: str):
+    """Return the variable names defined in a .env file."""
+    from dotenv import dotenv_values
+    return list(dotenv_values(path))
+
+
+def _dotenv_candidates(base_dir: str):
+    """Return the .env paths considered by _load_dotenv_files, in search order."""
+    candidates = []
+    if os.environ.get("ENV_FILE"):
+        candidates.append(os.environ["ENV_FILE"])
+    candidates.append(os.path.join(base_dir, ".env"))
+    candidates.append(os.path.join(os.path.dirname(base_dir), ".env"))
+    return candidates
+
+
+def config_paths():
+    """Return the files whose changes should trigger a configuration reload."""
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    return [os.path.join(base_dir, 'config.yaml')] + _dotenv_candidates(base_dir)
+
+
+def _reload_dotenv_files(base_dir: str):
+    """Re-read .env files, replacing values that earlier .env loads put in the environment."""
+    from dotenv import dotenv_values  # local import; only reached when python-dotenv is installed
+
+    values = {}
+    for path in reversed(_dotenv_candidates(base_dir)):  # earlier candidates win
+        if os.path.isfile(path):
+            values.update({k: v for k, v in dotenv_values(path).items() if v is not None})
+
+    for key in _dotenv_keys - set(values):
+        if key not in _PROCESS_ENV_KEYS:
+            os.environ.pop(key, None)
+    _dotenv_keys.clear()
+    for key, value in values.items():
+        if key not in _PROCESS_ENV_KEYS:
+            os.environ[key] = value
+            _dotenv_keys.add(key)
+
+
 def _load_dotenv_files(base_dir: str):
     """Attempt to load environment variables from .env files.
 
@@ -54,15 +166,10 @@ def _load_dotenv_files(base_dir: str):
         logger.debug("python-dotenv not installed; skipping .env loading")
         return
 
-    candidates = []
-    if os.environ.get("ENV_FILE"):
-        candidates.append(os.environ["ENV_FILE"])
-    candidates.append(os.path.join(base_dir, ".env"))
-    candidates.append(os.path.join(os.path.dirname(base_dir), ".env"))
-
     loaded_any = False
-    for path in candidates:
+    for path in _dotenv_candidates(base_dir):
         if os.path.isfile(path):
+            _dotenv_keys.update(k for k in _read_dotenv_keys(path) if k not in _PROCESS_ENV_KEYS)
             if load_dotenv(path, override=False):
                 logger.info(f"Loaded environment variables from {path}")
                 loaded_any = True
@@ -80,7 +187,7 @@ def _load_dotenv_files(base_dir: str):
             logger.debug(f"Automatic .env discovery failed: {e}")
 
 
-def load_config():
+def load_config(reload=False):
     """Load configuration merging (in precedence order):
 
     1. Default base values defined in code
@@ -92,6 +199,8 @@ def load_config():
     - Set ENV_FILE to point to a custom path if needed.
     - Existing process environment variables are NOT overridden by .env (default python-dotenv behavior).
     - Sensitive values are masked in logs.
+    - With reload=True, .env files are re-read so edited values take effect
+      (still without overriding variables from the real process environment).
     """
     # Set default configuration
     config = {
@@ -101,14 +210,60 @@ def load_config():
         'notification_topic': None,  # ntfy topic',
         'port': 5588,
         'host': '0.0.0.0',
-        'api_key': None
+        'api_key': None,
+        'service_account_file': None,  # service account JSON key (OAuth instead of / besides api_key)
+        'token_refresh_margin': 300,  # seconds before expiry the access token is refreshed
+        'elect_poller': False,  # elect a single polling process among web workers
+        'poller_lock_file': os.path.join(tempfile.gettempdir(), 'gsheet-notify-poller.lock'),
+        # Under the app's data directory, not the world-writable temp directory
+        'state_socket': os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'gsheet-notify.sock'),
+        'shards': 1,  # monitor worker processes; >1 enables sharded execution
+        'cluster_mode': False,  # share monitors between nodes via leases
+        'cluster_backend': 'sqlite',
+        'cluster_db': os.path.join(tempfile.gettempdir(), 'gsheet-notify-cluster.db'),
+        'node_id': None,  # defaults to <hostname>-<pid>
+        'lease_ttl': 6,  # seconds before an unrenewed lease can be taken over
+        'range_cache_ttl': 2,  # seconds a fetched range is shared between monitors
+        'fetch_timeout': 10,  # seconds a Sheets request may block on the network
+        'watchdog_timeout': 20,  # seconds past its deadline before a stalled loop is restarted (0: off)
+        'active_windows': None,  # local times to poll, e.g. 'mon-fri 06:30-09:00; mon-fri 14:30-16:30'
+        'holidays': None,  # dates without polling windows, e.g. '2024-12-23..2025-01-03,2025-02-17'
+        'prewarm_seconds': 60,  # seconds before a window opens to prepare the clients
+        'event_queue_size': 10000,  # check events queued per subscriber before dropping the oldest (alerts excepted)
+        'notification_workers': 4,  # threads sending alerts concurrently
+        'push_mode': False,  # react to Drive change notifications
+        'push_webhook_url': None,  # public URL of /webhooks/drive
+        'push_token': None,  # shared secret echoed by Drive (random if unset)
+        'push_register': True,  # False: local channels only, for the fake notifier
+        'push_fallback_interval': 600,  # safety-net polling interval while push is live
+        'hot_reload': True,  # apply config.yaml/.env edits without restarting
+        'sheets_api_endpoint': None,  # alternate Sheets API base URL (local fake server)
+        'ntfy_server': 'https://ntfy.sh',
+        'ntfy_timeout': 10,  # seconds before a notification request is abandoned
+        'slo_target_seconds': 120,  # change-to-alert latency target
+        'slo_percentile': 95,  # percent of alerts that must meet the target
+        'slo_window_days': 7,  # days covered by the SLO report
+        'latency_retention_days': 35,  # days of latency histograms kept
+        'latency_file': None,  # where latency histograms survive restarts
+        'history_db': os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'history.db'),
+        'monitor_registry': os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'monitors.db'),
+        'production_mode': False,  # cache rendered pages, no template reloading
+        'compress_min_bytes': 1024,  # gzip HTML/JSON responses at least this large
+        'asgi_threads': 16,  # threads running Flask requests in ASGI mode
+        'events_poll_interval': 0.5,  # seconds between state checks for /events streams
+        'admin_token': None,  # X-Admin-Token for /admin endpoints and /api/monitors (disabled when unset)
+        'profile_max_seconds': 60,  # longest profile /admin/profile will run
+        'trace_memory': False  # trace allocations from startup for /admin/memory
     }
     
     # Get the base directory
     base_dir = os.path.dirname(os.path.dirname(__file__))
     
     # Load .env values before reading environment variables
-    _load_dotenv_files(base_dir)
+    if reload and load_dotenv:
+        _reload_dotenv_files(base_dir)
+    else:
+        _load_dotenv_files(base_dir)
 
     # Load from config file if it exists (lower precedence than explicit env vars)
     config_file = os.path.join(base_dir, 'config.yaml')
@@ -125,31 +280,83 @@ def load_config():
     # Override with environment variables
     env_mappings = {
         'GOOGLE_API_KEY': 'api_key',
+        'SERVICE_ACCOUNT_FILE': 'service_account_file',
+        'TOKEN_REFRESH_MARGIN': 'token_refresh_margin',
         'SPREADSHEET_ID': 'spreadsheet_id',
         'RANGE_NAME': 'range_name',
         'POLLING_INTERVAL': 'polling_interval',
         'NOTIFICATION_TOPIC': 'notification_topic',
         'PORT': 'port',
-        'HOST': 'host'
+        'HOST': 'host',
+        'ELECT_POLLER': 'elect_poller',
+        'POLLER_LOCK_FILE': 'poller_lock_file',
+        'STATE_SOCKET': 'state_socket',
+        'SHARDS': 'shards',
+        'CLUSTER_MODE': 'cluster_mode',
+        'CLUSTER_BACKEND': 'cluster_backend',
+        'CLUSTER_DB': 'cluster_db',
+        'NODE_ID': 'node_id',
+        'LEASE_TTL': 'lease_ttl',
+        'RANGE_CACHE_TTL': 'range_cache_ttl',
+        'FETCH_TIMEOUT': 'fetch_timeout',
+        'WATCHDOG_TIMEOUT': 'watchdog_timeout',
+        'ACTIVE_WINDOWS': 'active_windows',
+        'HOLIDAYS': 'holidays',
+        'PREWARM_SECONDS': 'prewarm_seconds',
+        'EVENT_QUEUE_SIZE': 'event_queue_size',
+        'NOTIFICATION_WORKERS': 'notification_workers',
+        'PUSH_MODE': 'push_mode',
+        'PUSH_WEBHOOK_URL': 'push_webhook_url',
+        'PUSH_TOKEN': 'push_token',
+        'PUSH_REGISTER': 'push_register',
+        'PUSH_FALLBACK_INTERVAL': 'push_fallback_interval',
+        'HOT_RELOAD': 'hot_reload',
+        'SHEETS_API_ENDPOINT': 'sheets_api_endpoint',
+        'NTFY_SERVER': 'ntfy_server',
+        'NTFY_TIMEOUT': 'ntfy_timeout',
+        'SLO_TARGET_SECONDS': 'slo_target_seconds',
+        'SLO_PERCENTILE': 'slo_percentile',
+        'SLO_WINDOW_DAYS': 'slo_window_days',
+        'LATENCY_RETENTION_DAYS': 'latency_retention_days',
+        'LATENCY_FILE': 'latency_file',
+        'HISTORY_DB': 'history_db',
+        'MONITOR_REGISTRY': 'monitor_registry',
+        'PRODUCTION_MODE': 'production_mode',
+        'COMPRESS_MIN_BYTES': 'compress_min_bytes',
+        'ASGI_THREADS': 'asgi_threads',
+        'EVENTS_POLL_INTERVAL': 'events_poll_interval',
+        'ADMIN_TOKEN': 'admin_token',
+        'PROFILE_MAX_SECONDS': 'profile_max_seconds',
+        'TRACE_MEMORY': 'trace_memory'
     }
+    int_keys = ['polling_interval', 'port', 'shards', 'lease_ttl', 'range_cache_ttl', 'push_fallback_interval',
+                'ntfy_timeout', 'slo_target_seconds', 'slo_percentile', 'slo_window_days',
+                'latency_retention_days', 'compress_min_bytes', 'asgi_threads', 'token_refresh_margin',
+                'profile_max_seconds', 'fetch_timeout', 'watchdog_timeout', 'prewarm_seconds',
+                'event_queue_size', 'notification_workers']
+    bool_keys = ['elect_poller', 'cluster_mode', 'push_mode', 'push_register', 'hot_reload', 'production_mode',
+                 'trace_memory']
     
     for env_var, config_key in env_mappings.items():
         if env_var in os.environ and os.environ.get(env_var) not in (None, ""):
             value = os.environ.get(env_var)
             # Convert numeric values
-            if config_key in ['polling_interval', 'port']:
+            if config_key in int_keys:
                 try:
                     value = int(value)
                 except ValueError:
                     logger.warning(f"Could not convert {env_var}={_mask(value)} to int. Using existing/default.")
                     continue
+            elif config_key in bool_keys:
+                value = _parse_bool(value)
             config[config_key] = value
-            log_value = _mask(value) if config_key in ['api_key'] else value
+            log_value = _mask(value) if config_key in ['api_key', 'push_token', 'admin_token'] else value
             logger.info(f"Applied env var {env_var} -> {config_key}={log_value}")
     
-    # Final check for API key
-    if not config.get('api_key'):
-        logger.error("No API key found. Provide GOOGLE_API_KEY via .env, environment, or config.yaml")
+    # Final check for credentials
+    if not config.get('api_key') and not config.get('service_account_file'):
+        logger.error("No credentials found. Provide GOOGLE_API_KEY or SERVICE_ACCOUNT_FILE via .env, "
+                     "environment, or config.yaml")
         return None
     
     return config
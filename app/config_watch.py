@@ -0,0 +1,201 @@
+"""
+Configuration file watching for the Google Spreadsheet Monitor
+Detects edits to config.yaml / .env (inotify on Linux, mtime polling
+elsewhere) and applies the reloaded configuration to the running service.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see inotify(7))
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1  # attribute lookup fails where inotify is unavailable
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher:
+    """
+    Calls on_change() after any of the watched files is created, modified,
+    replaced or deleted. Directories are watched rather than files so that
+    editors which save by renaming a temporary file are detected too.
+    """
+
+    def __init__(self, paths, on_change, poll_interval=2.0, debounce=0.2):
+        """
+        Initialize the watcher
+
+        Args:
+            paths (list): Files to watch (they need not exist yet)
+            on_change (callable): Called with no arguments after a change
+            poll_interval (float): Seconds between checks in polling mode
+            debounce (float): Quiet period that coalesces bursts of events into one reload
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.mode = None
+
+    def start(self):
+        """Set up the watches, then start watching in a background thread"""
+        libc = _load_libc()
+        self.stop_event.clear()
+        if libc is not None:
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd >= 0:
+                self.mode = 'inotify'
+                watches = self._add_watches(libc, fd)
+                self.thread = threading.Thread(target=self._inotify_loop, args=(fd, watches), daemon=True)
+                self.thread.start()
+                return
+            logger.debug(f"inotify_init1 failed (errno {ctypes.get_errno()}); falling back to polling")
+        self.mode = 'polling'
+        self.thread = threading.Thread(target=self._polling_loop, args=(self._snapshot(),), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2)
+
+    def _fire(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error(f"Error applying configuration change: {str(e)}")
+
+    def _add_watches(self, libc, fd):
+        """Watch the parent directory of every path; returns {watch descriptor: file names}"""
+        directories = {}
+        for path in self.paths:
+            directory = os.path.dirname(path)
+            directories.setdefault(directory, set()).add(os.path.basename(path))
+        watches = {}
+        for directory, names in directories.items():
+            if not os.path.isdir(directory):
+                continue
+            wd = libc.inotify_add_watch(fd, directory.encode('utf-8'), _WATCH_MASK)
+            if wd >= 0:
+                watches[wd] = names
+        logger.info(f"Watching configuration with inotify: {', '.join(self.paths)}")
+        return watches
+
+    def _inotify_loop(self, fd, watches):
+        try:
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([fd], [], [], 1.0)
+                if not readable or not self._relevant_events(fd, watches):
+                    continue
+                # Let a burst of writes settle before reloading once
+                while select.select([fd], [], [], self.debounce)[0]:
+                    self._relevant_events(fd, watches)
+                self._fire()
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _relevant_events(fd, watches):
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        relevant = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'ignore')
+            offset += length
+            if name in watches.get(wd, ()):
+                relevant = True
+        return relevant
+
+    def _snapshot(self):
+        state = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                state[path] = None
+        return state
+
+    def _polling_loop(self, previous):
+        logger.info(f"Watching configuration by polling every {self.poll_interval}s")
+        while not self.stop_event.wait(self.poll_interval):
+            current = self._snapshot()
+            if current != previous:
+                time.sleep(self.debounce)
+                previous = self._snapshot()
+                self._fire()
+
+
+class ConfigReloader:
+    """
+    Reloads the configuration when its files change and applies the result
+    to a monitoring service through apply_config()
+    """
+
+    def __init__(self, service, loader, paths, poll_interval=2.0):
+        """
+        Initialize the reloader
+
+        Args:
+            service: Monitoring service exposing apply_config(config)
+            loader (callable): Returns a fresh configuration dict, or None if invalid
+            paths (list): Configuration files to watch
+            poll_interval (float): Polling fallback interval in seconds
+        """
+        self.service = service
+        self.loader = loader
+        self.watcher = ConfigWatcher(paths, self.reload, poll_interval=poll_interval)
+        self.reloads = 0
+
+    def start(self):
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
+
+    def reload(self):
+        """
+        Load the configuration and apply it
+
+        Returns:
+            dict or None: Summary from apply_config, or None if the new config was rejected
+        """
+        started = time.perf_counter()
+        config = self.loader()
+        if not config:
+            logger.error("Reloaded configuration is invalid; keeping the running configuration")
+            return None
+        summary = self.service.apply_config(config)
+        self.reloads += 1
+        logger.info(f"Configuration reloaded in {(time.perf_counter() - started) * 1000:.1f} ms: {summary}")
+        return summary
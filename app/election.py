@@ -0,0 +1,219 @@
+"""
+Poller election for multi-worker deployments of the Google Spreadsheet Monitor
+Exactly one process (the holder of a file lock) runs the monitoring service;
+every other process proxies to it over the local state socket.
+"""
+import fcntl
+import logging
+import os
+import threading
+
+from app.ipc import StateServer, RemoteMonitoringService
+
+logger = logging.getLogger(__name__)
+
+
+class FileLockElection:
+    """
+    Leader election backed by an exclusive flock() on a shared file.
+
+    The kernel releases the lock when the holding process dies, so a standby
+    acquires it on its next attempt; failover time is bounded by retry_interval.
+    """
+
+    def __init__(self, lock_path, on_elected, retry_interval=1.0):
+        """
+        Initialize the election
+
+        Args:
+            lock_path (str): Path of the lock file shared by all candidates
+            on_elected (callable): Called once, from the election thread, when this process wins
+            retry_interval (float): Seconds between acquisition attempts
+        """
+        self.lock_path = lock_path
+        self.on_elected = on_elected
+        self.retry_interval = retry_interval
+        self.is_leader = False
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._fd = None
+
+    def try_acquire(self):
+        """
+        Attempt to take the lock without blocking
+
+        Returns:
+            bool: True if this process now holds the lock
+        """
+        if self.is_leader:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self.is_leader = True
+        return True
+
+    def start(self):
+        """Start competing for the lock in a background thread"""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._election_loop, daemon=True)
+        self.thread.start()
+
+    def _election_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                if self.try_acquire():
+                    logger.info(f"Elected as poller (pid {os.getpid()})")
+                    self.on_elected()
+                    return
+            except Exception as e:
+                logger.error(f"Error during poller election: {str(e)}")
+            self.stop_event.wait(self.retry_interval)
+
+    def read_state(self):
+        """Return the text persisted in the lock file by the previous leader"""
+        if self._fd is None:
+            return ""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        return os.read(self._fd, 64).decode('utf-8', 'ignore').strip()
+
+    def write_state(self, state):
+        """Persist a short state string in the lock file (leader only)"""
+        if self._fd is None:
+            return
+        os.ftruncate(self._fd, 0)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, state.encode('utf-8'))
+
+    def release(self):
+        """Stop competing and give up the lock if held"""
+        self.stop_event.set()
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self.is_leader = False
+
+
+class ElectedMonitoringService:
+    """
+    MonitoringService facade for web workers sharing a single elected poller.
+
+    The leader runs the real service and publishes it on the state socket;
+    followers forward every call to the leader. Whether monitoring was active
+    is persisted in the lock file so a newly elected leader resumes it.
+    """
+
+    def __init__(self, config, service_factory):
+        """
+        Initialize and join the election
+
+        Args:
+            config (dict): Configuration dictionary
+            service_factory (callable): Builds the local monitoring service from config
+        """
+        self.config = config
+        self.service_factory = service_factory
+        self.local_service = None
+        self.state_server = None
+        self.remote = RemoteMonitoringService(config['state_socket'])
+        self.election = FileLockElection(
+            config['poller_lock_file'],
+            self._on_elected,
+            retry_interval=config.get('election_retry_interval', 1.0)
+        )
+        self.election.start()
+
+    @property
+    def is_leader(self):
+        return self.local_service is not None
+
+    def _on_elected(self):
+        self.local_service = self.service_factory(self.config)
+        self.state_server = StateServer(self, self.config['state_socket'])
+        self.state_server.start()
+
+        if self.election.read_state() == 'active':
+            logger.info("Resuming monitoring started by the previous poller")
+            self.local_service.start()
+
+    @property
+    def is_active(self):
+        if self.is_leader:
+            return self.local_service.is_active
+        return self.remote.is_active
+
+    def start(self):
+        if self.is_leader:
+            started = self.local_service.start()
+            self.election.write_state('active')
+            return started
+        return self._forward('start')
+
+    def stop(self):
+        if self.is_leader:
+            stopped = self.local_service.stop()
+            self.election.write_state('inactive')
+            return stopped
+        return self._forward('stop')
+
+    def check_now(self):
+        if self.is_leader:
+            return self.local_service.check_now()
+        return self._forward('check_now')
+
+    def handle_push_notification(self, channel_id, token, resource_state):
+        if self.is_leader:
+            return self.local_service.handle_push_notification(channel_id, token, resource_state)
+        try:
+            return self.remote.handle_push_notification(channel_id, token, resource_state)
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.error(f"Could not forward push notification to the poller: {str(e)}")
+            return False
+
+    def apply_config(self, config):
+        """Apply a reloaded config to the local poller; followers have nothing to reload"""
+        if self.is_leader:
+            return self.local_service.apply_config(config)
+        return None
+
+    def reload_monitors(self):
+        """Apply registry changes on the poller, wherever it runs"""
+        if self.is_leader:
+            return self.local_service.reload_monitors()
+        try:
+            return self.remote.reload_monitors()
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.error(f"Could not forward 'reload_monitors' to the poller: {str(e)}")
+            return None
+
+    def get_status(self):
+        if self.is_leader:
+            return self.local_service.get_status()
+        return self.remote.get_status()
+
+    def get_state_version(self):
+        if self.is_leader:
+            return self.local_service.get_state_version()
+        return self.remote.get_state_version()
+
+    def _forward(self, op):
+        try:
+            return getattr(self.remote, op)()
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.error(f"Could not forward '{op}' to the poller: {str(e)}")
+            return False
+
+    def close(self):
+        """Shut down the local poller (if leader) and leave the election"""
+        if self.state_server:
+            self.state_server.stop()
+            self.state_server = None
+        if self.local_service and self.local_service.is_active:
+            self.local_service.stop()
+        self.local_service = None
+        self.election.release()
@@ -0,0 +1,312 @@
+"""
+In-process event bus for the Google Spreadsheet Monitor
+Check outcomes are published as typed events; each consumer (history,
+notifications, metrics, live UI) subscribes with its own (usually bounded) queue,
+overflow policy and worker threads, so publishing never waits for a consumer.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# Event kinds: one per check outcome, plus 'delivered' once an alert was sent (or failed)
+KINDS = ('unchanged', 'normal', 'departed', 'error', 'delivered')
+# What a full queue does with a new event: discard the oldest queued event,
+# discard the new one, or keep only the latest event per monitor
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'latest')
+
+
+class CheckEvent:
+    """A check outcome (or alert delivery) of one monitor"""
+
+    __slots__ = ('kind', 'monitor', 'monitor_id', 'value', 'message', 'is_new', 'at', 'fetched_at',
+                 'changed_after', 'matched_at', 'delivered_at', 'published_at')
+
+    def __init__(self, kind, monitor, value='', message='', is_new=False, at=None, fetched_at=None,
+                 changed_after=None, matched_at=None, delivered_at=None):
+        """
+        Args:
+            kind (str): One of KINDS
+            monitor: The SheetMonitor the event is about
+            value (str): The normalized cell value
+            message (str): The status message shown in history
+            is_new (bool): Whether the value differs from the previous check
+            at (float): Epoch seconds of the outcome (history timestamp)
+            fetched_at (float): Epoch seconds the value was fetched
+            changed_after (float): Epoch seconds after which the value changed (see LatencyTracker)
+            matched_at (float): Epoch seconds the departure was recognized
+            delivered_at (float): Epoch seconds the alert was delivered, None if it failed
+        """
+        self.kind = kind
+        self.monitor = monitor
+        self.monitor_id = getattr(monitor, 'monitor_id', None)
+        self.value = value
+        self.message = message
+        self.is_new = is_new
+        self.at = at
+        self.fetched_at = fetched_at
+        self.changed_after = changed_after
+        self.matched_at = matched_at
+        self.delivered_at = delivered_at
+        self.published_at = None  # monotonic, set by EventBus.publish
+
+    def __repr__(self):
+        return f"CheckEvent({self.kind!r}, monitor={self.monitor_id!r}, value={self.value!r})"
+
+
+class Subscription:
+    """
+    One consumer of an EventBus: a bounded queue drained by worker threads
+
+    Workers start with the first queued event. Handler exceptions are logged
+    and counted; they never reach the publisher.
+    """
+
+    def __init__(self, name, handler, kinds=None, maxsize=1000, overflow='drop_oldest', workers=1):
+        """
+        Args:
+            name (str): Name shown in stats and worker thread names
+            handler (callable): handler(event), called from a worker thread
+            kinds (iterable): Event kinds to receive (default: all)
+            maxsize (int): Events queued at most (None: unbounded, nothing is dropped)
+            overflow (str): One of OVERFLOW_POLICIES
+            workers (int): Threads calling the handler concurrently
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (use one of {', '.join(OVERFLOW_POLICIES)})")
+        self.name = name
+        self.handler = handler
+        self.kinds = frozenset(kinds) if kinds else None
+        self.maxsize = None if maxsize is None else max(1, maxsize)
+        self.overflow = overflow
+        self.worker_count = max(1, workers)
+        self.queue = OrderedDict() if overflow == 'latest' else deque()  # 'latest': monitor_id -> event
+        self.condition = threading.Condition()
+        self.workers = []
+        self.busy = 0  # events being handled
+        self.overflowing = False  # dropping events since the queue last drained
+        self.closed = False
+        self.stats = {'received': 0, 'handled': 0, 'dropped': 0, 'coalesced': 0, 'errors': 0,
+                      'max_latency': 0.0, 'last_latency': None}
+
+    def wants(self, event):
+        return self.kinds is None or event.kind in self.kinds
+
+    def offer(self, event):
+        """
+        Queue an event without blocking, applying the overflow policy
+
+        Args:
+            event (CheckEvent): The event
+
+        Returns:
+            bool: False if the event (or an older one) was dropped to make room
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            self.stats['received'] += 1
+            accepted = True
+            if self.overflow == 'latest':
+                if event.monitor_id in self.queue:
+                    self.stats['coalesced'] += 1
+                    del self.queue[event.monitor_id]
+                elif self._full():
+                    self.queue.popitem(last=False)
+                    self.stats['dropped'] += 1
+                    accepted = False
+                self.queue[event.monitor_id] = event
+            elif self._full():
+                self.stats['dropped'] += 1
+                accepted = False
+                if self.overflow == 'drop_oldest':
+                    self.queue.popleft()
+                    self.queue.append(event)
+            else:
+                self.queue.append(event)
+            if not accepted and not self.overflowing:
+                self.overflowing = True
+                logger.warning(f"Event queue of {self.name} is full ({self.maxsize}); dropping events "
+                               f"({self.overflow}) until it drains")
+            if len(self.workers) < self.worker_count:
+                self._start_workers()
+            self.condition.notify()
+        return accepted
+
+    def _full(self):
+        return self.maxsize is not None and len(self.queue) >= self.maxsize
+
+    def _start_workers(self):
+        """Start the worker threads (caller holds the condition)"""
+        while len(self.workers) < self.worker_count:
+            worker = threading.Thread(target=self._work, name=f"events-{self.name}-{len(self.workers)}",
+                                      daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    def _take(self):
+        if self.overflow == 'latest':
+            return self.queue.popitem(last=False)[1]
+        return self.queue.popleft()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if not self.queue:
+                    return  # closed and drained
+                event = self._take()
+                if not self.queue:
+                    self.overflowing = False
+                self.busy += 1
+            self.handle(event)
+            with self.condition:
+                self.busy -= 1
+                self.condition.notify_all()
+
+    def handle(self, event):
+        """Call the handler, recording errors and publish-to-handled latency"""
+        failed = False
+        try:
+            self.handler(event)
+        except Exception as e:
+            failed = True
+            logger.error("Event subscriber %s failed on %r: %s", self.name, event, e)
+        latency = time.monotonic() - event.published_at if event.published_at is not None else 0.0
+        # Workers handle events concurrently
+        with self.condition:
+            if failed:
+                self.stats['errors'] += 1
+            self.stats['handled'] += 1
+            self.stats['last_latency'] = latency
+            self.stats['max_latency'] = max(self.stats['max_latency'], latency)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued event has been handled
+
+        Args:
+            timeout (float): Seconds to wait at most
+
+        Returns:
+            bool: True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while self.queue or self.busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def close(self, timeout=5):
+        """Stop the workers once the queue is drained"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join(timeout)
+
+    def get_stats(self):
+        """
+        Get the subscriber's counters and lag
+
+        Returns:
+            dict: 'queued', 'maxsize', 'overflow', the counters (received,
+            handled, dropped, coalesced, errors), 'lag_seconds' (age of the
+            oldest queued event) and handled-event 'last_latency'/'max_latency'
+        """
+        with self.condition:
+            stats = dict(self.stats, queued=len(self.queue), maxsize=self.maxsize, overflow=self.overflow)
+            oldest = next(iter(self.queue.values() if self.overflow == 'latest' else self.queue), None)
+        stats['lag_seconds'] = time.monotonic() - oldest.published_at if oldest else 0.0
+        return stats
+
+
+class EventBus:
+    """
+    Fans events out to subscriptions
+
+    publish() only appends to the subscribers' queues, so a slow or failing
+    consumer never delays the publisher or the other consumers. A synchronous
+    bus calls the handlers inline instead (simulations and tests, where
+    ordering must be deterministic).
+    """
+
+    def __init__(self, synchronous=False):
+        """
+        Args:
+            synchronous (bool): Call handlers from publish() instead of worker threads
+        """
+        self.synchronous = synchronous
+        self.subscriptions = []
+        self.published = 0
+
+    def subscribe(self, name, handler, kinds=None, maxsize=1000, overflow='drop_oldest', workers=1):
+        """
+        Add a consumer (see Subscription for the arguments)
+
+        Returns:
+            Subscription: The new subscription
+        """
+        subscription = Subscription(name, handler, kinds, maxsize, overflow, workers)
+        # Copy on write: publish() iterates without a lock
+        self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a consumer, letting it finish what is queued"""
+        self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+        subscription.close()
+
+    def publish(self, event):
+        """
+        Deliver an event to every subscription that wants it
+
+        Args:
+            event (CheckEvent): The event
+        """
+        event.published_at = time.monotonic()
+        self.published += 1
+        for subscription in self.subscriptions:
+            if not subscription.wants(event):
+                continue
+            if self.synchronous:
+                with subscription.condition:
+                    subscription.stats['received'] += 1
+                subscription.handle(event)
+            else:
+                subscription.offer(event)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every subscription has handled its queued events
+
+        Args:
+            timeout (float): Seconds to wait at most, in total
+
+        Returns:
+            bool: True if all queues drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for subscription in self.subscriptions:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not subscription.flush(remaining):
+                return False
+        return True
+
+    def get_stats(self):
+        """
+        Get per-subscriber queue depth, lag and counters
+
+        Returns:
+            dict: 'published' and 'subscribers' ({name: Subscription.get_stats()})
+        """
+        return {
+            'published': self.published,
+            'subscribers': {s.name: s.get_stats() for s in self.subscriptions}
+        }
@@ -0,0 +1,301 @@
+"""
+Shared range fetching for the Google Spreadsheet Monitor
+Deduplicates concurrent requests for the same spreadsheet range, serves
+repeats from a short-TTL cache and merges overlapping subscribed ranges into
+a single fetch, so API calls scale with distinct data instead of monitors.
+"""
+import logging
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_A1_PATTERN = re.compile(
+    r"^(?:(?P<sheet>'(?:[^']|'')+'|[^!]+)!)?"
+    r"(?P<col1>[A-Za-z]+)(?P<row1>\d+)(?::(?P<col2>[A-Za-z]+)(?P<row2>\d+))?$"
+)
+
+
+def _column_number(letters):
+    number = 0
+    for letter in letters.upper():
+        number = number * 26 + (ord(letter) - ord('A') + 1)
+    return number
+
+
+def _column_letters(number):
+    letters = ''
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+class RangeRef:
+    """A bounded rectangular A1 range on one sheet"""
+
+    __slots__ = ('sheet', 'row1', 'col1', 'row2', 'col2')
+
+    def __init__(self, sheet, row1, col1, row2, col2):
+        self.sheet = sheet
+        self.row1, self.row2 = min(row1, row2), max(row1, row2)
+        self.col1, self.col2 = min(col1, col2), max(col1, col2)
+
+    def overlaps(self, other):
+        return (
+            self.sheet == other.sheet
+            and self.row1 <= other.row2 and other.row1 <= self.row2
+            and self.col1 <= other.col2 and other.col1 <= self.col2
+        )
+
+    def union(self, other):
+        return RangeRef(
+            self.sheet,
+            min(self.row1, other.row1), min(self.col1, other.col1),
+            max(self.row2, other.row2), max(self.col2, other.col2)
+        )
+
+    def to_a1(self):
+        cells = f"{_column_letters(self.col1)}{self.row1}:{_column_letters(self.col2)}{self.row2}"
+        if self.sheet is None:
+            return cells
+        return "'" + self.sheet.replace("'", "''") + "'!" + cells
+
+    def slice(self, outer, values):
+        """
+        Extract this range's values from the values fetched for an enclosing range
+
+        Args:
+            outer (RangeRef): The range that was fetched
+            values (list): Row-major values returned for outer
+
+        Returns:
+            list: Row-major values for this range, trailing empty rows trimmed like the API does
+        """
+        rows = values[self.row1 - outer.row1:self.row2 - outer.row1 + 1]
+        first = self.col1 - outer.col1
+        last = self.col2 - outer.col1 + 1
+        sliced = [row[first:last] for row in rows]
+        while sliced and not sliced[-1]:
+            sliced.pop()
+        return sliced
+
+
+def parse_a1(range_name):
+    """
+    Parse a bounded A1 range such as "Sheet1!D19" or "'My Sheet'!A1:C10"
+
+    Args:
+        range_name (str): A1 notation range
+
+    Returns:
+        RangeRef or None: None for ranges that cannot be merged (whole columns, named ranges, ...)
+    """
+    match = _A1_PATTERN.match(range_name or '')
+    if not match:
+        return None
+    sheet = match.group('sheet')
+    if sheet and sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    col1 = _column_number(match.group('col1'))
+    row1 = int(match.group('row1'))
+    col2 = _column_number(match.group('col2')) if match.group('col2') else col1
+    row2 = int(match.group('row2')) if match.group('row2') else row1
+    return RangeRef(sheet, row1, col1, row2, col2)
+
+
+class _InFlight:
+    """A fetch in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.values = None
+        self.error = None
+
+
+class SharedRangeFetcher:
+    """
+    Process-wide fetch layer shared by all SheetsClient instances.
+
+    Clients register the ranges they watch; a fetch for one range is widened to
+    the bounding box of all overlapping registered ranges on the same sheet,
+    and the result is cached under that merged range for ttl seconds.
+
+    Everything is partitioned by the credentials a client reads with: a client
+    whose key cannot read a spreadsheet must not be served what another
+    client's key fetched from it.
+    """
+
+    def __init__(self):
+        """Initialize the fetcher"""
+        self.lock = threading.Lock()
+        # A source is (credentials, spreadsheet_id)
+        self.subscriptions = {}  # source -> {range_name: subscriber count}
+        self.plans = {}  # (source, range_name) -> (fetch_range, outer RangeRef or None)
+        self.cache = {}  # (source, fetch_range) -> (expires_at, values)
+        self.inflight = {}  # (source, fetch_range) -> _InFlight
+        self.stats = {'requests': 0, 'api_calls': 0, 'cache_hits': 0, 'coalesced': 0,
+                      'bytes_sent': 0, 'bytes_received': 0, 'bytes_decoded': 0, 'compressed': 0,
+                      'parse_seconds': 0.0}
+
+    def register(self, spreadsheet_id, range_name, credentials=None):
+        """Declare interest in a range so overlapping fetches can be merged"""
+        source = (credentials, spreadsheet_id)
+        with self.lock:
+            ranges = self.subscriptions.setdefault(source, {})
+            ranges[range_name] = ranges.get(range_name, 0) + 1
+            self._invalidate_plans(source)
+
+    def unregister(self, spreadsheet_id, range_name, credentials=None):
+        """Withdraw interest previously declared with register()"""
+        source = (credentials, spreadsheet_id)
+        with self.lock:
+            ranges = self.subscriptions.get(source, {})
+            if range_name in ranges:
+                ranges[range_name] -= 1
+                if ranges[range_name] <= 0:
+                    del ranges[range_name]
+            self._invalidate_plans(source)
+
+    def _invalidate_plans(self, source):
+        for key in [key for key in self.plans if key[0] == source]:
+            del self.plans[key]
+
+    def _plan(self, source, range_name):
+        """Find the merged range to fetch for range_name (caller holds the lock)"""
+        key = (source, range_name)
+        if key in self.plans:
+            return self.plans[key]
+
+        ref = parse_a1(range_name)
+        if ref is None:
+            plan = (range_name, None)
+        else:
+            others = [parse_a1(name) for name in self.subscriptions.get(source, {})]
+            others = [other for other in others if other is not None and other.sheet == ref.sheet]
+            # Grow the range until no remaining subscribed range overlaps it
+            merged = ref
+            changed = True
+            while changed:
+                changed = False
+                for other in others:
+                    if merged.overlaps(other):
+                        grown = merged.union(other)
+                        if grown.to_a1() != merged.to_a1():
+                            merged = grown
+                            changed = True
+            plan = (merged.to_a1(), merged) if merged.to_a1() != ref.to_a1() else (range_name, None)
+
+        self.plans[key] = plan
+        return plan
+
+    def get_values(self, spreadsheet_id, range_name, loader, ttl=0, timeout=None, credentials=None):
+        """
+        Return the values of a range, sharing the fetch with concurrent callers
+
+        Args:
+            spreadsheet_id (str): Spreadsheet to read
+            range_name (str): A1 range requested by the caller
+            loader (callable): loader(fetch_range) -> row-major values; performs the API call
+            ttl (float): Seconds a fetched result may be reused (0 disables caching)
+            timeout (float): Seconds to wait for another caller's fetch (default: no limit)
+            credentials (hashable): Identity of the credentials loader reads with;
+                only callers with equal credentials share fetches and cached results
+
+        Returns:
+            list: Row-major values for range_name
+
+        Raises:
+            Whatever loader raised, re-raised in every caller sharing the fetch;
+            TimeoutError if the shared fetch did not finish within timeout
+        """
+        with self.lock:
+            self.stats['requests'] += 1
+            source = (credentials, spreadsheet_id)
+            fetch_range, outer = self._plan(source, range_name) if ttl > 0 else (range_name, None)
+            key = (source, fetch_range)
+
+            cached = self.cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.stats['cache_hits'] += 1
+                return self._extract(range_name, outer, cached[1])
+
+            pending = self.inflight.get(key)
+            if pending:
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                pending = self.inflight[key] = _InFlight()
+                self.stats['api_calls'] += 1
+                leader = True
+
+        if not leader:
+            if not pending.done.wait(timeout):
+                raise TimeoutError(f"Shared fetch of {fetch_range} did not finish within {timeout:g} s")
+            if pending.error is not None:
+                raise pending.error
+            return self._extract(range_name, outer, pending.values)
+
+        try:
+            pending.values = loader(fetch_range)
+            if ttl > 0:
+                with self.lock:
+                    self.cache[key] = (time.monotonic() + ttl, pending.values)
+                    self._evict_expired()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            pending.done.set()
+
+        return self._extract(range_name, outer, pending.values)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self.cache.items() if expires_at <= now]:
+            del self.cache[key]
+
+    @staticmethod
+    def _extract(range_name, outer, values):
+        if outer is None:
+            return values
+        return parse_a1(range_name).slice(outer, values)
+
+    def invalidate(self, spreadsheet_id=None):
+        """Drop cached results, for one spreadsheet (whatever the credentials) or all of them"""
+        with self.lock:
+            for key in [key for key in self.cache if spreadsheet_id in (None, key[0][1])]:
+                del self.cache[key]
+
+    def record_transfer(self, bytes_sent, bytes_received, bytes_decoded, compressed, parse_seconds):
+        """
+        Add one API call's transfer to the counters
+
+        Args:
+            bytes_sent (int): Request bytes written
+            bytes_received (int): Response bytes read, headers and compressed body
+            bytes_decoded (int): Response body bytes after decompression
+            compressed (int): 1 if the response body was compressed
+            parse_seconds (float): Time spent decoding the response JSON
+        """
+        with self.lock:
+            self.stats['bytes_sent'] += bytes_sent
+            self.stats['bytes_received'] += bytes_received
+            self.stats['bytes_decoded'] += bytes_decoded
+            self.stats['compressed'] += compressed
+            self.stats['parse_seconds'] += parse_seconds
+
+    def get_stats(self):
+        """Return a copy of the request/API-call/cache-hit/coalesced and transfer counters"""
+        with self.lock:
+            return dict(self.stats)
+
+
+_shared_fetcher = SharedRangeFetcher()
+
+def get_shared_fetcher():
+    """Return the process-wide SharedRangeFetcher"""
+    return _shared_fetcher
@@ -0,0 +1,219 @@
+"""
+Persistent check history for the Google Spreadsheet Monitor
+Appends every history entry to a SQLite file and streams it back out as CSV or
+NDJSON for any time range and set of monitors.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from SQLite per batch while exporting
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = ('timestamp', 'monitor_id', 'status', 'message')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class HistoryStore:
+    """
+    History entries in a SQLite database in WAL mode.
+
+    Writers share one connection; every export reads through its own
+    connection, so a long export neither holds the writer back nor keeps more
+    than one batch of rows in memory.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the store, creating the database if needed
+
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, monitor_id TEXT NOT NULL, ts REAL NOT NULL, "
+            "status TEXT NOT NULL, message TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_ts ON history (ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_monitor_ts ON history (monitor_id, ts)")
+
+    def append(self, monitor_id, timestamp, status, message):
+        """
+        Store one history entry
+
+        Args:
+            monitor_id (str): Monitor the entry belongs to
+            timestamp (float): Epoch seconds of the entry
+            status (str): Status type ('normal', 'departed', 'error')
+            message (str): The status message
+
+        Returns:
+            bool: True if the entry was written
+        """
+        try:
+            with self.lock:
+                self.conn.execute(
+                    "INSERT INTO history (monitor_id, ts, status, message) VALUES (?, ?, ?, ?)",
+                    (monitor_id, timestamp, status, message)
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error("Could not store history entry: %s", e)
+            return False
+
+    def count(self):
+        """Return the number of stored entries"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def iter_rows(self, start=None, end=None, monitor_ids=None):
+        """
+        Yield stored entries in time order, one batch in memory at a time
+
+        Args:
+            start (float): Earliest epoch seconds to include
+            end (float): Epoch seconds to stop before
+            monitor_ids (list): Only these monitors (default: all)
+
+        Yields:
+            tuple: (epoch seconds, monitor_id, status, message)
+        """
+        query = "SELECT ts, monitor_id, status, message FROM history"
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("ts < ?")
+            params.append(end)
+        if monitor_ids:
+            conditions.append(f"monitor_id IN ({', '.join('?' * len(monitor_ids))})")
+            params.extend(monitor_ids)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY ts, id"
+
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_history_store(path):
+    """
+    Return the process-wide store for a database path
+
+    Args:
+        path (str): Path of the SQLite database file (None: history is not persisted)
+
+    Returns:
+        HistoryStore: The shared store, or None when path is empty or unusable
+    """
+    if not path:
+        return None
+    with _stores_lock:
+        if path not in _stores:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                _stores[path] = HistoryStore(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Could not open history database {path}: {str(e)}")
+                return None
+        return _stores[path]
+
+def format_timestamp(timestamp):
+    """Render epoch seconds the way the in-memory history does"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def _timestamp_formatter():
+    """
+    format_timestamp() for rows in time order: strftime is the slowest part of
+    an export, so it only runs once per minute and seconds are appended
+    """
+    minute_prefix = [None, '']
+
+    def format_sorted(timestamp):
+        minute = int(timestamp // 60)
+        if minute != minute_prefix[0]:
+            minute_prefix[0] = minute
+            minute_prefix[1] = datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M:")
+        return f"{minute_prefix[1]}{int(timestamp) - minute * 60:02d}"
+
+    return format_sorted
+
+def export_rows(rows, fmt='csv', compress=False, chunk_size=65536):
+    """
+    Encode history rows as CSV or NDJSON, in chunks of about chunk_size bytes
+
+    Args:
+        rows (iterable): (epoch seconds, monitor_id, status, message) tuples in time order
+        fmt (str): 'csv' or 'ndjson'
+        compress (bool): Gzip the output on the fly
+        chunk_size (int): Bytes to buffer before yielding
+
+    Yields:
+        bytes: Encoded (and possibly compressed) output
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip container
+    buffer = io.StringIO()
+    format_time = _timestamp_formatter()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    for timestamp, monitor_id, status, message in rows:
+        if writer:
+            writer.writerow((format_time(timestamp), monitor_id, status, message))
+        else:
+            buffer.write(json.dumps({
+                'timestamp': format_time(timestamp), 'monitor_id': monitor_id,
+                'status': status, 'message': message
+            }) + '\n')
+        if buffer.tell() >= chunk_size:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
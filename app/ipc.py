@@ -0,0 +1,207 @@
+"""
+Local-socket state channel for the Google Spreadsheet Monitor
+Lets web worker processes read status from, and send commands to, the single
+process that owns the monitoring service.
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Operations a remote client is allowed to invoke on the monitoring service
+ALLOWED_OPS = ('status', 'state_version', 'start', 'stop', 'check_now', 'is_active', 'handle_push_notification',
+               'reload_monitors')
+
+
+class _StateRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one newline-delimited JSON request per connection"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode('utf-8'))
+            result = self.server.dispatch(request.get('op'), request.get('args') or {})
+            response = {'ok': True, 'result': result}
+        except Exception as e:
+            logger.error(f"Error handling state request: {str(e)}")
+            response = {'ok': False, 'error': str(e)}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class StateServer:
+    """
+    Serves the monitoring service's state over a Unix domain socket
+    """
+
+    def __init__(self, service, socket_path):
+        """
+        Initialize the state server
+
+        Args:
+            service: The monitoring service whose state is exposed
+            socket_path (str): Filesystem path of the Unix socket
+        """
+        self.service = service
+        self.socket_path = socket_path
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """
+        Bind the socket and start serving in a background thread
+
+        The socket is made accessible to this user only, since any client can
+        start, stop and reload the monitors.
+
+        Raises:
+            RuntimeError: If the socket path is a symlink or some other non-socket file
+        """
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.islink(self.socket_path):
+            raise RuntimeError(f"Refusing to serve state on {self.socket_path}: it is a symlink")
+        if os.path.lexists(self.socket_path):
+            if not stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                raise RuntimeError(f"Refusing to serve state on {self.socket_path}: it is not a socket")
+            # A stale socket left by a crashed leader would make bind() fail
+            os.unlink(self.socket_path)
+
+        server = _ThreadingUnixServer(self.socket_path, _StateRequestHandler)
+        try:
+            os.chmod(self.socket_path, 0o600)
+        except OSError:
+            server.server_close()
+            raise
+        self.server = server
+        self.server.dispatch = self.dispatch
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"State server listening on {self.socket_path}")
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def dispatch(self, op, args):
+        """
+        Run a requested operation against the monitoring service
+
+        Args:
+            op (str): Operation name (see ALLOWED_OPS)
+            args (dict): Keyword arguments for the operation
+
+        Returns:
+            JSON-serializable result of the operation
+        """
+        if op not in ALLOWED_OPS:
+            raise ValueError(f"Unsupported operation: {op}")
+        if op == 'status':
+            return self.service.get_status()
+        if op == 'is_active':
+            return self.service.is_active
+        if op == 'state_version':
+            return self.service.get_state_version()
+        return getattr(self.service, op)(**args)
+
+
+class RemoteMonitoringService:
+    """
+    Client-side proxy exposing the MonitoringService interface over the state socket
+    """
+
+    def __init__(self, socket_path, timeout=5):
+        """
+        Initialize the proxy
+
+        Args:
+            socket_path (str): Filesystem path of the leader's Unix socket
+            timeout (float): Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _call(self, op, **args):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps({'op': op, 'args': args}).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("Empty response from state server")
+        response = json.loads(line.decode('utf-8'))
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'Unknown state server error'))
+        return response.get('result')
+
+    @property
+    def is_active(self):
+        try:
+            return bool(self._call('is_active'))
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.warning(f"Poller unavailable: {str(e)}")
+            return False
+
+    def start(self):
+        return self._call('start')
+
+    def stop(self):
+        return self._call('stop')
+
+    def check_now(self):
+        return self._call('check_now')
+
+    def handle_push_notification(self, channel_id, token, resource_state):
+        return self._call('handle_push_notification', channel_id=channel_id, token=token,
+                          resource_state=resource_state)
+
+    def reload_monitors(self):
+        return self._call('reload_monitors')
+
+    def get_state_version(self):
+        """
+        Get the leader's state version
+
+        Returns:
+            int: The version, or None while no leader is reachable
+        """
+        try:
+            return self._call('state_version')
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.warning(f"Poller unavailable: {str(e)}")
+            return None
+
+    def get_status(self):
+        """
+        Get the leader's status, or a placeholder while no leader is reachable
+
+        Returns:
+            dict: Same shape as MonitoringService.get_status()
+        """
+        try:
+            return self._call('status')
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.warning(f"Poller unavailable: {str(e)}")
+            return {
+                'is_active': False,
+                'last_result': "Poller process unavailable",
+                'last_check_time': "",
+                'history': []
+            }
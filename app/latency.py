@@ -0,0 +1,357 @@
+"""
+End-to-end detection latency for the Google Spreadsheet Monitor
+Measures how long each change takes from the cell changing to the alert being
+delivered, keeps compact per-day histograms, and reports SLO breaches.
+"""
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets grow by a factor of 2**(1/BUCKETS_PER_DOUBLING) from
+# MIN_SECONDS: percentiles are accurate to ~19%, and a day of events for one
+# monitor only needs a few dozen counters however many events it saw.
+MIN_SECONDS = 0.01
+BUCKETS_PER_DOUBLING = 4
+SECONDS_PER_DAY = 86400
+
+# fetch: one Sheets read; detection: change -> fetch done;
+# notify: rule matched -> notification delivered; alert: change -> delivered
+STAGES = ('fetch', 'detection', 'notify', 'alert')
+
+def bucket_index(seconds):
+    """
+    Histogram bucket holding a duration
+
+    Args:
+        seconds (float): The duration
+
+    Returns:
+        int: Bucket index; bucket i covers (upper(i-1), upper(i)]
+    """
+    if seconds <= MIN_SECONDS:
+        return 0
+    return int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING) + 1
+
+def bucket_upper(index):
+    """Upper bound in seconds of a histogram bucket"""
+    return MIN_SECONDS * 2 ** (int(index) / BUCKETS_PER_DOUBLING)
+
+def merge_buckets(target, buckets):
+    """
+    Add the counts of one sparse histogram into another
+
+    Args:
+        target (dict): {bucket index: count} updated in place
+        buckets (dict): Histogram to add; keys may be strings after a JSON round trip
+    """
+    for index, count in buckets.items():
+        index = int(index)
+        target[index] = target.get(index, 0) + count
+
+def percentile(buckets, pct):
+    """
+    Percentile of a histogram, as the upper bound of the bucket reaching it
+
+    Args:
+        buckets (dict): {bucket index: count}
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: Seconds (rounded to ms), or None for an empty histogram
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = max(1, math.ceil(total * pct / 100))
+    seen = 0
+    for index in sorted(buckets, key=int):
+        seen += buckets[index]
+        if seen >= rank:
+            return round(bucket_upper(index), 3)
+    return None
+
+def count_within(buckets, seconds):
+    """Number of histogram entries known to be at most the given duration"""
+    return sum(count for index, count in buckets.items() if bucket_upper(index) <= seconds + 1e-9)
+
+def summarize(buckets):
+    """
+    Summarize a histogram
+
+    Returns:
+        dict: count and p50/p90/p95/p99/max in seconds
+    """
+    summary = {'count': sum(buckets.values())}
+    for pct in (50, 90, 95, 99):
+        summary[f'p{pct}'] = percentile(buckets, pct)
+    summary['max'] = percentile(buckets, 100)
+    return summary
+
+
+class LatencyTracker:
+    """
+    Per-monitor latency recorder.
+
+    The change time is unknown: all we know is that the cell still had its old
+    value at the previous successful fetch and the new one at this fetch, so
+    the change is estimated at the midpoint of that bracket. Stage durations
+    go into one histogram per UTC day; days beyond the retention are dropped.
+    """
+
+    def __init__(self, clock, retention_days=35, window_days=7, max_events=20):
+        """
+        Initialize the tracker
+
+        Args:
+            clock: Time source (see app.clock)
+            retention_days (int): Days of histograms to keep
+            window_days (int): Days summarized by snapshot()
+            max_events (int): Recent raw events kept for inspection
+        """
+        self.clock = clock
+        self.retention_days = retention_days
+        self.window_days = window_days
+        self.days = {}  # UTC day number -> {'stages': {stage: buckets}, 'undelivered': n}
+        self.events = deque(maxlen=max_events)  # (value, changed_after, fetched_at, matched_at, delivered_at)
+        self.previous_fetch = None
+        self.lock = threading.Lock()
+        self.version = 0
+        self._snapshot = None
+        self._snapshot_key = None
+
+    def _day(self, day):
+        record = self.days.get(day)
+        if record is None:
+            record = self.days[day] = {'stages': {}, 'undelivered': 0}
+            oldest = day - self.retention_days + 1
+            for old in [d for d in self.days if d < oldest]:
+                del self.days[old]
+        return record
+
+    def _add(self, record, stage, seconds):
+        buckets = record['stages'].setdefault(stage, {})
+        index = bucket_index(max(0.0, seconds))
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def record_fetch(self, started, finished):
+        """
+        Record a successful fetch
+
+        Args:
+            started (float): Epoch seconds the fetch began
+            finished (float): Epoch seconds the fetch returned
+
+        Returns:
+            float: Start of the previous successful fetch (None for the first),
+            the earliest time a change seen by this fetch can have happened
+        """
+        with self.lock:
+            previous, self.previous_fetch = self.previous_fetch, started
+            self._add(self._day(int(finished // SECONDS_PER_DAY)), 'fetch', finished - started)
+            self.version += 1
+        return previous
+
+    def record_change(self, value, changed_after, fetched_at, matched_at=None, delivered_at=None):
+        """
+        Record a detected change and, for alerts, its notification
+
+        Args:
+            value (str): The new cell value
+            changed_after (float): Earliest possible change time (previous fetch start)
+            fetched_at (float): When the fetch that saw the change returned
+            matched_at (float): When the alert rule matched (None: not an alert)
+            delivered_at (float): When the notification was delivered (None: not delivered)
+
+        Returns:
+            dict: The recorded event
+        """
+        # The change happened between the previous fetch and this one
+        estimate = changed_after + (fetched_at - changed_after) / 2
+        event = (value, changed_after, fetched_at, matched_at, delivered_at)
+        with self.lock:
+            record = self._day(int(fetched_at // SECONDS_PER_DAY))
+            self._add(record, 'detection', fetched_at - estimate)
+            if matched_at is not None:
+                if delivered_at is None:
+                    record['undelivered'] += 1
+                else:
+                    self._add(record, 'notify', delivered_at - matched_at)
+                    self._add(record, 'alert', delivered_at - estimate)
+            self.events.append(event)  # kept as a tuple; dicts are only built when read
+            self.version += 1
+        return self._event_dict(event)
+
+    @staticmethod
+    def _event_dict(event):
+        value, changed_after, fetched_at, matched_at, delivered_at = event
+        estimate = changed_after + (fetched_at - changed_after) / 2
+        return {
+            'value': value,
+            'change_window': [round(changed_after, 3), round(fetched_at, 3)],
+            'estimated_change': round(estimate, 3),
+            'fetched': round(fetched_at, 3),
+            'matched': round(matched_at, 3) if matched_at is not None else None,
+            'delivered': round(delivered_at, 3) if delivered_at is not None else None,
+            'detection_seconds': round(fetched_at - estimate, 3),
+            'alert_seconds': round(delivered_at - estimate, 3) if delivered_at is not None else None
+        }
+
+    def snapshot(self):
+        """
+        Histograms merged over the last window_days, for status and SLO reports
+
+        Returns:
+            dict: {'window_days', 'stages': {stage: buckets}, 'undelivered', 'last_event'}
+        """
+        today = int(self.clock.time() // SECONDS_PER_DAY)
+        with self.lock:
+            key = (self.version, today)
+            if self._snapshot_key == key:
+                return self._snapshot
+            stages = {}
+            undelivered = 0
+            for day, record in self.days.items():
+                if day > today - self.window_days:
+                    for stage, buckets in record['stages'].items():
+                        merge_buckets(stages.setdefault(stage, {}), buckets)
+                    undelivered += record['undelivered']
+            self._snapshot = {
+                'window_days': self.window_days,
+                'stages': stages,
+                'undelivered': undelivered,
+                'last_event': self._event_dict(self.events[-1]) if self.events else None
+            }
+            self._snapshot_key = key
+            return self._snapshot
+
+    def to_dict(self):
+        """Serializable form of the retained histograms"""
+        with self.lock:
+            return {str(day): record for day, record in self.days.items()}
+
+    def load(self, data):
+        """
+        Merge histograms saved by to_dict()
+
+        Args:
+            data (dict): {day: {'stages': ..., 'undelivered': ...}}
+        """
+        with self.lock:
+            for day, saved in data.items():
+                record = self._day(int(day))
+                for stage, buckets in saved.get('stages', {}).items():
+                    merge_buckets(record['stages'].setdefault(stage, {}), buckets)
+                record['undelivered'] += saved.get('undelivered', 0)
+            self.version += 1
+
+
+def load_latency(path):
+    """
+    Read saved latency histograms
+
+    Args:
+        path (str): JSON file written by save_latency()
+
+    Returns:
+        dict: {monitor_id: histograms}, empty if the file is missing or unreadable
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f).get('monitors', {})
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read latency file {path}: {str(e)}")
+        return {}
+
+def save_latency(path, trackers):
+    """
+    Save latency histograms, keeping monitors saved by other processes (shards)
+
+    The read-merge-replace runs under an exclusive lock on path.lock, so
+    concurrent savers never overwrite each other's monitors.
+
+    Args:
+        path (str): JSON file to write
+        trackers (dict): {monitor_id: LatencyTracker}
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(f"{path}.lock", 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file is closed
+            monitors = load_latency(path)
+            for monitor_id, tracker in trackers.items():
+                monitors[monitor_id] = tracker.to_dict()
+            with open(tmp_path, 'w') as f:
+                json.dump({'monitors': monitors}, f)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"Could not write latency file {path}: {str(e)}")
+
+def build_slo_report(status, target_seconds, percentile_target=95):
+    """
+    Evaluate every monitor's alert latency against an SLO
+
+    A monitor breaches when fewer than percentile_target percent of its alerts
+    in the window were delivered within target_seconds of the (estimated)
+    change; undelivered alerts count as late.
+
+    Args:
+        status (dict): get_status() of any monitoring service; each monitor
+            entry carries the 'latency' snapshot of its tracker
+        target_seconds (float): Change-to-delivery target
+        percentile_target (float): Percentage of alerts that must meet the target
+
+    Returns:
+        dict: Per-monitor summaries, the breaching monitor ids and overall totals
+    """
+    report = {
+        'target_seconds': target_seconds,
+        'percentile': percentile_target,
+        'window_days': None,
+        'monitors': {}
+    }
+    totals = {stage: {} for stage in STAGES}
+    total_undelivered = 0
+
+    for monitor_id, monitor in (status.get('monitors') or {}).items():
+        latency = monitor.get('latency')
+        if not latency:
+            continue
+        stages = latency.get('stages', {})
+        alerts = stages.get('alert', {})
+        undelivered = latency.get('undelivered', 0)
+        alert_count = sum(alerts.values()) + undelivered
+        within = count_within(alerts, target_seconds)
+        compliance = within / alert_count if alert_count else None
+        report['window_days'] = latency.get('window_days')
+        report['monitors'][monitor_id] = {
+            'alerts': alert_count,
+            'undelivered': undelivered,
+            'within_target': round(compliance, 4) if compliance is not None else None,
+            'breaching': compliance is not None and compliance < percentile_target / 100,
+            'stages': {stage: summarize(stages.get(stage, {})) for stage in STAGES},
+            'last_event': latency.get('last_event')
+        }
+        for stage in STAGES:
+            merge_buckets(totals[stage], stages.get(stage, {}))
+        total_undelivered += undelivered
+
+    report['breaching'] = sorted(
+        monitor_id for monitor_id, entry in report['monitors'].items() if entry['breaching']
+    )
+    alert_count = sum(totals['alert'].values()) + total_undelivered
+    report['totals'] = {
+        'alerts': alert_count,
+        'undelivered': total_undelivered,
+        'within_target': (round(count_within(totals['alert'], target_seconds) / alert_count, 4)
+                          if alert_count else None),
+        'stages': {stage: summarize(totals[stage]) for stage in STAGES}
+    }
+    return report
@@ -0,0 +1,313 @@
+"""
+Lease-based monitor ownership for multi-node deployments of the Google Spreadsheet Monitor
+Each monitor is polled only by the node holding its lease in a shared
+coordination backend; leases that are not renewed expire and are taken over.
+"""
+import logging
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from app.monitor import MonitoringService
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseBackend:
+    """Base class for coordination backends storing leases and node heartbeats"""
+
+    def acquire(self, resource, owner, ttl):
+        """
+        Acquire or renew a lease
+
+        Args:
+            resource (str): Leased resource (a monitor id)
+            owner (str): Node requesting the lease
+            ttl (float): Lease duration in seconds
+
+        Returns:
+            bool: True if the owner now holds the lease
+        """
+        raise NotImplementedError("Subclasses must implement acquire()")
+
+    def release(self, resource, owner):
+        """Release a lease if held by owner"""
+        raise NotImplementedError("Subclasses must implement release()")
+
+    def owners(self):
+        """Return {resource: owner} for all unexpired leases"""
+        raise NotImplementedError("Subclasses must implement owners()")
+
+    def heartbeat(self, node_id, ttl):
+        """Record that a node is alive for the next ttl seconds"""
+        raise NotImplementedError("Subclasses must implement heartbeat()")
+
+    def live_nodes(self):
+        """Return the ids of nodes with an unexpired heartbeat"""
+        raise NotImplementedError("Subclasses must implement live_nodes()")
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """Lease backend on a SQLite file, for single-host clusters and local testing"""
+
+    def __init__(self, path, busy_timeout=1.0):
+        """
+        Initialize the backend
+
+        Args:
+            path (str): Path of the SQLite database file
+            busy_timeout (float): Seconds an operation waits for another node's write lock;
+                keep it below the lease renew interval so a blocked renewal fails in time
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "resource TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS nodes ("
+            "node_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+
+    def acquire(self, resource, owner, ttl):
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO leases (resource, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(resource) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (resource, owner, now + ttl, now)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, resource, owner):
+        with self.lock:
+            self.conn.execute("DELETE FROM leases WHERE resource = ? AND owner = ?", (resource, owner))
+
+    def owners(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT resource, owner FROM leases WHERE expires_at >= ?", (time.time(),)
+            ).fetchall()
+        return dict(rows)
+
+    def heartbeat(self, node_id, ttl):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO nodes (node_id, expires_at) VALUES (?, ?) "
+                "ON CONFLICT(node_id) DO UPDATE SET expires_at = excluded.expires_at",
+                (node_id, time.time() + ttl)
+            )
+
+    def live_nodes(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT node_id FROM nodes WHERE expires_at >= ?", (time.time(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+# Available coordination backends, keyed by the 'cluster_backend' config value
+LEASE_BACKENDS = {
+    'sqlite': lambda config: SQLiteLeaseBackend(config['cluster_db'], busy_timeout=_renew_interval(config) / 2),
+}
+
+def _renew_interval(config):
+    """Seconds between lease renewals (a third of the lease TTL unless configured)"""
+    return config.get('lease_renew_interval') or config.get('lease_ttl', 6) / 3
+
+def create_lease_backend(config):
+    """
+    Build the coordination backend named by config['cluster_backend']
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        LeaseBackend: The configured backend
+    """
+    name = config.get('cluster_backend', 'sqlite')
+    if name not in LEASE_BACKENDS:
+        raise ValueError(f"Unknown cluster backend: {name}")
+    return LEASE_BACKENDS[name](config)
+
+
+class ClusterMonitoringService(MonitoringService):
+    """
+    MonitoringService that polls only the monitors whose lease this node holds.
+
+    A lease thread, independent of the polling loop, heartbeats the node,
+    renews owned leases, takes over expired ones up to a fair share of the
+    monitors (ceil(monitors / live nodes)) and releases any surplus so load
+    rebalances as nodes join.
+
+    A lease is only trusted until lease_ttl minus a safety margin after this
+    node last acquired or renewed it: once a renewal fails or stalls, the node
+    stops polling those monitors before another node can take them over.
+    """
+
+    def __init__(self, config, backend=None):
+        """
+        Initialize the cluster member
+
+        Args:
+            config (dict): Configuration dictionary
+            backend (LeaseBackend): Coordination backend (built from config if omitted)
+        """
+        super().__init__(config)
+        self.node_id = config.get('node_id') or f"{socket.gethostname()}-{os.getpid()}"
+        self.backend = backend or create_lease_backend(config)
+        self.lease_ttl = config.get('lease_ttl', 6)
+        self.renew_interval = _renew_interval(config)
+        # Leases are trusted for lease_ttl - lease_margin after they were (re)acquired
+        self.lease_margin = config.get('lease_margin', self.lease_ttl / 6)
+        self.owned = set()
+        self.renewed_at = {}  # monitor_id -> monotonic time the acquire that renewed it began
+        self.lease_lock = threading.Lock()
+        self.lease_thread = None
+        self.lease_stats = {
+            'acquired': 0,
+            'lost': 0,
+            'released': 0,
+            'last_cycle_seconds': 0.0,
+            'max_op_seconds': 0.0,
+            'total_op_seconds': 0.0,
+            'ops': 0
+        }
+
+    def start(self):
+        # Take leases first so the immediate check in start() covers owned monitors
+        if not self.is_active:
+            try:
+                self.refresh_leases()
+            except Exception as e:
+                logger.error(f"Error acquiring initial leases: {str(e)}")
+        started = super().start()
+        if started:
+            self.lease_thread = threading.Thread(target=self._lease_loop, daemon=True)
+            self.lease_thread.start()
+        return started
+
+    def stop(self):
+        stopped = super().stop()
+        if stopped:
+            if self.lease_thread and self.lease_thread.is_alive():
+                self.lease_thread.join(timeout=5)
+            self._release_all()
+        return stopped
+
+    def _timed(self, operation, *args):
+        started = time.perf_counter()
+        try:
+            return operation(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.lease_stats['ops'] += 1
+            self.lease_stats['total_op_seconds'] += elapsed
+            self.lease_stats['max_op_seconds'] = max(self.lease_stats['max_op_seconds'], elapsed)
+
+    def _lease_loop(self):
+        """Renew, acquire and rebalance leases until the service stops"""
+        logger.info(f"Lease loop started for node {self.node_id}")
+        while not self.stop_event.is_set():
+            try:
+                self.refresh_leases()
+            except Exception as e:
+                logger.error(f"Error refreshing leases: {str(e)}; pausing owned monitors")
+                self._forget_leases()
+            if self.stop_event.wait(self.renew_interval):
+                break
+        logger.info("Lease loop stopped")
+
+    def refresh_leases(self):
+        """Run one heartbeat / renew / acquire / rebalance cycle"""
+        started = time.perf_counter()
+        self._timed(self.backend.heartbeat, self.node_id, self.lease_ttl)
+        live_nodes = max(1, len(self._timed(self.backend.live_nodes)))
+        fair_share = math.ceil(len(self.monitors) / live_nodes)
+
+        owned = set()
+        renewed_at = {}
+        for monitor_id in sorted(self.monitors):
+            held = monitor_id in self.owned
+            if not held and len(owned) >= fair_share:
+                continue
+            # The lease runs from (at the latest) when the request was made
+            requested = time.monotonic()
+            if self._timed(self.backend.acquire, monitor_id, self.node_id, self.lease_ttl):
+                owned.add(monitor_id)
+                renewed_at[monitor_id] = requested
+                if not held:
+                    self.lease_stats['acquired'] += 1
+                    logger.info(f"Node {self.node_id} acquired monitor {monitor_id}")
+            elif held:
+                self.lease_stats['lost'] += 1
+                logger.warning(f"Node {self.node_id} lost the lease on monitor {monitor_id}")
+
+        # Hand back surplus leases so newly joined nodes can pick them up
+        for monitor_id in sorted(owned)[fair_share:]:
+            self._timed(self.backend.release, monitor_id, self.node_id)
+            owned.discard(monitor_id)
+            self.lease_stats['released'] += 1
+
+        elapsed = time.perf_counter() - started
+        self.lease_stats['last_cycle_seconds'] = elapsed
+        if elapsed >= self.lease_ttl - self.lease_margin:
+            logger.warning(f"Lease renewal took {elapsed:.1f} s, longer than the lease is trusted; "
+                           "pausing owned monitors")
+            self._forget_leases()
+            return
+        with self.lease_lock:
+            self.owned = owned
+            self.renewed_at = {monitor_id: renewed_at[monitor_id] for monitor_id in owned}
+
+    def _forget_leases(self):
+        """Stop treating any lease as held, without touching the backend"""
+        with self.lease_lock:
+            self.owned = set()
+            self.renewed_at = {}
+
+    def _release_all(self):
+        with self.lease_lock:
+            owned, self.owned = self.owned, set()
+            self.renewed_at = {}
+        for monitor_id in owned:
+            try:
+                self.backend.release(monitor_id, self.node_id)
+            except Exception as e:
+                logger.error(f"Error releasing lease on {monitor_id}: {str(e)}")
+
+    def _checkable_monitors(self):
+        """Return only the monitors whose lease this node holds and can still trust"""
+        trusted_since = time.monotonic() - (self.lease_ttl - self.lease_margin)
+        with self.lease_lock:
+            owned = {monitor_id for monitor_id, renewed in self.renewed_at.items() if renewed > trusted_since}
+        return [(monitor_id, monitor) for monitor_id, monitor in self.monitors.items() if monitor_id in owned]
+
+    def get_status(self):
+        """
+        Get the status including this node's ownership and lease metrics
+
+        Returns:
+            dict: MonitoringService status plus a 'cluster' entry
+        """
+        status = super().get_status()
+        stats = dict(self.lease_stats)
+        ops = stats.pop('ops')
+        total = stats.pop('total_op_seconds')
+        stats['avg_op_seconds'] = total / ops if ops else 0.0
+        with self.lease_lock:
+            owned = sorted(self.owned)
+        status['cluster'] = {
+            'node_id': self.node_id,
+            'owned_monitors': owned,
+            'lease_ttl': self.lease_ttl,
+            'lease_stats': stats
+        }
+        return status
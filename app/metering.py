@@ -0,0 +1,126 @@
+"""
+HTTP transfer metering for the Google Spreadsheet Monitor
+Counts the bytes requests actually send and receive (headers and still
+compressed bodies) beneath httplib2, which decodes gzip transparently and
+rewrites Content-Length to the decoded size.
+"""
+import threading
+
+import httplib2
+
+# Per-thread byte counters; each thread has its own connections (see sheets_client._thread_http)
+_counters = threading.local()
+
+
+def _count(name, size):
+    setattr(_counters, name, getattr(_counters, name, 0) + size)
+
+
+def thread_transfer():
+    """
+    Bytes moved by the calling thread's metered connections so far
+
+    Returns:
+        tuple: (bytes sent, bytes received)
+    """
+    return getattr(_counters, 'sent', 0), getattr(_counters, 'received', 0)
+
+
+class _CountingFile:
+    """Response stream counting the bytes read from it"""
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def read(self, *args):
+        data = self.fp.read(*args)
+        _count('received', len(data))
+        return data
+
+    def read1(self, *args):
+        data = self.fp.read1(*args)
+        _count('received', len(data))
+        return data
+
+    def readline(self, *args):
+        data = self.fp.readline(*args)
+        _count('received', len(data))
+        return data
+
+    def readinto(self, buffer):
+        size = self.fp.readinto(buffer)
+        _count('received', size or 0)
+        return size
+
+    def __getattr__(self, name):
+        return getattr(self.fp, name)
+
+
+class _CountingSocket:
+    """Socket counting the bytes sent through it and read from its response streams"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def sendall(self, data, *args):
+        _count('sent', len(data))
+        return self.sock.sendall(data, *args)
+
+    def makefile(self, *args, **kwargs):
+        return _CountingFile(self.sock.makefile(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class MeteredHTTPConnection(httplib2.HTTPConnectionWithTimeout):
+    def connect(self):
+        super().connect()
+        self.sock = _CountingSocket(self.sock)
+
+
+class MeteredHTTPSConnection(httplib2.HTTPSConnectionWithTimeout):
+    def connect(self):
+        super().connect()
+        self.sock = _CountingSocket(self.sock)
+
+
+class MeteredHttp:
+    """
+    httplib2.Http wrapper totalling the bytes its requests transfer
+
+    New connections are opened with counting sockets. Wrap the thread's Http
+    for each fetch and read the totals afterwards; everything else is
+    delegated to the wrapped object.
+    """
+
+    def __init__(self, http):
+        """
+        Args:
+            http: The httplib2.Http (or compatible wrapper) to send requests with
+        """
+        self.http = http
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0  # as transferred: headers plus the (compressed) body
+        self.bytes_decoded = 0  # bodies after decompression
+        self.compressed = 0  # responses that arrived gzip/deflate encoded
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=httplib2.DEFAULT_MAX_REDIRECTS,
+                connection_type=None):
+        if connection_type is None:
+            connection_type = MeteredHTTPSConnection if uri.startswith('https:') else MeteredHTTPConnection
+        sent, received = thread_transfer()
+        response, content = self.http.request(uri, method, body=body, headers=headers, redirections=redirections,
+                                              connection_type=connection_type)
+        after_sent, after_received = thread_transfer()
+        self.requests += 1
+        self.bytes_sent += after_sent - sent
+        self.bytes_received += after_received - received
+        self.bytes_decoded += len(content or b'')
+        if '-content-encoding' in response:  # httplib2's record of a decoded body
+            self.compressed += 1
+        return response, content
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
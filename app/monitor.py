@@ -2,111 +2,315 @@
 Core monitoring logic for the Google Spreadsheet Cell Monitor
 Handles checking the spreadsheet and triggering notifications.
 """
+import itertools
 import logging
-import time
 import threading
-from datetime import datetime
 
+from app.auth import get_auth_stats
+from app.clock import SYSTEM_CLOCK
+from app.events import CheckEvent, EventBus
 from app.sheets_client import SheetsClient
+from app.fetch_cache import get_shared_fetcher
+from app.history_store import get_history_store
+from app.latency import LatencyTracker, load_latency, save_latency
 from app.notifier import NotificationManager
+from app.records import HistoryBuffer, format_epoch
+from app.registry import get_monitor_registry
+from app.schedule import PollingSchedule, compile_schedule
 
 logger = logging.getLogger(__name__)
 
+# Monitor settings that require a new Sheets client when they change
+FETCH_KEYS = ('spreadsheet_id', 'range_name', 'api_key', 'range_cache_ttl', 'sheets_api_endpoint',
+              'service_account_file', 'token_refresh_margin', 'fetch_timeout')
+# Settings that define when a monitor is polled
+SCHEDULE_KEYS = ('active_windows', 'holidays')
+
+def is_departure(cell_value):
+    """
+    Whether a (normalized, upper-case) cell value should trigger an alert
+    
+    Args:
+        cell_value (str): The cell value
+        
+    Returns:
+        bool: True for departures such as 'DEPARTED', but not 'NOT DEPARTED'
+    """
+    return 'DEPARTED' in cell_value and 'NOT' not in cell_value
+
+def diff_monitor_configs(old_configs, new_configs):
+    """
+    Compare two lists of per-monitor configurations by monitor id
+
+    Args:
+        old_configs (list): Configurations currently running
+        new_configs (list): Configurations to apply
+
+    Returns:
+        tuple: (added ids, removed ids, {changed id: set of changed keys})
+    """
+    old = {c['id']: c for c in old_configs}
+    new = {c['id']: c for c in new_configs}
+    added = [monitor_id for monitor_id in new if monitor_id not in old]
+    removed = [monitor_id for monitor_id in old if monitor_id not in new]
+    changed = {}
+    for monitor_id in new:
+        if monitor_id in old and old[monitor_id] != new[monitor_id]:
+            keys = set(old[monitor_id]) | set(new[monitor_id])
+            changed[monitor_id] = {k for k in keys if old[monitor_id].get(k) != new[monitor_id].get(k)}
+    return added, removed, changed
+
+def _record_history(event):
+    """'history' subscriber: persist the outcome to the monitor's history store"""
+    store = event.monitor.history_store
+    if store:
+        store.append(event.monitor_id, event.at, event.kind, event.message)
+
+def _deliver_alert(event):
+    """'notifications' subscriber: send the alert, then report the delivery"""
+    monitor = event.monitor
+    delivered = monitor._send_notification(event.message)
+    monitor.events.publish(CheckEvent(
+        'delivered', monitor, event.value, event.message, is_new=event.is_new, at=event.at,
+        fetched_at=event.fetched_at, changed_after=event.changed_after, matched_at=event.matched_at,
+        delivered_at=monitor.clock.time() if delivered else None
+    ))
+
+def _record_latency(event):
+    """'metrics' subscriber: record change-to-alert latency for new values"""
+    if event.is_new and event.changed_after is not None:
+        event.monitor.latency.record_change(event.value, event.changed_after, event.fetched_at,
+                                            event.matched_at, event.delivered_at)
+
+def create_event_bus(config=None, synchronous=False):
+    """
+    Build an event bus with the standard check-outcome subscribers
+    
+    Args:
+        config (dict): Configuration with optional 'event_queue_size' and 'notification_workers'
+        synchronous (bool): Handle events inline (see EventBus)
+        
+    Returns:
+        EventBus: Bus with 'notifications', 'history' and 'metrics' subscribers
+    """
+    config = config or {}
+    queue_size = config.get('event_queue_size', 10000)
+    bus = EventBus(synchronous)
+    # Several workers, so one slow notification endpoint does not hold up other
+    # monitors' alerts; unbounded, since a dropped departure is a lost alert
+    bus.subscribe('notifications', _deliver_alert, kinds=('departed',), maxsize=None,
+                  workers=config.get('notification_workers', 4))
+    bus.subscribe('history', _record_history, kinds=('normal', 'departed', 'error'), maxsize=queue_size)
+    bus.subscribe('metrics', _record_latency, kinds=('normal', 'delivered'), maxsize=queue_size)
+    return bus
+
+_inline_events = None
+
+def get_inline_event_bus():
+    """The synchronous bus shared by monitors created outside a MonitoringService"""
+    global _inline_events
+    if _inline_events is None:
+        _inline_events = create_event_bus(synchronous=True)
+    return _inline_events
+
+def _schedule_of(monitor):
+    """A monitor's PollingSchedule, or None if it polls around the clock"""
+    schedule = getattr(monitor, 'schedule', None)
+    return schedule if isinstance(schedule, PollingSchedule) else None
+
+def expand_monitor_configs(config):
+    """
+    Expand the configuration into one configuration per monitor
+
+    A config without a 'monitors' list describes a single monitor with id
+    'default'. Each entry of 'monitors' overrides the top-level settings
+    (spreadsheet_id, range_name, ...) for that monitor. Monitors stored in the
+    'monitor_registry' database follow those from the configuration files.
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        list: Per-monitor configuration dicts, each with an 'id' key
+    """
+    base = {key: value for key, value in config.items() if key != 'monitors'}
+    specs = list(config.get('monitors') or [])
+    registry = get_monitor_registry(config.get('monitor_registry'))
+    registered = registry.monitors() if registry else []
+    if registered and not specs and base.get('spreadsheet_id'):
+        specs = [{'id': base.get('id', 'default')}]  # keep the single configured monitor
+    if not specs and not registered:
+        return [dict(base, id=base.get('id', 'default'))]
+
+    monitor_configs = []
+    configured_ids = set()
+    for index, spec in enumerate(specs + registered):
+        monitor_config = dict(base)
+        monitor_config.update(spec)
+        if not monitor_config.get('id'):
+            monitor_config['id'] = f"{monitor_config.get('spreadsheet_id')}/{monitor_config.get('range_name')}"
+        if index >= len(specs) and monitor_config['id'] in configured_ids:
+            logger.warning(f"Registered monitor {monitor_config['id']} is shadowed by config.yaml")
+            continue
+        configured_ids.add(monitor_config['id'])
+        monitor_configs.append(monitor_config)
+    return monitor_configs
+
 class SheetMonitor:
     """
     Main monitoring class that checks the spreadsheet cell for changes
     and triggers notifications based on the content.
     """
     
-    def __init__(self, config):
+    def __init__(self, config, sheets_client=None, notification_manager=None, clock=None, events=None):
         """
         Initialize the sheet monitor
         
         Args:
             config (dict): Configuration dictionary
+            sheets_client: Client to read the cell with (default: a SheetsClient for config)
+            notification_manager: Where alerts go (default: a NotificationManager for config)
+            clock: Time source for timestamps (default: the system clock)
+            events (EventBus): Where check outcomes are published (default: a shared
+                synchronous bus, so alerts are sent before check_cell returns)
         """
         self.config = config
-        self.sheets_client = SheetsClient(config)
-        self.notification_manager = NotificationManager(config)
+        self.monitor_id = config.get('id', 'default')
+        self.clock = clock or SYSTEM_CLOCK
+        self.sheets_client = sheets_client or SheetsClient(config)
+        self.notification_manager = notification_manager or NotificationManager(config)
         self.last_check_result = "No check performed yet"
-        self.last_check_time = ""
-        self.status_history = []  # List of (timestamp, status, message) tuples
+        self.last_check_at = None  # epoch seconds of the last check
         self.max_history = 50  # Maximum number of history entries to keep
+        self.status_history = HistoryBuffer(self.max_history)  # (timestamp, status, message) entries
+        self.history_store = get_history_store(config.get('history_db'))
+        self.events = events or get_inline_event_bus()
+        self.schedule = compile_schedule(config)  # None: poll around the clock
+        self.latency = LatencyTracker(
+            self.clock,
+            retention_days=config.get('latency_retention_days', 35),
+            window_days=config.get('slo_window_days', 7)
+        )
+    
+    @property
+    def last_check_time(self):
+        """The last check time as displayed, e.g. 'Last Checked: 2024-01-01 07:00:00'"""
+        if self.last_check_at is None:
+            return ""
+        return f"Last Checked: {format_epoch(self.last_check_at)}"
+    
+    def reconfigure(self, config, changed_keys):
+        """
+        Apply a new configuration in place, keeping history and last results
+        
+        Args:
+            config (dict): The monitor's new configuration
+            changed_keys (set): Keys whose values differ from the current configuration
+        """
+        self.config = config
+        if changed_keys & set(FETCH_KEYS):
+            old_client = self.sheets_client
+            self.sheets_client = SheetsClient(config)
+            old_client.close()
+            # Same cell, new client: keep change detection so we do not re-alert
+            if not changed_keys & {'spreadsheet_id', 'range_name'}:
+                self.sheets_client.last_cell_value = old_client.last_cell_value
+        else:
+            self.sheets_client.config = config
+        if any(key.startswith('notification') or key.startswith('ntfy') for key in changed_keys):
+            self.notification_manager = NotificationManager(config)
+        if 'history_db' in changed_keys:
+            self.history_store = get_history_store(config.get('history_db'))
+        if changed_keys & set(SCHEDULE_KEYS):
+            self.schedule = compile_schedule(config)
+    
+    def prewarm(self):
+        """Prepare the client shortly before a polling window opens"""
+        prewarm = getattr(self.sheets_client, 'prewarm', None)
+        if prewarm is None:
+            return
+        try:
+            prewarm()
+        except Exception as e:
+            logger.warning("Prewarming monitor %s failed: %s", self.monitor_id, e)
     
     def check_cell(self):
         """
         Check the cell in the spreadsheet and process its value.
         
+        The in-memory status is updated here; everything else (history store,
+        notifications, latency metrics) consumes the published CheckEvent.
+        
         Returns:
-            bool: True if a notification was triggered, False otherwise
+            bool: True if a departure was published for notification, False otherwise
         """
         try:
             # Get the cell value from the Google Sheets API
+            fetch_started = self.clock.time()
             result = self.sheets_client.get_cell_value_with_retry()
+            fetched_at = self.clock.time()
             cell_value = result.get('value', '')
             is_new = result.get('is_new', False)
-            timestamp = result.get('timestamp', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
             
             # Update last check time
-            self.last_check_time = f"Last Checked: {timestamp}"
+            self.last_check_at = fetched_at
             
             # Check for errors
             if 'error' in result:
                 error_msg = f"Error checking spreadsheet: {result['error']}"
-                logger.error(error_msg)
-                self.last_check_result = error_msg
-                self._add_history_entry('error', error_msg)
+                logger.error("Error checking spreadsheet: %s", result['error'])
+                self._publish('error', error_msg, fetched_at=fetched_at)
                 return False
             
+            # A change seen now happened after the previous successful fetch
+            changed_after = self.latency.record_fetch(fetch_started, fetched_at)
+            
             # If value hasn't changed and it's not the first check, just return
             if not is_new and len(self.status_history) > 0:
                 message = f"Current value: '{cell_value}'"
-                logger.debug(message)
-                self.last_check_result = message
+                logger.debug("Current value: '%s'", cell_value)
+                self._publish('unchanged', message, cell_value, fetched_at=fetched_at)
                 return False
             
             # Process the cell value
-            if 'DEPARTED' in cell_value and 'NOT' not in cell_value:
+            if is_departure(cell_value):
                 message = f"*** {cell_value} ***"
-                logger.info(message)
-                self.last_check_result = message
-                
-                # Add to history
-                self._add_history_entry('departed', message)
-                
-                # Send notification
-                self._send_notification(message)
+                logger.info("*** %s ***", cell_value)
+                self._publish('departed', message, cell_value, is_new, fetched_at, changed_after,
+                              matched_at=self.clock.time())
                 return True
             else:
                 message = f"Current Status: '{cell_value}'"
-                logger.info(message)
-                self.last_check_result = message
-                
-                # Add to history
-                self._add_history_entry('normal', message)
+                logger.info("Current Status: '%s'", cell_value)
+                self._publish('normal', message, cell_value, is_new, fetched_at, changed_after)
                 return False
                 
         except Exception as e:
             error_msg = f"Error checking spreadsheet: {str(e)}"
-            logger.error(error_msg)
-            self.last_check_result = error_msg
-            self._add_history_entry('error', error_msg)
+            logger.error("Error checking spreadsheet: %s", e)
+            self._publish('error', error_msg)
             return False
     
-    def _add_history_entry(self, status, message):
+    def _publish(self, kind, message, value='', is_new=False, fetched_at=None, changed_after=None,
+                 matched_at=None):
         """
-        Add an entry to the status history
+        Record a check outcome in memory and publish it to the event bus
         
         Args:
-            status (str): Status type ('normal', 'departed', 'error')
+            kind (str): Outcome ('unchanged', 'normal', 'departed', 'error')
             message (str): The status message
+            value (str): The cell value
+            is_new (bool): Whether the value changed since the previous check
+            fetched_at (float): Epoch seconds the value was fetched
+            changed_after (float): Epoch seconds after which the value changed
+            matched_at (float): Epoch seconds a departure was recognized
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.status_history.append((timestamp, status, message))
-        
-        # Trim history if needed
-        if len(self.status_history) > self.max_history:
-            self.status_history = self.status_history[-self.max_history:]
+        timestamp = self.clock.time()
+        self.last_check_result = message
+        if kind != 'unchanged':
+            self.status_history.append(timestamp, kind, message)  # the buffer drops the oldest entry
+        self.events.publish(CheckEvent(kind, self, value, message, is_new, timestamp, fetched_at,
+                                       changed_after, matched_at))
     
     def _send_notification(self, message):
         """
@@ -130,7 +334,7 @@ class SheetMonitor:
         Returns:
             list: List of recent (timestamp, status, message) tuples
         """
-        return self.status_history[-limit:] if self.status_history else []
+        return self.status_history.recent(limit)
 
 
 class MonitoringService:
@@ -138,19 +342,65 @@ class MonitoringService:
     Service that manages the monitoring thread and scheduling
     """
     
-    def __init__(self, config):
+    def __init__(self, config, clock=None, monitor_factory=None):
         """
         Initialize the monitoring service
         
         Args:
             config (dict): Configuration dictionary
+            clock: Time source for scheduling (default: the system clock)
+            monitor_factory (callable): Builds a monitor from its config (default: SheetMonitor)
         """
         self.config = config
-        self.polling_interval = config.get('polling_interval', 30)
-        self.monitor = SheetMonitor(config)
+        self.clock = clock or SYSTEM_CLOCK
+        self.monitor_factory = monitor_factory
+        self.polling_interval = config.get('polling_interval') or 30
+        # Check outcomes fan out to notifications, history and metrics off the polling thread
+        self.events = create_event_bus(config)
+        self.monitors = {}
+        for monitor_config in expand_monitor_configs(config):
+            self.monitors[monitor_config['id']] = self._create_monitor(monitor_config)
+        # The first monitor backs the single-monitor status fields
+        self.monitor = next(iter(self.monitors.values()))
         self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.pending_changes = set()
+        self.pending_lock = threading.Lock()
         self.thread = None
         self.is_active = False
+        # Watchdog state: a stalled loop thread is abandoned by bumping the
+        # generation, and a fresh loop takes over
+        self.watchdog_timeout = config.get('watchdog_timeout', 20)
+        self.watchdog_thread = None
+        self.loop_lock = threading.Lock()
+        self.generation = 0
+        self.loop_deadline = None  # monotonic time by which the loop must report again
+        self.loop_heartbeat = None  # epoch seconds the loop last reported
+        self.restarts = 0
+        self.in_flight = {}  # monitor_id -> monotonic time its check started
+        self.stalled = {}  # monitor_id -> monotonic time of a check abandoned by the watchdog
+        self.heartbeats = {}  # monitor_id -> epoch seconds its last check finished
+        self.config_lock = threading.Lock()
+        self.reschedule = False
+        self.last_poll = None
+        self.next_poll = None
+        self.prewarm_seconds = config.get('prewarm_seconds', 60)
+        self.prewarm_at = None  # monotonic time to prewarm before a window opens
+        # Bumped whenever monitor results or the running state may have changed
+        self._versions = itertools.count(1)
+        self.state_version = next(self._versions)
+        self.latency_file = config.get('latency_file')
+        self.latency_save_interval = config.get('latency_save_interval', 300)
+        self.latency_saved_at = self.clock.monotonic()
+        if self.latency_file:
+            saved = load_latency(self.latency_file)
+            for monitor_id, monitor in self.monitors.items():
+                if monitor_id in saved:
+                    monitor.latency.load(saved[monitor_id])
+        self.push_channels = None
+        if config.get('push_mode'):
+            from app.push import PushChannelManager
+            self.push_channels = PushChannelManager(config, [m.config for m in self.monitors.values()])
     
     def start(self):
         """
@@ -165,18 +415,34 @@ class MonitoringService:
         
         logger.info(f"Starting monitoring service with {self.polling_interval} second interval")
         self.stop_event.clear()
+        self.wake_event.clear()
         self.is_active = True
         
+        if self.push_channels:
+            self.push_channels.start()
+        
+        self._state_changed()
+        
         # Run an immediate check
-        self.monitor.check_cell()
+        self._check_all()
         
         # Start the monitoring thread
-        self.thread = threading.Thread(target=self._monitoring_loop)
-        self.thread.daemon = True
-        self.thread.start()
+        with self.loop_lock:
+            self._start_loop()
+        if self.watchdog_timeout:
+            self.watchdog_thread = threading.Thread(target=self._watchdog_loop, name='watchdog', daemon=True)
+            self.watchdog_thread.start()
         
         return True
     
+    def _start_loop(self, check_first=False):
+        """Start a monitoring loop thread under a new generation (caller holds loop_lock)"""
+        self.generation += 1
+        self.loop_deadline = self.clock.monotonic() + self.polling_interval + self.watchdog_timeout
+        self.thread = threading.Thread(target=self._monitoring_loop, args=(self.generation, check_first),
+                                       name=f"monitor-loop-{self.generation}", daemon=True)
+        self.thread.start()
+    
     def stop(self):
         """
         Stop the monitoring service if it's running
@@ -190,43 +456,441 @@ class MonitoringService:
         
         logger.info("Stopping monitoring service")
         self.stop_event.set()
+        self.wake_event.set()
         self.is_active = False
+        self._state_changed()
+        
+        if self.push_channels:
+            self.push_channels.stop()
         
+        if self.watchdog_thread:
+            self.watchdog_thread.join(timeout=5)
+            self.watchdog_thread = None
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5)
-            
+            if self.thread.is_alive():
+                with self.loop_lock:
+                    # Abandon it: the thread exits as soon as its blocked call returns
+                    self.generation += 1
+                    self.stalled.update(self.in_flight)
+                    busy = sorted(self.in_flight)
+                logger.warning(f"Monitoring loop did not stop within 5 s (busy with {busy}); abandoning it")
+        
+        self.flush()
         return True
     
-    def _monitoring_loop(self):
+    def flush(self, timeout=5):
+        """
+        Let queued alerts, history writes and latency records land, then save latency
+        
+        Args:
+            timeout (float): Seconds to wait for the event subscribers at most
+            
+        Returns:
+            bool: True if every subscriber caught up in time
+        """
+        drained = self.events.flush(timeout=timeout)
+        if not drained:
+            logger.warning(f"Event subscribers did not catch up within {timeout} s: %s", {
+                name: stats['queued'] for name, stats in self.events.get_stats()['subscribers'].items()
+            })
+        self.save_latency()
+        return drained
+    
+    def save_latency(self):
+        """Write the monitors' latency histograms to latency_file, if configured"""
+        if self.latency_file:
+            save_latency(self.latency_file, {
+                monitor_id: monitor.latency for monitor_id, monitor in self._checkable_monitors()
+            })
+        self.latency_saved_at = self.clock.monotonic()
+    
+    def _create_monitor(self, monitor_config):
+        if self.monitor_factory:
+            return self.monitor_factory(monitor_config)
+        return SheetMonitor(monitor_config, events=self.events)
+    
+    def _monitoring_loop(self, generation=None, check_first=False):
         """
         Main monitoring loop that runs in a background thread
+        
+        Args:
+            generation (int): The loop's generation; it exits once the watchdog
+                has replaced it with a newer one
+            check_first (bool): Check every monitor before waiting for the first poll
         """
         logger.info("Monitoring loop started")
+        if check_first:
+            self._check_all(generation=generation)
+        self._reset_schedule()
         
-        while not self.stop_event.is_set():
+        while not self.stop_event.is_set() and self._is_current(generation):
             try:
-                # Wait for the specified interval or until stop is called
-                if self.stop_event.wait(self.polling_interval):
-                    break
-                
-                # Check the cell
-                self.monitor.check_cell()
-                
+                self._tick(generation)
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {str(e)}")
+                logger.error("Error in monitoring loop: %s", e)
                 # Continue the loop despite errors
         
         logger.info("Monitoring loop stopped")
     
+    def _is_current(self, generation):
+        return generation is None or generation == self.generation
+    
+    def _heartbeat(self, generation, deadline):
+        """
+        Record that the loop is alive and must report again before deadline (monotonic)
+        
+        Only a loop thread's own generation moves the deadline: a manual check
+        (generation None) must neither trip the watchdog during a long wait
+        nor hide a loop that is stuck.
+        """
+        if generation is not None and generation == self.generation:
+            self.loop_deadline = deadline
+            self.loop_heartbeat = self.clock.time()
+    
+    def _reset_schedule(self):
+        """Schedule the next poll one interval from now"""
+        self.last_poll = self.clock.monotonic()
+        self._schedule_poll(self.last_poll + self._poll_interval())
+    
+    def _schedule_poll(self, due):
+        """
+        Schedule the next poll at due, or when the first polling window opens after it
+        
+        A poll pushed to a window opening is preceded by a prewarm
+        prewarm_seconds earlier.
+        
+        Args:
+            due (float): Monotonic time the next poll is due by the polling interval
+        """
+        self.prewarm_at = None
+        offset = self.clock.time() - self.clock.monotonic()
+        opens = self._next_window_open(due + offset)
+        if opens is None or opens <= due + offset:
+            self.next_poll = due
+            return
+        self.next_poll = opens - offset
+        if self.prewarm_seconds:
+            self.prewarm_at = max(self.clock.monotonic(), self.next_poll - self.prewarm_seconds)
+        logger.info(f"No polling window open; sleeping until {format_epoch(opens)}")
+    
+    def _next_window_open(self, t):
+        """
+        Find when the first unpaused monitor's polling window opens
+        
+        Args:
+            t (float): Epoch seconds
+            
+        Returns:
+            float: Epoch seconds (t if any monitor polls at t), or None if no window ever opens
+        """
+        earliest = None
+        for _, monitor in self._checkable_monitors():
+            if monitor.config.get('paused') is True:
+                continue
+            schedule = _schedule_of(monitor)
+            if schedule is None:
+                return t
+            opens = schedule.next_open(t)
+            if opens is not None and (earliest is None or opens < earliest):
+                earliest = opens
+                if earliest <= t:
+                    break
+        return earliest
+    
+    def _prewarm(self):
+        """Prewarm the monitors whose window opens at the next poll"""
+        opens = self.next_poll + self.clock.time() - self.clock.monotonic()
+        for _, monitor in self._checkable_monitors():
+            schedule = _schedule_of(monitor)
+            if schedule is not None and schedule.is_active(opens) and monitor.config.get('paused') is not True:
+                monitor.prewarm()
+    
+    def _tick(self, generation=None):
+        """
+        Run one step of the monitoring loop
+        
+        Sleeps until the next scheduled poll, waking early for push
+        notifications to check only the spreadsheets that changed, and to
+        prewarm clients before a polling window opens.
+        
+        Args:
+            generation (int): The calling loop's generation (None outside a loop thread)
+        """
+        # Wait for the next poll (or prewarm), a change notification, or stop
+        wake_at = self.next_poll if self.prewarm_at is None else min(self.next_poll, self.prewarm_at)
+        self._heartbeat(generation, max(wake_at, self.clock.monotonic()) + self.watchdog_timeout)
+        woken = self.clock.wait(self.wake_event, max(0.0, wake_at - self.clock.monotonic()))
+        if self.stop_event.is_set() or not self._is_current(generation):
+            return
+        
+        if woken:
+            self.wake_event.clear()
+            if self.reschedule:
+                # The interval or the monitors changed; re-time the pending poll from the last one
+                self.reschedule = False
+                self._schedule_poll(self.last_poll + self._poll_interval())
+            for spreadsheet_id in self._take_pending_changes():
+                self._check_all(spreadsheet_id=spreadsheet_id, generation=generation)
+            return
+        
+        if self.prewarm_at is not None and self.clock.monotonic() < self.next_poll:
+            self.prewarm_at = None
+            self._prewarm()
+            return
+        
+        # Check the cells
+        self._check_all(generation=generation)
+        if not self._is_current(generation):
+            return  # abandoned while checking; the schedule belongs to the new loop
+        self.last_poll = self.clock.monotonic()
+        self._schedule_poll(self.last_poll + self._poll_interval())
+        if self.latency_file and self.last_poll - self.latency_saved_at >= self.latency_save_interval:
+            self.save_latency()
+    
+    def _poll_interval(self):
+        """Seconds between scheduled polls; slower while push notifications are live"""
+        if self.push_channels and self.push_channels.is_live():
+            return self.config.get('push_fallback_interval', 600)
+        return self.polling_interval
+    
+    def _take_pending_changes(self):
+        with self.pending_lock:
+            pending, self.pending_changes = self.pending_changes, set()
+        return pending
+    
+    def notify_change(self, spreadsheet_id):
+        """
+        Request an immediate, uncached check of the monitors watching a spreadsheet
+        
+        Args:
+            spreadsheet_id (str): The spreadsheet reported as changed
+        """
+        with self.pending_lock:
+            self.pending_changes.add(spreadsheet_id)
+        get_shared_fetcher().invalidate(spreadsheet_id)
+        self.wake_event.set()
+    
+    def handle_push_notification(self, channel_id, token, resource_state):
+        """
+        Handle a Drive change notification delivered to the webhook
+        
+        Args:
+            channel_id (str): X-Goog-Channel-ID header
+            token (str): X-Goog-Channel-Token header
+            resource_state (str): X-Goog-Resource-State header
+            
+        Returns:
+            bool: True if the notification came from one of our channels
+        """
+        if not self.push_channels:
+            return False
+        spreadsheet_id = self.push_channels.resolve(channel_id, token)
+        if spreadsheet_id is None:
+            return False
+        if resource_state != 'sync':  # 'sync' only confirms a new channel
+            self.notify_change(spreadsheet_id)
+        return True
+    
+    def apply_config(self, config):
+        """
+        Apply a reloaded configuration to the running service
+        
+        Only monitors whose settings changed are touched: new monitors are
+        added, removed ones dropped, and changed ones reconfigured in place
+        (keeping their history). The monitors dict is replaced atomically, so
+        a poll in progress keeps iterating over a consistent snapshot.
+        
+        Args:
+            config (dict): The new configuration
+            
+        Returns:
+            dict: Summary with added, removed and changed monitor ids
+        """
+        with self.config_lock:
+            new_configs = expand_monitor_configs(config)
+            old_configs = [monitor.config for monitor in self.monitors.values()]
+            added, removed, changed = diff_monitor_configs(old_configs, new_configs)
+            new_by_id = {c['id']: c for c in new_configs}
+            
+            monitors = dict(self.monitors)
+            for monitor_id in removed:
+                monitors.pop(monitor_id).sheets_client.close()
+            for monitor_id, keys in changed.items():
+                monitors[monitor_id].reconfigure(new_by_id[monitor_id], keys)
+            for monitor_id in added:
+                monitors[monitor_id] = self._create_monitor(new_by_id[monitor_id])
+            # Keep the configured order
+            self.monitors = {c['id']: monitors[c['id']] for c in new_configs}
+            self.monitor = next(iter(self.monitors.values()))
+            
+            for key in ('port', 'host'):
+                if config.get(key) != self.config.get(key):
+                    logger.warning(f"Changing '{key}' requires a restart; keeping the running value")
+            self.config = config
+            self.watchdog_timeout = config.get('watchdog_timeout', self.watchdog_timeout)
+            
+            self.prewarm_seconds = config.get('prewarm_seconds', self.prewarm_seconds)
+            
+            polling_interval = config.get('polling_interval') or 30
+            if polling_interval != self.polling_interval or added or changed:
+                # A new interval, monitor or polling window can move the next poll
+                self.polling_interval = polling_interval
+                self.reschedule = True
+                self.wake_event.set()
+            
+            if self.push_channels and (added or removed or any('spreadsheet_id' in k for k in changed.values())):
+                self.push_channels.set_spreadsheets([c.get('spreadsheet_id') for c in new_configs])
+            self._state_changed()
+        
+        return {'added': added, 'removed': removed, 'changed': sorted(changed)}
+    
+    def reload_monitors(self):
+        """
+        Re-read the monitor registry and apply it to the running monitors
+        
+        Returns:
+            dict: Summary with added, removed and changed monitor ids
+        """
+        return self.apply_config(self.config)
+    
+    def _checkable_monitors(self):
+        """Return (monitor_id, monitor) pairs this service is responsible for polling"""
+        return list(self.monitors.items())
+    
+    def _check_all(self, spreadsheet_id=None, generation=None, manual=False):
+        """
+        Check every monitor, isolating failures so one monitor cannot starve the rest
+        
+        Monitors whose previous check is still stuck (see _watchdog_check) are
+        skipped until that check returns, and monitors outside their polling
+        windows unless the check is manual.
+        
+        Args:
+            spreadsheet_id (str): Only check monitors watching this spreadsheet
+            generation (int): The calling loop's generation; stop early once it is replaced
+            manual (bool): Requested by a user; ignores polling windows
+            
+        Returns:
+            bool: True if any monitor triggered a notification
+        """
+        triggered = False
+        now = self.clock.time()
+        for monitor_id, monitor in self._checkable_monitors():
+            if not self._is_current(generation):
+                break
+            if monitor.config.get('paused') is True or monitor_id in self.stalled:
+                continue
+            schedule = _schedule_of(monitor)
+            if not manual and schedule is not None and not schedule.is_active(now):
+                continue
+            if spreadsheet_id is not None and monitor.config.get('spreadsheet_id') != spreadsheet_id:
+                continue
+            started = self.clock.monotonic()
+            self._heartbeat(generation, started + self.watchdog_timeout)
+            self.in_flight[monitor_id] = started
+            try:
+                if monitor.check_cell():
+                    triggered = True
+            except Exception as e:
+                logger.error("Error checking monitor %s: %s", monitor_id, e)
+            finally:
+                self.in_flight.pop(monitor_id, None)
+                self.heartbeats[monitor_id] = self.clock.time()
+                if self.stalled.pop(monitor_id, None) is not None:
+                    logger.warning(f"Stalled check of monitor {monitor_id} returned after "
+                                   f"{self.clock.monotonic() - started:.1f} s")
+        self._state_changed()
+        return triggered
+    
+    def _watchdog_loop(self):
+        """Check the monitoring loop for stalls until the service stops"""
+        period = max(0.1, min(self.watchdog_timeout / 4, 5))
+        # Real time on purpose: a virtual clock's wait() would advance simulated time
+        while not self.stop_event.wait(period):
+            try:
+                self._watchdog_check()
+            except Exception as e:
+                logger.error("Error in watchdog: %s", e)
+    
+    def _watchdog_check(self):
+        """
+        Restart the monitoring loop if it has missed its deadline
+        
+        The loop sets a deadline before every wait and every check. A loop
+        past it is stuck (typically in a fetch that ignores its timeout): it
+        is abandoned under its old generation and a new loop thread checks
+        the remaining monitors at once, skipping the stuck ones.
+        
+        Returns:
+            bool: True if the loop was restarted
+        """
+        with self.loop_lock:
+            if not self.is_active or self.stop_event.is_set() or self.loop_deadline is None:
+                return False
+            now = self.clock.monotonic()
+            if now <= self.loop_deadline:
+                return False
+            stuck = {monitor_id: started for monitor_id, started in self.in_flight.items()
+                     if now - started > self.watchdog_timeout}
+            self.stalled.update(stuck)
+            self.restarts += 1
+            logger.error(f"Monitoring loop stalled for {now - self.loop_deadline + self.watchdog_timeout:.1f} s "
+                         f"(stuck monitors: {sorted(stuck) or 'none'}); starting a new loop")
+            self._start_loop(check_first=True)
+        self._state_changed()
+        return True
+    
+    def get_watchdog_status(self):
+        """
+        Get the loop heartbeat and watchdog counters
+        
+        Returns:
+            dict: 'heartbeat' (epoch seconds the loop last reported), 'healthy'
+            (within its deadline), 'generation', 'restarts', 'stalled' (ids of
+            monitors whose check is stuck) and the 'timeout' in seconds
+        """
+        deadline = self.loop_deadline
+        return {
+            'heartbeat': self.loop_heartbeat,
+            'healthy': not self.is_active or deadline is None or self.clock.monotonic() <= deadline,
+            'generation': self.generation,
+            'restarts': self.restarts,
+            'stalled': sorted(self.stalled),
+            'timeout': self.watchdog_timeout
+        }
+    
+    def _state_changed(self):
+        self.state_version = next(self._versions)
+    
+    def get_state_version(self):
+        """
+        Get a number that changes whenever monitor results or the running state change
+        
+        Returns:
+            int: The current state version
+        """
+        return self.state_version
+    
     def check_now(self):
         """
         Perform an immediate check regardless of the monitoring schedule
         
         Returns:
-            bool: Result from the check_cell method
+            bool: True if any monitor triggered a notification
         """
         logger.info("Performing immediate check")
-        return self.monitor.check_cell()
+        return self._check_all(manual=True)
+    
+    @staticmethod
+    def _window_status(monitor, now):
+        schedule = _schedule_of(monitor)
+        if schedule is None:
+            return None
+        until = schedule.window_end(now)
+        if until is not None:
+            return {'active': True, 'until': until}
+        return {'active': False, 'until': schedule.next_open(now)}
     
     def get_status(self):
         """
@@ -238,10 +902,41 @@ class MonitoringService:
                 - last_result: The last check result
                 - last_check_time: When the last check was performed
                 - history: Recent status history
+                - monitors: The same fields for every monitor, keyed by monitor id,
+                  plus whether it is 'paused' or 'stalled', its 'heartbeat' (epoch
+                  seconds its last check finished), its polling 'window' (None
+                  around the clock, else whether it is 'active' and 'until' when
+                  that changes) and its 'latency' histograms (see LatencyTracker.snapshot)
+                - next_poll: Epoch seconds of the next scheduled poll, or None when stopped
+                - watchdog: Loop heartbeat and restarts (see get_watchdog_status)
+                - events: Event subscribers' queue depth, lag and drops (see EventBus.get_stats)
+                - fetch: Shared fetch layer counters (requests, api_calls, cache_hits, coalesced)
+                - auth: Token refresh metrics per service account file, or None with an API key only
+                - push: Drive change-notification channel state, or None when push mode is off
         """
+        now = self.clock.time()
         return {
             'is_active': self.is_active,
             'last_result': self.monitor.last_check_result,
             'last_check_time': self.monitor.last_check_time,
-            'history': self.monitor.get_history(10)
+            'history': self.monitor.get_history(10),
+            'monitors': {
+                monitor_id: {
+                    'paused': monitor.config.get('paused') is True,
+                    'stalled': monitor_id in self.stalled,
+                    'heartbeat': self.heartbeats.get(monitor_id),
+                    'window': self._window_status(monitor, now),
+                    'last_result': monitor.last_check_result,
+                    'last_check_time': monitor.last_check_time,
+                    'history': monitor.get_history(10),
+                    'latency': monitor.latency.snapshot()
+                }
+                for monitor_id, monitor in self.monitors.items()
+            },
+            'next_poll': self.next_poll + now - self.clock.monotonic() if self.is_active and self.next_poll else None,
+            'watchdog': self.get_watchdog_status(),
+            'events': self.events.get_stats(),
+            'fetch': get_shared_fetcher().get_stats(),
+            'auth': get_auth_stats(),
+            'push': self.push_channels.get_status() if self.push_channels else None
         }
@@ -30,6 +30,14 @@ class BaseNotifier:
 class NtfyNotifier(BaseNotifier):
     """Notification provider using ntfy.sh service"""
     
+    def __init__(self, config=None):
+        """Initialize the notifier with configuration"""
+        super().__init__(config)
+        # Self-hosted ntfy servers (or benchmarks/fake_ntfy_server.py) can replace ntfy.sh
+        self.server = (self.config.get('ntfy_server') or 'https://ntfy.sh').rstrip('/')
+        # Without a timeout a stalled endpoint would block the monitoring loop indefinitely
+        self.timeout = self.config.get('ntfy_timeout', 10)
+    
     def send(self, message, **kwargs):
         """
         Send a notification using ntfy.sh
@@ -60,20 +68,21 @@ class NtfyNotifier(BaseNotifier):
                 headers['Click'] = url
             
             response = requests.post(
-                f'https://ntfy.sh/{topic}',
+                f'{self.server}/{topic}',
                 data=message.encode('utf-8'),
-                headers=headers
+                headers=headers,
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
-                logger.info(f"Notification sent successfully to ntfy.sh/{topic}")
+                logger.info("Notification sent successfully to %s/%s", self.server, topic)
                 return True
             else:
-                logger.error(f"Failed to send notification. Status code: {response.status_code}")
+                logger.error("Failed to send notification. Status code: %s", response.status_code)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error sending notification: {str(e)}")
+            logger.error("Error sending notification: %s", e)
             return False
 
 class LogNotifier(BaseNotifier):
@@ -90,7 +99,7 @@ class LogNotifier(BaseNotifier):
         Returns:
             bool: Always returns True
         """
-        logger.info(f"NOTIFICATION: {message}")
+        logger.info("NOTIFICATION: %s", message)
         return True
 
 class NotificationManager:
@@ -0,0 +1,194 @@
+"""
+Sampling profiler and memory introspection for the Google Spreadsheet Monitor
+Periodically snapshots the stacks of every thread in the process into
+collapsed stacks (the input of flamegraph tools), and reports tracemalloc
+allocation sites grouped by subsystem.
+"""
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Only one profile runs at a time; a second request is refused rather than queued
+_profile_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over all threads.
+
+    Sampling runs in the calling thread, which is left out of the profile.
+    Each sample only walks the current frames, so at the default 100 Hz the
+    cost is a small fraction of one core regardless of what is being profiled.
+    """
+
+    def __init__(self, interval=0.01):
+        """
+        Initialize the profiler
+
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self.labels = {}  # code object -> frame label
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self.labels[code] = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def sample(self):
+        """Record the current stack of every other thread"""
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[';'.join(reversed(labels))] += 1
+        self.samples += 1
+
+    def run(self, duration):
+        """
+        Sample for a number of seconds
+
+        Args:
+            duration (float): Seconds to sample for
+        """
+        started = time.perf_counter()
+        deadline = started + duration
+        next_sample = started
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(min(next_sample, deadline) - now)
+                continue
+            self.sample()
+            next_sample += self.interval
+            if next_sample < now:  # fell behind; do not burst to catch up
+                next_sample = now + self.interval
+        self.duration = time.perf_counter() - started
+
+    def collapsed(self):
+        """
+        Render the profile as collapsed stacks
+
+        Returns:
+            str: One 'thread;outer;...;inner count' line per distinct stack, most frequent first
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile(duration, interval=0.01):
+    """
+    Profile every thread in the process, refusing to run two profiles at once
+
+    Args:
+        duration (float): Seconds to sample for
+        interval (float): Seconds between samples
+
+    Returns:
+        SamplingProfiler: The finished profile, or None if another profile is running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        logger.info(f"Profiling all threads for {duration:g} s at {1 / interval:.0f} Hz")
+        profiler = SamplingProfiler(interval)
+        profiler.run(duration)
+        return profiler
+    finally:
+        _profile_lock.release()
+
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+def subsystem_of(filename):
+    """
+    Name the part of the program a source file belongs to
+
+    Args:
+        filename (str): Path of a Python source file
+
+    Returns:
+        str: 'app.<module>' for this application, the package name for
+        installed libraries, 'python:<module>' for the standard library
+    """
+    path = os.path.abspath(filename)
+    if path.startswith(_APP_DIR + os.sep):
+        module = os.path.relpath(path, os.path.dirname(_APP_DIR))
+        return os.path.splitext(module)[0].replace(os.sep, '.')
+    parts = path.split(os.sep)
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            package = parts[parts.index(marker) + 1:][:1]
+            return os.path.splitext(package[0])[0] if package else marker
+    if path.startswith(_STDLIB_DIR + os.sep):
+        return f"python:{os.path.splitext(os.path.relpath(path, _STDLIB_DIR).split(os.sep)[0])[0]}"
+    return os.path.basename(filename)
+
+def memory_report(limit=20):
+    """
+    Report memory use, with allocation sites and subsystems while tracemalloc is tracing
+
+    Args:
+        limit (int): Number of top allocation sites to list
+
+    Returns:
+        dict: 'tracing', 'max_rss_bytes', and while tracing 'traced_bytes',
+        'peak_traced_bytes', 'subsystems' ({name: {'size', 'count'}}, largest
+        first) and 'top_sites' ([{'site', 'subsystem', 'size', 'count'}])
+    """
+    report = {'tracing': tracemalloc.is_tracing(), 'max_rss_bytes': None}
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux
+        report['max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    if not report['tracing']:
+        return report
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    report['traced_bytes'], report['peak_traced_bytes'] = tracemalloc.get_traced_memory()
+
+    subsystems = {}
+    for stat in snapshot.statistics('filename'):
+        totals = subsystems.setdefault(subsystem_of(stat.traceback[0].filename), {'size': 0, 'count': 0})
+        totals['size'] += stat.size
+        totals['count'] += stat.count
+    report['subsystems'] = dict(sorted(subsystems.items(), key=lambda item: -item[1]['size']))
+
+    report['top_sites'] = [
+        {
+            'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'subsystem': subsystem_of(stat.traceback[0].filename),
+            'size': stat.size,
+            'count': stat.count
+        }
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+    return report
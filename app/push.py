@@ -0,0 +1,221 @@
+"""
+Push-based change detection for the Google Spreadsheet Monitor
+Registers Drive files.watch channels for monitored spreadsheets so changes
+trigger an immediate check instead of waiting for the next poll.
+"""
+import hmac
+import logging
+import secrets
+import threading
+import time
+import uuid
+
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+
+from app.auth import AuthorizedHttp, get_token_provider
+
+logger = logging.getLogger(__name__)
+
+
+class PushChannelManager:
+    """
+    Owns the Drive notification channels for a set of monitored spreadsheets.
+
+    Channels are renewed shortly before they expire. With push_register
+    disabled, channels are only created locally (no Drive calls), which lets
+    scripts/fake_drive_push.py stand in for Google during testing.
+    """
+
+    def __init__(self, config, monitor_configs):
+        """
+        Initialize the channel manager
+
+        Args:
+            config (dict): Configuration dictionary
+            monitor_configs (list): Per-monitor configurations (see expand_monitor_configs)
+        """
+        self.config = config
+        self.spreadsheet_ids = sorted({c['spreadsheet_id'] for c in monitor_configs if c.get('spreadsheet_id')})
+        self.address = config.get('push_webhook_url')
+        self.token = config.get('push_token') or secrets.token_urlsafe(24)
+        self.register_with_drive = config.get('push_register', True)
+        self.channel_ttl = config.get('push_channel_ttl', 86400)
+        self.channels = {}  # channel id -> {'spreadsheet_id', 'resource_id', 'expiration'}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.stop_event.set()  # cleared by start()
+        self.thread = None
+        self.service = None
+        self.notifications_received = 0
+        self.last_notification_time = None
+
+    def _get_drive_service(self):
+        if not self.service:
+            kwargs = {}
+            if self.config.get('service_account_file'):
+                provider = get_token_provider(self.config['service_account_file'],
+                                              self.config.get('token_refresh_margin', 300))
+                kwargs['http'] = AuthorizedHttp(provider, build_http())
+            self.service = build('drive', 'v3', developerKey=self.config.get('api_key'), cache_discovery=False,
+                                 **kwargs)
+        return self.service
+
+    def _register(self, spreadsheet_id):
+        """Open a new channel for a spreadsheet and record it"""
+        channel_id = str(uuid.uuid4())
+        expiration = time.time() + self.channel_ttl
+        resource_id = None
+
+        if self.register_with_drive:
+            if not self.address:
+                raise ValueError("push_webhook_url must be set to register Drive channels")
+            response = self._get_drive_service().files().watch(
+                fileId=spreadsheet_id,
+                body={
+                    'id': channel_id,
+                    'type': 'web_hook',
+                    'address': self.address,
+                    'token': self.token,
+                    'expiration': int(expiration * 1000)
+                }
+            ).execute()
+            resource_id = response.get('resourceId')
+            # Drive may shorten the requested lifetime
+            if response.get('expiration'):
+                expiration = int(response['expiration']) / 1000
+
+        with self.lock:
+            self.channels[channel_id] = {
+                'spreadsheet_id': spreadsheet_id,
+                'resource_id': resource_id,
+                'expiration': expiration
+            }
+        logger.info(f"Registered push channel {channel_id} for spreadsheet {spreadsheet_id}")
+        return channel_id
+
+    def _unregister(self, channel_id):
+        with self.lock:
+            channel = self.channels.pop(channel_id, None)
+        if not channel or not self.register_with_drive or not channel['resource_id']:
+            return
+        try:
+            self._get_drive_service().channels().stop(
+                body={'id': channel_id, 'resourceId': channel['resource_id']}
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Error stopping push channel {channel_id}: {str(e)}")
+
+    def start(self):
+        """Register channels for every spreadsheet and start the renewal thread"""
+        self.stop_event.clear()
+        for spreadsheet_id in self.spreadsheet_ids:
+            try:
+                self._register(spreadsheet_id)
+            except Exception as e:
+                logger.error(f"Push registration failed for {spreadsheet_id}; polling normally: {str(e)}")
+        self.thread = threading.Thread(target=self._renewal_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop renewing and close all channels"""
+        self.stop_event.set()
+        for channel_id in list(self.channels):
+            self._unregister(channel_id)
+
+    def _renewal_loop(self):
+        """Replace channels shortly before they expire, and retry missing ones"""
+        margin = max(60, self.channel_ttl * 0.1)
+        while not self.stop_event.wait(min(60, margin / 2)):
+            now = time.time()
+            with self.lock:
+                channels = dict(self.channels)
+            for channel_id, channel in channels.items():
+                if channel['expiration'] - now < margin:
+                    try:
+                        self._register(channel['spreadsheet_id'])
+                        self._unregister(channel_id)
+                    except Exception as e:
+                        logger.error(f"Error renewing push channel {channel_id}: {str(e)}")
+            for spreadsheet_id in self._uncovered_spreadsheets():
+                try:
+                    self._register(spreadsheet_id)
+                except Exception as e:
+                    logger.debug(f"Push registration retry failed for {spreadsheet_id}: {str(e)}")
+
+    def _uncovered_spreadsheets(self):
+        now = time.time()
+        with self.lock:
+            covered = {c['spreadsheet_id'] for c in self.channels.values() if c['expiration'] > now}
+        return [spreadsheet_id for spreadsheet_id in self.spreadsheet_ids if spreadsheet_id not in covered]
+
+    def set_spreadsheets(self, spreadsheet_ids):
+        """
+        Change the set of watched spreadsheets, opening and closing channels as needed
+
+        Args:
+            spreadsheet_ids (iterable): Spreadsheet ids that should have a channel
+        """
+        wanted = sorted({spreadsheet_id for spreadsheet_id in spreadsheet_ids if spreadsheet_id})
+        self.spreadsheet_ids = wanted
+        with self.lock:
+            stale = [cid for cid, channel in self.channels.items() if channel['spreadsheet_id'] not in wanted]
+        for channel_id in stale:
+            self._unregister(channel_id)
+        if self.stop_event.is_set():
+            return
+        for spreadsheet_id in self._uncovered_spreadsheets():
+            try:
+                self._register(spreadsheet_id)
+            except Exception as e:
+                logger.error(f"Push registration failed for {spreadsheet_id}; polling normally: {str(e)}")
+
+    def is_live(self):
+        """True when every monitored spreadsheet has an unexpired channel"""
+        return bool(self.spreadsheet_ids) and not self._uncovered_spreadsheets()
+
+    def resolve(self, channel_id, token):
+        """
+        Map an incoming notification to the spreadsheet it refers to
+
+        Args:
+            channel_id (str): Channel id reported by the notification
+            token (str): Channel token reported by the notification
+
+        Returns:
+            str or None: The spreadsheet id, or None if the notification is not ours
+        """
+        if not token or not hmac.compare_digest(str(token), self.token):
+            logger.warning(f"Rejected push notification with bad token for channel {channel_id}")
+            return None
+        with self.lock:
+            channel = self.channels.get(channel_id)
+        if not channel:
+            logger.warning(f"Push notification for unknown channel {channel_id}")
+            return None
+        self.notifications_received += 1
+        self.last_notification_time = time.time()
+        return channel['spreadsheet_id']
+
+    def get_status(self):
+        """
+        Get the channel state (without the secret token)
+
+        Returns:
+            dict: live flag, channels by id, notification counters
+        """
+        now = time.time()
+        with self.lock:
+            channels = {
+                channel_id: {
+                    'spreadsheet_id': channel['spreadsheet_id'],
+                    'expires_in': round(channel['expiration'] - now)
+                }
+                for channel_id, channel in self.channels.items()
+            }
+        return {
+            'live': self.is_live(),
+            'channels': channels,
+            'notifications_received': self.notifications_received,
+            'last_notification_time': self.last_notification_time
+        }
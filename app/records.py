@@ -0,0 +1,153 @@
+"""
+Compact check records for the Google Spreadsheet Monitor
+Check results and history entries kept as slotted objects and fixed-size
+arrays with numeric timestamps; display strings are only built when read.
+"""
+from array import array
+from datetime import datetime
+from functools import lru_cache
+
+# History status codes, stored as one byte per entry
+STATUSES = ('normal', 'departed', 'error')
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+@lru_cache(maxsize=4096)
+def _format_second(second):
+    return datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+
+def format_epoch(timestamp):
+    """
+    Render epoch seconds as 'YYYY-MM-DD HH:MM:SS' local time
+
+    Checks in one poll share their second, so recent values are cached.
+
+    Args:
+        timestamp (float): Epoch seconds
+
+    Returns:
+        str: The formatted time
+    """
+    return _format_second(int(timestamp))
+
+
+class CheckResult:
+    """
+    Outcome of reading a cell
+
+    Also readable like the dict it replaces (result['value'],
+    result.get('error'), 'error' in result), with 'timestamp' formatted on demand.
+    """
+
+    __slots__ = ('value', 'is_new', 'checked_at', 'error')
+
+    def __init__(self, value, is_new, checked_at, error=None):
+        """
+        Args:
+            value (str): The normalized (upper-case) cell value
+            is_new (bool): Whether the value differs from the previous check
+            checked_at (float): Epoch seconds of the check
+            error (str): Why the check failed, or None
+        """
+        self.value = value
+        self.is_new = is_new
+        self.checked_at = checked_at
+        self.error = error
+
+    def __getitem__(self, key):
+        if key == 'timestamp':
+            return format_epoch(self.checked_at)
+        if key in self.__slots__ and (key != 'error' or self.error is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key == 'timestamp' or (key in self.__slots__ and (key != 'error' or self.error is not None))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"CheckResult(value={self.value!r}, is_new={self.is_new}, checked_at={self.checked_at}, " \
+               f"error={self.error!r})"
+
+
+class HistoryBuffer:
+    """
+    Ring buffer of (timestamp, status, message) history entries
+
+    Timestamps live in a float array and statuses in a byte array; equal
+    messages share one string. Memory is fixed by the capacity, whatever the
+    number of checks. Reading an entry returns the familiar tuple with a
+    formatted timestamp.
+    """
+
+    __slots__ = ('capacity', 'timestamps', 'statuses', 'messages', 'start', 'size', 'interned')
+
+    def __init__(self, capacity=50):
+        """
+        Args:
+            capacity (int): Entries kept; the oldest are overwritten
+        """
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.statuses = bytearray(capacity)
+        self.messages = [None] * capacity
+        self.start = 0
+        self.size = 0
+        self.interned = {}
+
+    def append(self, timestamp, status, message):
+        """
+        Add an entry, overwriting the oldest when full
+
+        Args:
+            timestamp (float): Epoch seconds
+            status (str): One of STATUSES
+            message (str): The status message
+        """
+        if len(self.interned) > 4 * self.capacity:
+            self.interned = {m: m for m in self.messages if m is not None}
+        message = self.interned.setdefault(message, message)
+        index = (self.start + self.size) % self.capacity
+        if self.size == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.size += 1
+        self.timestamps[index] = timestamp
+        self.statuses[index] = _STATUS_CODES[status]
+        self.messages[index] = message
+
+    def __len__(self):
+        return self.size
+
+    def _entry(self, position):
+        index = (self.start + position) % self.capacity
+        return format_epoch(self.timestamps[index]), STATUSES[self.statuses[index]], self.messages[index]
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._entry(i) for i in range(*position.indices(self.size))]
+        if position < 0:
+            position += self.size
+        if not 0 <= position < self.size:
+            raise IndexError("history index out of range")
+        return self._entry(position)
+
+    def __iter__(self):
+        return (self._entry(i) for i in range(self.size))
+
+    def recent(self, limit):
+        """
+        Return the newest entries, oldest first
+
+        Args:
+            limit (int): Maximum number of entries
+
+        Returns:
+            list: (timestamp string, status, message) tuples
+        """
+        return self[-limit:] if limit else []
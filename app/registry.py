@@ -0,0 +1,264 @@
+"""
+Persistent monitor registry for the Google Spreadsheet Monitor
+Stores monitors created through the API in a SQLite file and applies bulk
+create/update/pause/resume/delete batches in a single transaction.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Batch operations, in the order they are applied
+OPERATIONS = ('create', 'update', 'pause', 'resume', 'delete')
+
+# Most operations accepted in one batch
+MAX_BATCH = 10000
+
+# The only settings a registered monitor may carry, all strings. Specs are laid
+# over the process configuration, so anything else (API endpoint, keys, file
+# paths, timeouts, ...) would let an API caller redirect the whole process.
+MONITOR_KEYS = ('id', 'spreadsheet_id', 'range_name', 'notification_topic', 'active_windows', 'holidays')
+
+# Settings that may also be a list of strings
+LIST_KEYS = ('active_windows', 'holidays')
+
+
+class RegistryError(ValueError):
+    """A batch was rejected; nothing in it was applied"""
+
+    def __init__(self, errors):
+        """
+        Args:
+            errors (list): {'op', 'index', 'message'} dicts describing each problem
+        """
+        super().__init__(f"{len(errors)} invalid operation(s): {errors[0]['message']}")
+        self.errors = errors
+
+
+def _spec_problem(spec, creating):
+    """Return why a monitor spec is invalid, or None"""
+    if not isinstance(spec, dict):
+        return "Monitor must be an object"
+    unknown = sorted(str(key) for key in spec if key not in MONITOR_KEYS)
+    if unknown:
+        return f"Monitor may not set {', '.join(unknown)} (allowed: {', '.join(MONITOR_KEYS)})"
+    for key, value in spec.items():
+        if value is None and not creating:
+            continue  # an update removing the setting
+        if key in LIST_KEYS and isinstance(value, list):
+            if not all(isinstance(item, str) for item in value):
+                return f"Monitor {key} must be a string or a list of strings"
+        elif not isinstance(value, str):
+            return f"Monitor {key} must be a string"
+    if 'id' in spec and not (isinstance(spec['id'], str) and spec['id']):
+        return "Monitor id must be a non-empty string"
+    if creating:
+        for key in ('spreadsheet_id', 'range_name'):
+            if not (isinstance(spec.get(key), str) and spec[key]):
+                return f"Monitor needs a {key}"
+    return None
+
+
+class MonitorRegistry:
+    """
+    Monitor specs in a SQLite database in WAL mode.
+
+    The spec list is cached and only re-read after a write from this or
+    another process, so services can ask for it on every config apply.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the registry, creating the database if needed
+
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS monitors ("
+            "seq INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, spec TEXT NOT NULL, "
+            "paused INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL)"
+        )
+        self.writes = 0
+        self.cached_key = None
+        self.cached = []
+
+    def monitors(self):
+        """
+        Return the registered monitors in creation order
+
+        Returns:
+            list: Monitor spec dicts with an 'id' key, and 'paused': True for
+            paused monitors. The list is shared; do not modify it.
+        """
+        with self.lock:
+            # data_version changes when another connection commits; own writes are counted
+            key = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.writes)
+            if key != self.cached_key:
+                monitors = []
+                for monitor_id, spec, paused in self.conn.execute(
+                        "SELECT id, spec, paused FROM monitors ORDER BY seq"):
+                    monitor = json.loads(spec)
+                    # Rows written before settings were restricted may carry others
+                    ignored = sorted(key for key in monitor if key not in MONITOR_KEYS)
+                    if ignored:
+                        logger.warning(f"Ignoring settings {', '.join(ignored)} of registered monitor {monitor_id}")
+                        monitor = {key: value for key, value in monitor.items() if key in MONITOR_KEYS}
+                    monitor['id'] = monitor_id
+                    if paused:
+                        monitor['paused'] = True
+                    monitors.append(monitor)
+                self.cached, self.cached_key = monitors, key
+            return self.cached
+
+    def apply(self, changes):
+        """
+        Apply a batch of operations atomically
+
+        Args:
+            changes (dict): Lists keyed by operation:
+                - create: Monitor specs (spreadsheet_id and range_name required; id
+                  defaults to '<spreadsheet_id>/<range_name>')
+                - update: Partial specs with the id of an existing monitor; a null
+                  value removes the setting
+                - pause / resume / delete: Monitor ids
+
+        Returns:
+            dict: The ids affected, keyed by operation
+
+        Raises:
+            RegistryError: If any operation is invalid (the batch is not applied)
+        """
+        if not isinstance(changes, dict):
+            raise RegistryError([{'op': None, 'index': None, 'message': "Batch must be an object"}])
+        errors = [{'op': op, 'index': None, 'message': f"Unknown operation: {op}"}
+                  for op in changes if op not in OPERATIONS]
+        errors += [{'op': op, 'index': None, 'message': f"'{op}' must be a list"}
+                   for op in OPERATIONS if not isinstance(changes.get(op, []), list)]
+        if not errors and sum(len(changes.get(op, [])) for op in OPERATIONS) > MAX_BATCH:
+            errors.append({'op': None, 'index': None, 'message': f"At most {MAX_BATCH} operations per batch"})
+        if errors:
+            raise RegistryError(errors)
+
+        result = {op: [] for op in OPERATIONS}
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = {monitor_id: [json.loads(spec), paused] for monitor_id, spec, paused in
+                         self.conn.execute("SELECT id, spec, paused FROM monitors")}
+                created, modified, deleted = [], set(), set()
+
+                def fail(op, index, message):
+                    errors.append({'op': op, 'index': index, 'message': message})
+
+                for index, spec in enumerate(changes.get('create', [])):
+                    problem = _spec_problem(spec, creating=True)
+                    if problem:
+                        fail('create', index, problem)
+                        continue
+                    spec = dict(spec)
+                    monitor_id = spec.pop('id', None) or f"{spec['spreadsheet_id']}/{spec['range_name']}"
+                    if monitor_id in state:
+                        fail('create', index, f"Monitor already exists: {monitor_id}")
+                        continue
+                    state[monitor_id] = [spec, 0]
+                    created.append(monitor_id)
+                    result['create'].append(monitor_id)
+
+                for index, spec in enumerate(changes.get('update', [])):
+                    problem = _spec_problem(spec, creating=False)
+                    if problem or not spec.get('id'):
+                        fail('update', index, problem or "Update needs the monitor id")
+                        continue
+                    if spec['id'] not in state:
+                        fail('update', index, f"Unknown monitor: {spec['id']}")
+                        continue
+                    current = dict(state[spec['id']][0])
+                    for key, value in spec.items():
+                        if key == 'id':
+                            continue
+                        if value is None:
+                            current.pop(key, None)
+                        else:
+                            current[key] = value
+                    problem = _spec_problem(current, creating=True)
+                    if problem:
+                        fail('update', index, problem)
+                        continue
+                    state[spec['id']][0] = current
+                    modified.add(spec['id'])
+                    result['update'].append(spec['id'])
+
+                for op, paused in (('pause', 1), ('resume', 0), ('delete', None)):
+                    for index, monitor_id in enumerate(changes.get(op, [])):
+                        if not isinstance(monitor_id, str) or monitor_id not in state:
+                            fail(op, index, f"Unknown monitor: {monitor_id}")
+                            continue
+                        if paused is None:
+                            del state[monitor_id]
+                            deleted.add(monitor_id)
+                        else:
+                            state[monitor_id][1] = paused
+                            modified.add(monitor_id)
+                        result[op].append(monitor_id)
+
+                if errors:
+                    raise RegistryError(errors)
+
+                self.conn.executemany(
+                    "INSERT INTO monitors (id, spec, paused, updated) VALUES (?, ?, ?, ?)",
+                    [(monitor_id, json.dumps(state[monitor_id][0]), 0, now)
+                     for monitor_id in created if monitor_id in state]
+                )
+                self.conn.executemany(
+                    "UPDATE monitors SET spec = ?, paused = ?, updated = ? WHERE id = ?",
+                    [(json.dumps(state[monitor_id][0]), state[monitor_id][1], now, monitor_id)
+                     for monitor_id in modified if monitor_id in state]
+                )
+                self.conn.executemany("DELETE FROM monitors WHERE id = ?", [(i,) for i in deleted])
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            finally:
+                self.writes += 1
+        return result
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_monitor_registry(path):
+    """
+    Return the process-wide registry for a database path
+
+    Args:
+        path (str): Path of the SQLite database file (None: no registry)
+
+    Returns:
+        MonitorRegistry: The shared registry, or None when path is empty or unusable
+    """
+    if not path:
+        return None
+    with _registries_lock:
+        if path not in _registries:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                _registries[path] = MonitorRegistry(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Could not open monitor registry {path}: {str(e)}")
+                return None
+        return _registries[path]
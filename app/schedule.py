@@ -0,0 +1,269 @@
+"""
+Polling windows for the Google Spreadsheet Monitor
+Compiles weekly time windows and holiday exclusions into a sorted list of
+active intervals, so the scheduler can tell in O(log n) whether a monitor
+should be polled now and when its next window opens.
+"""
+import bisect
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+
+logger = logging.getLogger(__name__)
+
+DAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+# Days compiled ahead; the schedule is recompiled when time moves past them
+HORIZON_DAYS = 14
+# How far ahead to look for an open window before giving up (e.g. a year of holidays)
+MAX_LOOKAHEAD_DAYS = 400
+
+_WINDOW_PATTERN = re.compile(r"^\s*(?:(?P<days>\S+)\s+)?(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})\s*$")
+
+
+def _parse_days(spec):
+    """Parse a cron-style day-of-week field ('*', 'mon-fri', 'sat,sun') into weekday numbers"""
+    spec = spec.strip().lower()
+    if spec in ('*', 'daily', 'all'):
+        return frozenset(range(7))
+    days = set()
+    for part in spec.split(','):
+        names = part.split('-')
+        try:
+            numbers = [DAY_NAMES.index(name[:3]) for name in names]
+        except ValueError:
+            raise ValueError(f"Unknown day in '{spec}' (use mon..sun, ranges like mon-fri, or *)")
+        if len(numbers) == 1:
+            days.add(numbers[0])
+        elif len(numbers) == 2:
+            first, last = numbers
+            days.update((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+        else:
+            raise ValueError(f"Invalid day range '{part}'")
+    return frozenset(days)
+
+
+def _parse_time(text):
+    hours, minutes = (int(part) for part in text.split(':'))
+    if hours == 24 and minutes == 0:
+        return None  # end of day
+    return time(hours, minutes)
+
+
+def parse_window(spec):
+    """
+    Parse a polling window
+
+    Args:
+        spec (str or dict): 'mon-fri 06:30-09:00' (days default to every day),
+            or {'days': 'mon-fri', 'start': '06:30', 'end': '09:00'}. A window
+            ending at or before its start runs past midnight.
+
+    Returns:
+        tuple: (weekday numbers, start time, end time or None for midnight)
+
+    Raises:
+        ValueError: If the window cannot be parsed
+    """
+    if isinstance(spec, dict):
+        days, start, end = spec.get('days', '*'), str(spec.get('start', '')), str(spec.get('end', ''))
+    else:
+        match = _WINDOW_PATTERN.match(str(spec))
+        if not match:
+            raise ValueError(f"Invalid polling window '{spec}' (expected e.g. 'mon-fri 06:30-09:00')")
+        days, start, end = match.group('days') or '*', match.group('start'), match.group('end')
+    try:
+        start_time = _parse_time(start) or time(0)
+        end_time = _parse_time(end)
+    except ValueError:
+        raise ValueError(f"Invalid time in polling window '{spec}'")
+    return _parse_days(days), start_time, end_time
+
+
+def parse_holidays(specs):
+    """
+    Parse holiday exclusions
+
+    Args:
+        specs (list or str): Dates ('2024-12-25') and inclusive ranges
+            ('2024-12-23..2025-01-03'), as a list or a comma-separated string
+
+    Returns:
+        list: Sorted (first date, last date) pairs
+    """
+    if isinstance(specs, str):
+        specs = specs.split(',')
+    ranges = []
+    for spec in specs or []:
+        if isinstance(spec, date):
+            ranges.append((spec, spec))
+            continue
+        spec = str(spec).strip()
+        if not spec:
+            continue
+        first, _, last = spec.partition('..')
+        try:
+            first = date.fromisoformat(first.strip())
+            last = date.fromisoformat(last.strip()) if last else first
+        except ValueError:
+            raise ValueError(f"Invalid holiday '{spec}' (expected YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD)")
+        ranges.append((min(first, last), max(first, last)))
+    return sorted(ranges)
+
+
+class PollingSchedule:
+    """
+    When a monitor should be polled, as sorted [start, end) epoch intervals
+
+    Windows are in local time. Windows starting on a holiday are dropped, and
+    overlapping windows are merged. Lookups use bisect over the compiled
+    interval starts; the intervals are recompiled for the next HORIZON_DAYS
+    whenever a lookup falls past the compiled range.
+    """
+
+    def __init__(self, windows, holidays=None):
+        """
+        Initialize the schedule
+
+        Args:
+            windows (list): Window specs (see parse_window)
+            holidays (list): Holiday specs (see parse_holidays)
+
+        Raises:
+            ValueError: If a window or holiday cannot be parsed
+        """
+        self.windows = [parse_window(window) for window in windows]
+        self.holidays = parse_holidays(holidays)
+        self.holiday_starts = [first for first, _ in self.holidays]
+        # (from, until, starts, ends): interval starts and ends compiled for the
+        # epoch seconds [from, until), replaced as a whole so readers in other
+        # threads never see half a schedule
+        self.compiled = None
+
+    def is_holiday(self, day):
+        index = bisect.bisect_right(self.holiday_starts, day) - 1
+        return index >= 0 and day <= self.holidays[index][1]
+
+    def compile(self, first_day, days=HORIZON_DAYS):
+        """
+        Compute the active intervals of the windows starting on first_day and the following days
+
+        Args:
+            first_day (date): First local date to cover
+            days (int): Number of days to cover
+
+        Returns:
+            tuple: The compiled (from, until, starts, ends)
+        """
+        intervals = []
+        # Start a day early so a window running past midnight into first_day is included
+        for offset in range(-1, days):
+            day = first_day + timedelta(days=offset)
+            if self.is_holiday(day):
+                continue
+            for weekdays, start, end in self.windows:
+                if day.weekday() not in weekdays:
+                    continue
+                opens = datetime.combine(day, start)
+                if end is None:
+                    closes = datetime.combine(day + timedelta(days=1), time(0))
+                else:
+                    closes = datetime.combine(day if end > start else day + timedelta(days=1), end)
+                intervals.append((opens.timestamp(), closes.timestamp()))
+        intervals.sort()
+
+        starts, ends = [], []
+        for opens, closes in intervals:
+            if ends and opens <= ends[-1]:
+                ends[-1] = max(ends[-1], closes)
+            else:
+                starts.append(opens)
+                ends.append(closes)
+        self.compiled = (
+            datetime.combine(first_day, time(0)).timestamp(),
+            datetime.combine(first_day + timedelta(days=days), time(0)).timestamp(),
+            starts,
+            ends
+        )
+        return self.compiled
+
+    def _intervals(self, t):
+        """The compiled schedule covering t, compiling it if needed"""
+        compiled = self.compiled
+        if compiled is None or not compiled[0] <= t < compiled[1]:
+            compiled = self.compile(datetime.fromtimestamp(t).date())
+        return compiled
+
+    def is_active(self, t):
+        """
+        Whether t falls inside a window
+
+        Args:
+            t (float): Epoch seconds
+
+        Returns:
+            bool: True if the monitor should be polled at t
+        """
+        _, _, starts, ends = self._intervals(t)
+        index = bisect.bisect_right(starts, t) - 1
+        return index >= 0 and t < ends[index]
+
+    def next_open(self, t):
+        """
+        Find when polling should next happen
+
+        Args:
+            t (float): Epoch seconds
+
+        Returns:
+            float: t if a window is open at t, else the start of the next
+            window, or None if no window opens within MAX_LOOKAHEAD_DAYS
+        """
+        limit = t + MAX_LOOKAHEAD_DAYS * 86400
+        while t < limit:
+            _, until, starts, ends = self._intervals(t)
+            index = bisect.bisect_right(starts, t) - 1
+            if index >= 0 and t < ends[index]:
+                return t
+            if index + 1 < len(starts):
+                return starts[index + 1]
+            t = until  # nothing left in this horizon; compile the next one
+        return None
+
+    def window_end(self, t):
+        """
+        Find when the window open at t closes
+
+        Args:
+            t (float): Epoch seconds
+
+        Returns:
+            float: End of the window containing t, or None if none is open
+        """
+        _, _, starts, ends = self._intervals(t)
+        index = bisect.bisect_right(starts, t) - 1
+        if index >= 0 and t < ends[index]:
+            return ends[index]
+        return None
+
+
+def compile_schedule(config):
+    """
+    Build a monitor's polling schedule from its configuration
+
+    Args:
+        config (dict): Monitor configuration with optional 'active_windows'
+            (list, or a string of windows separated by ';') and 'holidays'
+
+    Returns:
+        PollingSchedule: The schedule, or None to poll around the clock
+    """
+    windows = config.get('active_windows')
+    if isinstance(windows, str):
+        windows = [window for window in windows.split(';') if window.strip()]
+    if not windows:
+        return None
+    try:
+        return PollingSchedule(windows, config.get('holidays'))
+    except ValueError as e:
+        logger.error(f"Ignoring polling windows of monitor {config.get('id', 'default')}: {e}")
+        return None
@@ -0,0 +1,73 @@
+"""
+Monitoring service construction for the Google Spreadsheet Monitor
+Selects how monitoring is executed based on configuration.
+"""
+import logging
+
+from app.monitor import MonitoringService
+
+logger = logging.getLogger(__name__)
+
+def build_local_service(config):
+    """
+    Build the service that actually polls, in this process or its children
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        ClusterMonitoringService in cluster mode, ShardedMonitoringService
+        when 'shards' > 1, otherwise MonitoringService
+    """
+    if config.get('cluster_mode'):
+        from app.leases import ClusterMonitoringService
+        if int(config.get('shards') or 1) > 1:
+            logger.warning("Sharding is not combined with cluster mode; running monitors in-process")
+        return ClusterMonitoringService(config)
+
+    if int(config.get('shards') or 1) > 1:
+        from app.sharding import ShardedMonitoringService
+        return ShardedMonitoringService(config, int(config['shards']))
+
+    return MonitoringService(config)
+
+def create_monitoring_service(config):
+    """
+    Build the monitoring service for this process
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        An object exposing the MonitoringService interface
+        (is_active, start, stop, check_now, get_status)
+    """
+    if config.get('elect_poller'):
+        # Imported lazily: fcntl is POSIX-only and not needed otherwise
+        from app.election import ElectedMonitoringService
+        logger.info("Poller election enabled; monitoring runs in a single elected process")
+        service = ElectedMonitoringService(config, build_local_service)
+    else:
+        service = build_local_service(config)
+
+    if config.get('hot_reload'):
+        start_config_reloader(service)
+    return service
+
+def start_config_reloader(service):
+    """
+    Watch config.yaml and .env and apply edits to the running service
+
+    Args:
+        service: Monitoring service exposing apply_config(config)
+
+    Returns:
+        ConfigReloader: The running reloader (also kept on service.config_reloader)
+    """
+    from app.config import config_paths, load_config
+    from app.config_watch import ConfigReloader
+
+    reloader = ConfigReloader(service, lambda: load_config(reload=True), config_paths())
+    reloader.start()
+    service.config_reloader = reloader
+    return reloader
@@ -0,0 +1,432 @@
+"""
+Process-sharded monitoring for the Google Spreadsheet Monitor
+Partitions monitors across worker processes by consistent hashing so rule
+evaluation and range diffing can use every CPU core.
+"""
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from app.monitor import expand_monitor_configs, diff_monitor_configs
+
+logger = logging.getLogger(__name__)
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping monitor ids to shard indexes.
+
+    Each shard owns many virtual points on the ring, so adding or removing a
+    shard only moves the monitors adjacent to its points.
+    """
+
+    def __init__(self, nodes, replicas=64):
+        """
+        Initialize the ring
+
+        Args:
+            nodes (iterable): Shard identifiers
+            replicas (int): Virtual points per shard
+        """
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        for node in nodes:
+            for replica in range(replicas):
+                point = self._hash(f"{node}#{replica}")
+                self._owners[point] = node
+                self._points.append(point)
+        self._points.sort()
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(str(key).encode('utf-8')).digest()[:8], 'big')
+
+    def get_node(self, key):
+        """Return the shard that owns the given key"""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+def _page_state(status):
+    """
+    The parts of a shard's status that the web pages show
+
+    Heartbeats, next_poll and counters change with every report; comparing
+    them would change the state version (and the cached pages) every time.
+
+    Args:
+        status (dict): A shard's MonitoringService.get_status()
+
+    Returns:
+        tuple: Comparable page-relevant state
+    """
+    return (status.get('is_active'), [
+        (monitor_id, monitor.get('paused'), monitor.get('stalled'), monitor.get('last_result'),
+         monitor.get('last_check_time'), monitor.get('history'))
+        for monitor_id, monitor in sorted((status.get('monitors') or {}).items())
+    ])
+
+
+def _shard_main(shard_index, config, command_queue, status_queue, status_interval):
+    """
+    Entry point of a shard process: run a MonitoringService over its monitors
+
+    Args:
+        shard_index (int): Index of this shard
+        config (dict): Configuration whose 'monitors' list holds this shard's monitors
+        command_queue: Commands from the supervisor ('check_now', 'stop')
+        status_queue: Where (shard_index, status) snapshots are published
+        status_interval (float): Seconds between status snapshots
+    """
+    from app.config import setup_logging
+    from app.monitor import MonitoringService
+
+    setup_logging(process_name=f"shard-{shard_index}")
+    service = MonitoringService(config)
+    service.start()
+
+    while True:
+        try:
+            command = command_queue.get(timeout=status_interval)
+        except queue.Empty:
+            command = None
+
+        if command == 'stop':
+            service.stop()
+            break
+        if command == 'check_now':
+            service.check_now()
+
+        status_queue.put((shard_index, service.get_status()))
+
+
+class _Shard:
+    """Supervisor-side handle on a shard process"""
+
+    def __init__(self, index, monitor_ids, process, command_queue):
+        self.index = index
+        self.monitor_ids = monitor_ids
+        self.process = process
+        self.command_queue = command_queue
+        self.restarts = 0
+        self.started_at = time.monotonic()
+
+
+class ShardedMonitoringService:
+    """
+    MonitoringService counterpart that runs monitors in N shard processes.
+
+    A supervisor thread restarts shards that die and collects their status
+    snapshots; resize() rebalances when the shard count changes, restarting
+    only the shards whose monitor set moved.
+    """
+
+    def __init__(self, config, num_shards=None):
+        """
+        Initialize the sharded service
+
+        Args:
+            config (dict): Configuration dictionary
+            num_shards (int): Number of shard processes (defaults to config 'shards' or CPU count)
+        """
+        if config.get('push_mode'):
+            logger.warning("Push mode is not supported with sharding; shards will poll")
+            config = dict(config, push_mode=False)
+        self.config = config
+        self.num_shards = num_shards or config.get('shards') or multiprocessing.cpu_count()
+        self.status_interval = config.get('shard_status_interval', 1.0)
+        # Minimum shard lifetime before a restart, so a crashing shard cannot spin
+        self.restart_backoff = config.get('shard_restart_backoff', 1.0)
+        self.monitor_configs = {spec['id']: spec for spec in expand_monitor_configs(config)}
+        self.ring = HashRing(range(self.num_shards))
+        self.shards = {}
+        self.shard_status = {}
+        self.lock = threading.RLock()
+        self.context = multiprocessing.get_context('spawn')
+        self.status_queue = self.context.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.is_active = False
+        self._versions = itertools.count(1)
+        self.state_version = next(self._versions)
+
+    def assignments(self):
+        """
+        Map each shard index to the sorted ids of the monitors it owns
+
+        Returns:
+            dict: {shard_index: [monitor_id, ...]} for shards owning at least one monitor
+        """
+        result = {}
+        for monitor_id in self.monitor_configs:
+            result.setdefault(self.ring.get_node(monitor_id), []).append(monitor_id)
+        return {index: sorted(ids) for index, ids in result.items()}
+
+    def _spawn_shard(self, index, monitor_ids):
+        shard_config = dict(self.config)
+        shard_config['monitors'] = [self.monitor_configs[monitor_id] for monitor_id in monitor_ids]
+        shard_config['monitor_registry'] = None  # registered monitors are already in the list
+        command_queue = self.context.Queue()
+        process = self.context.Process(
+            target=_shard_main,
+            args=(index, shard_config, command_queue, self.status_queue, self.status_interval),
+            name=f"monitor-shard-{index}",
+            daemon=True
+        )
+        process.start()
+        logger.info(f"Started shard {index} (pid {process.pid}) with {len(monitor_ids)} monitors")
+        return _Shard(index, monitor_ids, process, command_queue)
+
+    def _stop_shard(self, shard, timeout=5):
+        try:
+            shard.command_queue.put('stop')
+        except Exception:
+            pass
+        shard.process.join(timeout=timeout)
+        if shard.process.is_alive():
+            logger.warning(f"Shard {shard.index} did not stop in time; terminating")
+            shard.process.terminate()
+            shard.process.join(timeout=1)
+        self.shard_status.pop(shard.index, None)
+
+    def start(self):
+        """
+        Start all shard processes and the supervisor
+
+        Returns:
+            bool: True if started, False if already running
+        """
+        with self.lock:
+            if self.is_active:
+                logger.warning("Monitoring service is already running")
+                return False
+
+            logger.info(f"Starting sharded monitoring across {self.num_shards} processes")
+            self.stop_event.clear()
+            for index, monitor_ids in self.assignments().items():
+                self.shards[index] = self._spawn_shard(index, monitor_ids)
+            self.is_active = True
+            self.state_version = next(self._versions)
+
+        self.thread = threading.Thread(target=self._supervise, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop the supervisor and all shard processes
+
+        Returns:
+            bool: True if stopped, False if not running
+        """
+        with self.lock:
+            if not self.is_active:
+                logger.warning("Monitoring service is not running")
+                return False
+
+            logger.info("Stopping sharded monitoring")
+            self.is_active = False
+            self.state_version = next(self._versions)
+            self.stop_event.set()
+            for shard in self.shards.values():
+                self._stop_shard(shard)
+            self.shards = {}
+
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5)
+        return True
+
+    def resize(self, num_shards):
+        """
+        Change the number of shard processes and rebalance monitors
+
+        Args:
+            num_shards (int): New shard count
+
+        Returns:
+            list: Indexes of shards that were (re)started
+        """
+        with self.lock:
+            self.num_shards = num_shards
+            self.ring = HashRing(range(num_shards))
+            return self._rebalance()
+
+    def apply_config(self, config):
+        """
+        Apply a reloaded configuration, restarting only shards whose monitors changed
+
+        Args:
+            config (dict): The new configuration
+
+        Returns:
+            dict: Summary with added, removed and changed monitor ids and restarted shards
+        """
+        if config.get('push_mode'):
+            config = dict(config, push_mode=False)
+        with self.lock:
+            new_configs = expand_monitor_configs(config)
+            added, removed, changed = diff_monitor_configs(list(self.monitor_configs.values()), new_configs)
+            self.config = config
+            self.monitor_configs = {spec['id']: spec for spec in new_configs}
+            num_shards = int(config.get('shards') or self.num_shards)
+            if num_shards != self.num_shards:
+                self.num_shards = num_shards
+                self.ring = HashRing(range(num_shards))
+            restarted = self._rebalance(changed_ids=set(changed))
+        return {'added': added, 'removed': removed, 'changed': sorted(changed), 'restarted_shards': restarted}
+
+    def reload_monitors(self):
+        """
+        Re-read the monitor registry, restarting only shards whose monitors changed
+
+        Returns:
+            dict: Summary as returned by apply_config()
+        """
+        return self.apply_config(self.config)
+
+    def _rebalance(self, changed_ids=frozenset()):
+        """
+        Restart only the shards whose assignment or monitor settings changed (caller holds the lock)
+
+        Args:
+            changed_ids (set): Monitors whose configuration changed
+
+        Returns:
+            list: Indexes of shards that were (re)started
+        """
+        restarted = []
+        if not self.is_active:
+            return restarted
+
+        wanted = self.assignments()
+        for index in list(self.shards):
+            shard = self.shards[index]
+            if wanted.get(index) != shard.monitor_ids or changed_ids & set(shard.monitor_ids):
+                self._stop_shard(shard)
+                del self.shards[index]
+
+        for index, monitor_ids in wanted.items():
+            if index not in self.shards:
+                self.shards[index] = self._spawn_shard(index, monitor_ids)
+                restarted.append(index)
+
+        logger.info(f"Rebalanced monitors across {self.num_shards} shards; restarted {restarted}")
+        return restarted
+
+    def _drain_status(self):
+        while True:
+            try:
+                index, status = self.status_queue.get_nowait()
+            except queue.Empty:
+                return
+            except Exception as e:
+                logger.error(f"Error reading shard status: {str(e)}")
+                return
+            if index not in self.shards:
+                continue
+            previous = self.shard_status.get(index)
+            self.shard_status[index] = status
+            if previous is None or _page_state(previous) != _page_state(status):
+                self.state_version = next(self._versions)
+
+    def _supervise(self):
+        """Restart dead shards and collect status snapshots"""
+        logger.info("Shard supervisor started")
+        while not self.stop_event.wait(self.status_interval / 2):
+            self._drain_status()
+            with self.lock:
+                if not self.is_active:
+                    break
+                for index, shard in list(self.shards.items()):
+                    if shard.process.is_alive():
+                        continue
+                    if time.monotonic() - shard.started_at < self.restart_backoff:
+                        continue
+                    logger.error(
+                        f"Shard {index} (pid {shard.process.pid}) exited with code "
+                        f"{shard.process.exitcode}; restarting"
+                    )
+                    restarts = shard.restarts + 1
+                    self.shards[index] = self._spawn_shard(index, shard.monitor_ids)
+                    self.shards[index].restarts = restarts
+        logger.info("Shard supervisor stopped")
+
+    def check_now(self):
+        """
+        Ask every shard to check its monitors immediately
+
+        Returns:
+            bool: True if the request was dispatched to at least one shard
+        """
+        logger.info("Requesting immediate check from all shards")
+        with self.lock:
+            for shard in self.shards.values():
+                shard.command_queue.put('check_now')
+            return bool(self.shards)
+
+    def get_state_version(self):
+        """
+        Get a number that changes whenever a shard reports a different status
+
+        Returns:
+            int: The current state version
+        """
+        self._drain_status()
+        return self.state_version
+
+    def handle_push_notification(self, channel_id, token, resource_state):
+        """Push notifications are not routed to shards"""
+        return False
+
+    def get_status(self):
+        """
+        Aggregate the latest status snapshots of all shards
+
+        Returns:
+            dict: Same shape as MonitoringService.get_status(), plus a 'shards'
+            entry describing each shard process
+        """
+        self._drain_status()
+        with self.lock:
+            monitors = {}
+            for status in self.shard_status.values():
+                monitors.update(status.get('monitors', {}))
+
+            history = sorted(
+                (entry for monitor in monitors.values() for entry in monitor['history']),
+                key=lambda entry: entry[0]
+            )[-10:]
+            latest = max(monitors.values(), key=lambda m: m['last_check_time'], default=None)
+            fetch = {}
+            for status in self.shard_status.values():
+                for name, count in status.get('fetch', {}).items():
+                    fetch[name] = fetch.get(name, 0) + count
+
+            return {
+                'is_active': self.is_active,
+                'last_result': latest['last_result'] if latest else "No check performed yet",
+                'last_check_time': latest['last_check_time'] if latest else "",
+                'history': history,
+                'monitors': monitors,
+                'fetch': fetch,
+                'shards': {
+                    index: {
+                        'pid': shard.process.pid,
+                        'alive': shard.process.is_alive(),
+                        'monitors': len(shard.monitor_ids),
+                        'restarts': shard.restarts,
+                        'auth': self.shard_status.get(index, {}).get('auth'),
+                        'watchdog': self.shard_status.get(index, {}).get('watchdog'),
+                        'events': self.shard_status.get(index, {}).get('events')
+                    }
+                    for index, shard in self.shards.items()
+                }
+            }
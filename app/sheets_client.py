@@ -3,12 +3,58 @@ Google Sheets API client for the Google Spreadsheet Monitor
 Handles interactions with the Google Sheets API.
 """
 import logging
+import threading
 import time
+import weakref
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+
+from app.auth import AuthorizedHttp, get_token_provider
+from app.fetch_cache import get_shared_fetcher
+from app.metering import MeteredHttp
+from app.records import CheckResult
 
 logger = logging.getLogger(__name__)
 
+# Discovery-built services and their resources cost tens of MB each (generated
+# docstrings), so clients with the same credentials and endpoint share them
+_shared_services = {}  # (api_key, api endpoint, service account file) -> service
+_shared_values_apis = weakref.WeakKeyDictionary()  # service -> spreadsheets().values() resource
+_shared_lock = threading.Lock()
+_thread_local = threading.local()
+
+# Response shape requested for every fetch: only the values, displayed as in
+# the sheet, row-major. The field mask drops the echoed range and dimension.
+VALUES_REQUEST = {'fields': 'values', 'valueRenderOption': 'FORMATTED_VALUE', 'majorDimension': 'ROWS'}
+
+
+def reset_shared_services():
+    """Forget the shared API services (used by tests)"""
+    with _shared_lock:
+        _shared_services.clear()
+        _shared_values_apis.clear()
+
+
+def _thread_http(timeout=None):
+    """
+    httplib2 connections are not thread-safe, so each thread executes requests on its own
+
+    Args:
+        timeout (float): Socket timeout in seconds, bounding the connect and
+            every read of a request (default: build_http's)
+    """
+    https = getattr(_thread_local, 'https', None)
+    if https is None:
+        https = _thread_local.https = {}
+    http = https.get(timeout)
+    if http is None:
+        http = https[timeout] = build_http()
+        if timeout is not None:
+            http.timeout = timeout
+    return http
+
+
 class SheetsClient:
     """Client for interacting with Google Sheets API"""
     
@@ -21,49 +67,152 @@ class SheetsClient:
         """
         self.config = config
         self.service = None
+        self.values_api = None
         self.last_cell_value = None
+        # The configured range as is: narrowing it to the top-left cell would turn an
+        # empty first row ('') into "No data found" and defeat range merging
+        self.fetch_range = config.get('range_name')
+        self.last_transfer = None  # bytes and parse time of this client's last API call
+        # Seconds a range fetched by any client may be reused (0 disables sharing)
+        self.cache_ttl = config.get('range_cache_ttl', 0)
+        # Seconds a request may block on the network before it is abandoned
+        self.fetch_timeout = config.get('fetch_timeout', 10) or None
+        # Who this client reads as: fetches are shared only between equal credentials
+        self.credentials = (config.get('api_key'), config.get('sheets_api_endpoint'),
+                            config.get('service_account_file'))
+        self.fetcher = get_shared_fetcher()
+        if config.get('spreadsheet_id') and self.fetch_range:
+            self.fetcher.register(config['spreadsheet_id'], self.fetch_range, self.credentials)
+    
+    def close(self):
+        """Withdraw this client's range from the shared fetch layer"""
+        if self.config.get('spreadsheet_id') and self.fetch_range:
+            self.fetcher.unregister(self.config['spreadsheet_id'], self.fetch_range, self.credentials)
+    
+    def token_provider(self):
+        """
+        Get the shared token provider when a service account is configured
+        
+        Returns:
+            TokenProvider: Provider for service_account_file, or None to use the API key alone
+        """
+        if not self.config.get('service_account_file'):
+            return None
+        return get_token_provider(self.config['service_account_file'], self.config.get('token_refresh_margin', 300))
     
     def get_service(self):
-        """Get and return the Google Sheets API service using API key."""
+        """Get and return the Google Sheets API service using API key and/or service account."""
         if not self.service:
-            try:
-                self.service = build('sheets', 'v4', developerKey=self.config['api_key'])
-                logger.info("Successfully connected to Google Sheets API")
-            except Exception as e:
-                logger.error(f"Failed to build Google Sheets service: {str(e)}")
-                raise
+            key = self.credentials
+            with _shared_lock:
+                service = _shared_services.get(key)
+                if service is None:
+                    kwargs = {}
+                    if self.config.get('sheets_api_endpoint'):
+                        # Alternate endpoint, e.g. benchmarks/fake_sheets_server.py
+                        kwargs['client_options'] = {'api_endpoint': self.config['sheets_api_endpoint']}
+                    if self.config.get('service_account_file'):
+                        # Requests are authorized per call (see _http); this only stops
+                        # build() from looking for application default credentials
+                        kwargs['http'] = build_http()
+                    try:
+                        service = build('sheets', 'v4', developerKey=self.config.get('api_key'), **kwargs)
+                        logger.info("Successfully connected to Google Sheets API")
+                    except Exception as e:
+                        logger.error(f"Failed to build Google Sheets service: {str(e)}")
+                        raise
+                    _shared_services[key] = service
+            self.service = service
         return self.service
     
+    def _get_values_api(self):
+        """The shared spreadsheets().values() resource"""
+        if self.values_api is None:
+            service = self.get_service()
+            with _shared_lock:
+                values_api = _shared_values_apis.get(service)
+                if values_api is None:
+                    # Building a resource generates its docstrings; never do it per call
+                    values_api = _shared_values_apis[service] = service.spreadsheets().values()
+            self.values_api = values_api
+        return self.values_api
+    
+    def prewarm(self):
+        """
+        Get ready to fetch without calling the Sheets API
+        
+        Builds the shared service and values resource, and renews the access
+        token if it is due, so the first fetch of a polling window does not pay for them.
+        """
+        self._get_values_api()
+        provider = self.token_provider()
+        if provider is not None:
+            provider.refresh_if_due()
+    
+    def _load_range(self, range_name):
+        """Fetch the raw values of a range from the Sheets API, recording bytes and parse time"""
+        request = self._get_values_api().get(
+            spreadsheetId=self.config['spreadsheet_id'],
+            range=range_name,
+            **VALUES_REQUEST
+        )
+        parse = request.postproc
+        parse_seconds = []
+        
+        def timed_parse(response, content):
+            started = time.perf_counter()
+            try:
+                return parse(response, content)
+            finally:
+                parse_seconds.append(time.perf_counter() - started)
+        
+        request.postproc = timed_parse
+        http = MeteredHttp(self._http())
+        try:
+            result = request.execute(http=http)
+        finally:
+            self.last_transfer = {
+                'bytes_sent': http.bytes_sent,
+                'bytes_received': http.bytes_received,
+                'bytes_decoded': http.bytes_decoded,
+                'compressed': http.compressed,
+                'parse_seconds': sum(parse_seconds)
+            }
+            if http.requests:
+                self.fetcher.record_transfer(**self.last_transfer)
+        return result.get('values', [])
+    
+    def _http(self):
+        """This thread's connection, carrying the shared access token with a service account"""
+        provider = self.token_provider()
+        if provider is None:
+            return _thread_http(self.fetch_timeout)
+        return AuthorizedHttp(provider, _thread_http(self.fetch_timeout))
+
     def get_cell_value(self):
         """
         Fetch the value of the specified cell from the Google Sheet.
         
         Returns:
-            dict: A dictionary containing:
+            CheckResult: The result, with:
                 - value: The value of the cell (str)
                 - is_new: Whether the value is different from the last check (bool)
-                - timestamp: When the check was performed (str)
+                - checked_at: When the check was performed (epoch seconds)
+                - error: Why the check failed, or None
         """
         try:
-            service = self.get_service()
-            sheet = service.spreadsheets()
-            
-            # Call the Sheets API to get the cell value
-            result = sheet.values().get(
-                spreadsheetId=self.config['spreadsheet_id'],
-                range=self.config['range_name']
-            ).execute()
-            
-            values = result.get('values', [])
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            # Fetch through the shared layer so monitors watching the same data share one call
+            values = self.fetcher.get_values(
+                self.config['spreadsheet_id'],
+                self.fetch_range,
+                self._load_range,
+                ttl=self.cache_ttl,
+                timeout=self.fetch_timeout,
+                credentials=self.credentials
+            )
             
             if not values:
-                return {
-                    'value': '',
-                    'is_new': False,
-                    'timestamp': timestamp,
-                    'error': 'No data found in cell'
-                }
+                return CheckResult('', False, time.time(), 'No data found in cell')
 
             # Extract the cell value
             cell_value = values[0][0] if values and values[0] else ''
@@ -75,28 +224,14 @@ class SheetsClient:
             # Store the current value for future reference
             self.last_cell_value = cell_value
             
-            return {
-                'value': cell_value,
-                'is_new': is_new,
-                'timestamp': timestamp
-            }
+            return CheckResult(cell_value, is_new, time.time())
             
         except HttpError as error:
-            logger.error(f"HTTP error while fetching cell value: {error}")
-            return {
-                'value': '',
-                'is_new': False,
-                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                'error': f"HTTP error: {str(error)}"
-            }
+            logger.error("HTTP error while fetching cell value: %s", error)
+            return CheckResult('', False, time.time(), f"HTTP error: {str(error)}")
         except Exception as error:
-            logger.error(f"Error fetching cell value: {error}")
-            return {
-                'value': '',
-                'is_new': False,
-                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                'error': f"Error: {str(error)}"
-            }
+            logger.error("Error fetching cell value: %s", error)
+            return CheckResult('', False, time.time(), f"Error: {str(error)}")
 
     def get_cell_value_with_retry(self, max_retries=3, retry_delay=5):
         """
@@ -116,13 +251,8 @@ class SheetsClient:
             except Exception as e:
                 retries += 1
                 if retries < max_retries:
-                    logger.warning(f"Retry {retries}/{max_retries} after error: {str(e)}")
+                    logger.warning("Retry %d/%d after error: %s", retries, max_retries, e)
                     time.sleep(retry_delay)
                 else:
-                    logger.error(f"Failed after {max_retries} retries: {str(e)}")
-                    return {
-                        'value': '',
-                        'is_new': False,
-                        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-                        'error': f"Failed after {max_retries} retries: {str(e)}"
-                    }
+                    logger.error("Failed after %d retries: %s", max_retries, e)
+                    return CheckResult('', False, time.time(), f"Failed after {max_retries} retries: {str(e)}")
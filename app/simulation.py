@@ -0,0 +1,391 @@
+"""
+Deterministic replay simulator for the Google Spreadsheet Monitor
+Replays recorded or synthetic cell-value timelines through MonitoringService
+on a virtual clock, so days of monitoring run in seconds, and reports
+detection latency, API calls and notifications per scenario.
+
+    python -m app.simulation scenarios/example.yaml --polling-interval 15,30,60
+    python -m app.simulation --days 7 --monitors 3 --changes-per-day 8
+"""
+import argparse
+import bisect
+import csv
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime
+
+import yaml
+
+from app.clock import VirtualClock
+from app.monitor import MonitoringService, SheetMonitor, is_departure
+from app.notifier import BaseNotifier, NotificationManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VALUE = 'ON TIME'
+# Simulations start at a fixed local time (a Monday) so runs are reproducible
+DEFAULT_START = '2024-01-01T00:00:00'
+
+
+class Timeline:
+    """A cell's value over time: [(seconds from start, value), ...]"""
+
+    def __init__(self, points, initial=DEFAULT_VALUE):
+        """
+        Initialize the timeline
+
+        Args:
+            points (list): (seconds, value) pairs in any order
+            initial (str): Value before the first point
+        """
+        points = sorted((float(t), str(value)) for t, value in points)
+        if not points or points[0][0] > 0:
+            points.insert(0, (0.0, initial))
+        self.times = [t for t, _ in points]
+        self.values = [value for _, value in points]
+
+    def index_at(self, t):
+        """Index of the point in effect at time t"""
+        return max(0, bisect.bisect_right(self.times, t) - 1)
+
+    def value_at(self, t):
+        return self.values[self.index_at(t)]
+
+    def changes(self, duration):
+        """Indexes of points after the start that change the value, up to duration"""
+        return [
+            index for index in range(1, len(self.times))
+            if self.times[index] < duration and self.values[index].upper() != self.values[index - 1].upper()
+        ]
+
+
+def load_timeline_csv(path):
+    """
+    Load a recorded timeline from CSV rows of (time, value)
+
+    The time column may hold seconds from the start or ISO timestamps
+    (converted to seconds after the first row). A header row is skipped.
+
+    Args:
+        path (str): CSV file path
+
+    Returns:
+        Timeline: The recorded timeline
+    """
+    points = []
+    origin = None
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            try:
+                t = float(row[0])
+            except ValueError:
+                try:
+                    moment = datetime.fromisoformat(row[0]).timestamp()
+                except ValueError:
+                    continue  # header
+                origin = moment if origin is None else origin
+                t = moment - origin
+            points.append((t, row[1]))
+    return Timeline(points)
+
+
+def synthetic_timeline(duration, changes_per_day=6, seed=None, departure_seconds=600):
+    """
+    Generate departures at random times (a Poisson process), each reverting
+    to ON TIME after departure_seconds
+
+    Args:
+        duration (float): Seconds to cover
+        changes_per_day (float): Average departures per day
+        seed (int): Random seed, for reproducible scenarios
+        departure_seconds (float): How long each departure stays on the sheet
+
+    Returns:
+        Timeline: The generated timeline
+    """
+    rng = random.Random(seed)
+    points = []
+    t = rng.expovariate(changes_per_day / 86400)
+    while t < duration:
+        points.append((t, 'DEPARTED'))
+        points.append((t + departure_seconds, DEFAULT_VALUE))
+        t += departure_seconds + rng.expovariate(changes_per_day / 86400)
+    return Timeline(points)
+
+
+class FakeSheetsClient:
+    """
+    Stands in for SheetsClient, reading a Timeline at the virtual time and
+    recording when each change was first observed
+    """
+
+    def __init__(self, config, timeline, clock, error_rate=0.0, seed=None):
+        self.config = config
+        self.timeline = timeline
+        self.clock = clock
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.last_cell_value = None
+        self.api_calls = 0
+        self.errors = 0
+        self.first_seen = {}  # timeline index -> virtual time first observed
+
+    def get_cell_value(self):
+        self.api_calls += 1
+        now = self.clock.monotonic()
+        timestamp = self.clock.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return {'value': '', 'is_new': False, 'timestamp': timestamp, 'error': 'Simulated API error'}
+
+        index = self.timeline.index_at(now)
+        self.first_seen.setdefault(index, now)
+        value = self.timeline.values[index].upper()
+        is_new = self.last_cell_value != value
+        self.last_cell_value = value
+        return {'value': value, 'is_new': is_new, 'timestamp': timestamp}
+
+    def get_cell_value_with_retry(self, max_retries=3, retry_delay=5):
+        return self.get_cell_value()
+
+    def close(self):
+        pass
+
+
+class RecordingNotifier(BaseNotifier):
+    """Records notifications with their virtual send time instead of sending them"""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.sent = []  # (virtual seconds, message)
+
+    def send(self, message, **kwargs):
+        self.sent.append((self.clock.monotonic(), message))
+        return True
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def _latency_summary(samples):
+    if not samples:
+        return {'mean': None, 'p50': None, 'p95': None, 'max': None}
+    return {
+        'mean': round(sum(samples) / len(samples), 1),
+        'p50': round(_percentile(samples, 50), 1),
+        'p95': round(_percentile(samples, 95), 1),
+        'max': round(max(samples), 1)
+    }
+
+
+def _build_timeline(spec, duration, base_dir, index):
+    if 'timeline' in spec:
+        return Timeline(spec['timeline'])
+    if 'csv' in spec:
+        return load_timeline_csv(os.path.join(base_dir, spec['csv']))
+    synthetic = dict(spec.get('synthetic') or {})
+    synthetic.setdefault('seed', index)
+    return synthetic_timeline(duration, **synthetic)
+
+
+def run_scenario(scenario, overrides=None, base_dir='.'):
+    """
+    Simulate one scenario
+
+    Args:
+        scenario (dict): name, start (ISO local time or epoch seconds),
+            duration (seconds) or days, config (service
+            settings such as polling_interval), error_rate and monitors, each
+            with an id, optional active_windows and holidays, and one of
+            timeline ([[seconds, value], ...]), csv (path to a recorded
+            timeline) or synthetic (synthetic_timeline args)
+        overrides (dict): Configuration applied on top of the scenario's
+        base_dir (str): Directory csv paths are relative to
+
+    Returns:
+        dict: Totals and per-monitor detection latency, API calls and notifications
+    """
+    duration = float(scenario.get('duration') or scenario.get('days', 1) * 86400)
+    start = scenario.get('start', DEFAULT_START)
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    if isinstance(start, datetime):
+        start = start.timestamp()
+    clock = VirtualClock(start=start)
+    config = {'polling_interval': 30, 'range_cache_ttl': 0}
+    config.update(scenario.get('config') or {})
+    config.update(overrides or {})
+
+    specs = scenario.get('monitors') or [{'id': 'default', 'synthetic': {}}]
+    timelines = {}
+    monitor_configs = []
+    for index, spec in enumerate(specs):
+        monitor_id = spec.get('id') or f"monitor-{index}"
+        timelines[monitor_id] = _build_timeline(spec, duration, base_dir, index)
+        monitor_configs.append({
+            'id': monitor_id,
+            'spreadsheet_id': spec.get('spreadsheet_id', 'simulated'),
+            'range_name': spec.get('range_name', f"Sheet1!A{index + 1}")
+        })
+        for key in ('active_windows', 'holidays'):
+            if key in spec:
+                monitor_configs[-1][key] = spec[key]
+    config['monitors'] = monitor_configs
+
+    clients = {}
+    notifiers = {}
+
+    def create_monitor(monitor_config):
+        monitor_id = monitor_config['id']
+        clients[monitor_id] = FakeSheetsClient(
+            monitor_config, timelines[monitor_id], clock,
+            error_rate=scenario.get('error_rate', 0.0), seed=len(clients)
+        )
+        notifiers[monitor_id] = RecordingNotifier(clock)
+        manager = NotificationManager({})
+        manager.notifiers = [notifiers[monitor_id]]
+        return SheetMonitor(monitor_config, sheets_client=clients[monitor_id],
+                            notification_manager=manager, clock=clock)
+
+    started = time.perf_counter()
+    service = MonitoringService(config, clock=clock, monitor_factory=create_monitor)
+    # Same sequence as start() followed by the monitoring loop, without threads
+    service._check_all()
+    service._reset_schedule()
+    while clock.monotonic() < duration:
+        service._tick()
+    wall_seconds = time.perf_counter() - started
+
+    per_monitor = {}
+    all_detection = []
+    all_alert = []
+    for monitor_id, client in clients.items():
+        timeline = timelines[monitor_id]
+        changes = timeline.changes(duration)
+        detection = [client.first_seen[i] - timeline.times[i] for i in changes if i in client.first_seen]
+        # Unobserved changes still on the sheet when the simulation ended were not missed
+        pending = [
+            i for i in changes
+            if i not in client.first_seen and (i + 1 == len(timeline.times) or timeline.times[i + 1] >= duration)
+        ]
+        alert_changes = [i for i in changes if is_departure(timeline.values[i].upper())]
+        sent_times = [t for t, _ in notifiers[monitor_id].sent]
+        alert_latency = []
+        for i in alert_changes:
+            # The first notification at or after the departure appeared
+            position = bisect.bisect_left(sent_times, timeline.times[i])
+            if i in client.first_seen and position < len(sent_times):
+                alert_latency.append(sent_times[position] - timeline.times[i])
+        all_detection.extend(detection)
+        all_alert.extend(alert_latency)
+        per_monitor[monitor_id] = {
+            'changes': len(changes),
+            'detected': len(detection),
+            'missed': len(changes) - len(detection) - len(pending),
+            'pending': len(pending),
+            'departures': len(alert_changes),
+            'notifications': len(sent_times),
+            'api_calls': client.api_calls,
+            'api_errors': client.errors,
+            'detection_latency_seconds': _latency_summary(detection),
+            'alert_latency_seconds': _latency_summary(alert_latency)
+        }
+
+    api_calls = sum(client.api_calls for client in clients.values())
+    return {
+        'scenario': scenario.get('name', 'scenario'),
+        'config': {key: value for key, value in config.items() if key != 'monitors'},
+        'simulated_hours': round(duration / 3600, 2),
+        'wall_seconds': round(wall_seconds, 3),
+        'monitors': len(clients),
+        'changes': sum(m['changes'] for m in per_monitor.values()),
+        'detected': sum(m['detected'] for m in per_monitor.values()),
+        'missed': sum(m['missed'] for m in per_monitor.values()),
+        'pending': sum(m['pending'] for m in per_monitor.values()),
+        'departures': sum(m['departures'] for m in per_monitor.values()),
+        'notifications': sum(m['notifications'] for m in per_monitor.values()),
+        'api_calls': api_calls,
+        'api_calls_per_hour': round(api_calls / (duration / 3600), 1),
+        'detection_latency_seconds': _latency_summary(all_detection),
+        'alert_latency_seconds': _latency_summary(all_alert),
+        'per_monitor': per_monitor
+    }
+
+
+def load_scenarios(path):
+    """Load a list of scenarios from a YAML/JSON file ({'scenarios': [...]} or a single scenario)"""
+    with open(path) as f:
+        data = yaml.safe_load(f)
+    return data['scenarios'] if isinstance(data, dict) and 'scenarios' in data else [data]
+
+
+def _parse_overrides(args):
+    """One override dict per compared configuration"""
+    base = {}
+    if args.active_windows:
+        base['active_windows'] = args.active_windows
+    if args.holidays:
+        base['holidays'] = args.holidays
+    if not args.polling_interval:
+        return [base]
+    return [dict(base, polling_interval=float(value)) for value in args.polling_interval.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay cell-value timelines on a virtual clock")
+    parser.add_argument('scenario_file', nargs='?', help="YAML/JSON scenario file (synthetic scenario if omitted)")
+    parser.add_argument('--polling-interval', help="Comma-separated polling intervals to compare")
+    parser.add_argument('--days', type=float, default=1, help="Synthetic scenario length")
+    parser.add_argument('--monitors', type=int, default=1, help="Synthetic scenario monitor count")
+    parser.add_argument('--changes-per-day', type=float, default=6, help="Synthetic departures per day")
+    parser.add_argument('--active-windows', help="Polling windows, e.g. 'mon-fri 06:30-09:00; mon-fri 14:30-16:30'")
+    parser.add_argument('--holidays', help="Dates without polling, e.g. '2024-01-03,2024-01-05..2024-01-06'")
+    parser.add_argument('--json', help="Write the full reports to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('app.monitor').setLevel(logging.CRITICAL)  # simulated errors are counted, not logged
+
+    if args.scenario_file:
+        scenarios = load_scenarios(args.scenario_file)
+        base_dir = os.path.dirname(os.path.abspath(args.scenario_file))
+    else:
+        scenarios = [{
+            'name': 'synthetic',
+            'days': args.days,
+            'monitors': [
+                {'id': f"monitor-{i}", 'synthetic': {'changes_per_day': args.changes_per_day, 'seed': i}}
+                for i in range(args.monitors)
+            ]
+        }]
+        base_dir = '.'
+
+    reports = []
+    print(f"{'scenario':<20} {'interval':>8} {'changes':>7} {'missed':>6} {'detect p50/p95/max (s)':>24} "
+          f"{'alerts':>6} {'API calls/h':>11} {'wall s':>7}")
+    for scenario in scenarios:
+        for overrides in _parse_overrides(args):
+            report = run_scenario(scenario, overrides, base_dir)
+            reports.append(report)
+            latency = report['detection_latency_seconds']
+            print(f"{report['scenario']:<20} {report['config']['polling_interval']:>8} {report['changes']:>7} "
+                  f"{report['missed']:>6} {str(latency['p50']) + '/' + str(latency['p95']) + '/' + str(latency['max']):>24} "
+                  f"{report['notifications']:>6} {report['api_calls_per_hour']:>11} {report['wall_seconds']:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
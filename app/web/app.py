@@ -3,8 +3,10 @@ Flask application creation and configuration for the Google Spreadsheet Monitor
 """
 import logging
 import os
+import tracemalloc
 from flask import Flask
 
+from app.web.assets import init_assets
 from app.web.routes import register_routes
 
 logger = logging.getLogger(__name__)
@@ -30,9 +32,27 @@ def create_app(config, monitoring_service):
         template_folder=os.path.join(base_dir, 'templates')
     )
     
-    # Configure Flask
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
+    # Configure Flask; production mode stops checking templates for edits and
+    # serves pages from the render cache while monitor state is unchanged
+    production = bool(config.get('production_mode'))
+    app.config['TEMPLATES_AUTO_RELOAD'] = not production
+    app.config['PAGE_CACHE'] = production
     app.config['SECRET_KEY'] = config.get('secret_key', os.urandom(24).hex())
+    app.config['SLO_TARGET_SECONDS'] = config.get('slo_target_seconds', 120)
+    app.config['SLO_PERCENTILE'] = config.get('slo_percentile', 95)
+    app.config['HISTORY_DB'] = config.get('history_db')
+    app.config['MONITOR_REGISTRY'] = config.get('monitor_registry')
+    app.config['ADMIN_TOKEN'] = config.get('admin_token')
+    app.config['PROFILE_MAX_SECONDS'] = config.get('profile_max_seconds', 60)
+    
+    app.config['COMPRESS_MIN_BYTES'] = config.get('compress_min_bytes', 1024)
+    
+    # Record allocations from startup for /admin/memory
+    if config.get('trace_memory') and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    
+    # Fingerprinted, precompressed static files and gzip for large responses
+    init_assets(app, config)
     
     # Register routes with the app
     register_routes(app, monitoring_service)
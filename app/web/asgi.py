@@ -0,0 +1,329 @@
+"""
+ASGI serving mode for the Google Spreadsheet Monitor web interface
+Serves the Flask routes from register_routes on an async server through a
+thread-pool WSGI bridge, plus a native async /events stream of status updates
+that holds no thread per connection.
+"""
+import asyncio
+import io
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app.events import EventBus
+from app.web.app import create_app
+
+logger = logging.getLogger(__name__)
+
+# Sentinel marking the end of a WSGI response iterator
+_DONE = object()
+# Shortest gap between status fetches while check events keep arriving
+MIN_PUSH_INTERVAL = 0.1
+
+
+def build_environ(scope, body):
+    """
+    Build a WSGI environ for an ASGI HTTP request
+
+    Args:
+        scope (dict): ASGI connection scope
+        body (bytes): The complete request body
+
+    Returns:
+        dict: WSGI environ
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    # WSGI wants the raw path bytes as a latin-1 string
+    path = scope['path'].encode('utf-8').decode('latin-1')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': path,
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f"HTTP_{name}"
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+class StatusBroadcaster:
+    """
+    Pushes status snapshots to every open /events stream.
+
+    A single task polls the service's state version and, only when it
+    changes, fetches the status once (in the thread pool) and hands it to all
+    subscribers, so thousands of streams cost one poll. When the service has
+    an asynchronous event bus, a 'live' subscriber wakes the task as soon as a
+    check completes; polling remains the fallback (and catches start/stop).
+    """
+
+    def __init__(self, service, executor, poll_interval=0.5):
+        """
+        Initialize the broadcaster
+
+        Args:
+            service: Monitoring service exposing get_state_version() and get_status()
+            executor: Thread pool for the (blocking) service calls
+            poll_interval (float): Seconds between state version checks
+        """
+        self.service = service
+        self.executor = executor
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.latest = None
+        self.version = None
+        self.task = None
+        self.has_subscribers = None
+        self.wake = None
+        self.live = None
+
+    def subscribe(self):
+        """
+        Register a stream
+
+        Returns:
+            asyncio.Queue: Receives each new snapshot (only the latest is kept)
+        """
+        if self.task is None:
+            self.has_subscribers = asyncio.Event()
+            self._subscribe_live(asyncio.get_running_loop())
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        queue = asyncio.Queue(maxsize=1)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        self.has_subscribers.set()
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self.has_subscribers.clear()
+
+    def _subscribe_live(self, loop):
+        """Wake the poll task on check events from the service's event bus, if it has one"""
+        events = getattr(self.service, 'events', None)
+        if not isinstance(events, EventBus) or events.synchronous:
+            return
+        wake = self.wake = asyncio.Event()
+
+        def on_event(event):
+            if not wake.is_set():  # a racy read only costs an extra wake-up
+                loop.call_soon_threadsafe(wake.set)
+
+        # One queued event per monitor is enough to know that something changed
+        self.live = events.subscribe('live', on_event, overflow='latest')
+
+    async def _wait_for_change(self):
+        if self.wake is None:
+            await asyncio.sleep(self.poll_interval)
+            return
+        await asyncio.sleep(MIN_PUSH_INTERVAL)
+        try:
+            await asyncio.wait_for(self.wake.wait(), max(0.0, self.poll_interval - MIN_PUSH_INTERVAL))
+        except asyncio.TimeoutError:
+            pass
+        self.wake.clear()
+
+    async def stop(self):
+        if self.live:
+            self.service.events.unsubscribe(self.live)
+            self.live = None
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.has_subscribers.wait()
+            try:
+                version = await loop.run_in_executor(self.executor, self.service.get_state_version)
+                if version is None or version != self.version:
+                    status = await loop.run_in_executor(self.executor, self.service.get_status)
+                    self.version = version
+                    self._publish(self._snapshot(status, version))
+            except Exception as e:
+                logger.error("Error polling status for event streams: %s", e)
+            await self._wait_for_change()
+
+    @staticmethod
+    def _snapshot(status, version):
+        return json.dumps({
+            'version': version,
+            'is_active': status.get('is_active'),
+            'last_result': status.get('last_result'),
+            'last_check_time': status.get('last_check_time'),
+            'history': status.get('history', []),
+            'monitors': {
+                monitor_id: {'last_result': monitor.get('last_result'),
+                             'last_check_time': monitor.get('last_check_time')}
+                for monitor_id, monitor in (status.get('monitors') or {}).items()
+            }
+        }, default=str)
+
+    def _publish(self, payload):
+        if payload == self.latest:
+            return
+        self.latest = payload
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()  # a slow client only needs the newest snapshot
+            queue.put_nowait(payload)
+
+
+class AsgiApp:
+    """
+    ASGI application serving the Flask app and the /events stream
+    """
+
+    def __init__(self, flask_app, monitoring_service, threads=16, poll_interval=0.5, keepalive=15):
+        """
+        Initialize the ASGI application
+
+        Args:
+            flask_app: The Flask application from create_app()
+            monitoring_service: The monitoring service instance
+            threads (int): Worker threads running Flask requests and service calls
+            poll_interval (float): Seconds between state checks for /events
+            keepalive (float): Seconds between keep-alive comments on idle streams
+        """
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi-wsgi')
+        self.broadcaster = StatusBroadcaster(monitoring_service, self.executor, poll_interval)
+        self.keepalive = keepalive
+        self.open_streams = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['path'] == '/events' and scope['method'] == 'GET':
+                await self._events(scope, receive, send)
+            else:
+                await self._wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.broadcaster.stop()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _wsgi(self, scope, receive, send):
+        """Run a request through the Flask app in the thread pool"""
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        def call_app():
+            result = self.flask_app.wsgi_app(build_environ(scope, body), start_response)
+            return result, iter(result)
+
+        result, chunks = await loop.run_in_executor(self.executor, call_app)
+        try:
+            # Streamed responses (exports) are pulled chunk by chunk off the event loop
+            first = await loop.run_in_executor(self.executor, next, chunks, _DONE)
+            await send({'type': 'http.response.start', 'status': response['status'],
+                        'headers': response['headers']})
+            chunk = first
+            while chunk is not _DONE:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.executor, next, chunks, _DONE)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(result, 'close'):
+                await loop.run_in_executor(self.executor, result.close)
+
+    async def _events(self, scope, receive, send):
+        """Server-sent events: one 'status' event per state change, until the client leaves"""
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        queue = self.broadcaster.subscribe()
+        self.open_streams += 1
+        disconnected = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            while not disconnected.done():
+                update = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({update, disconnected}, timeout=self.keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if update in done:
+                    data = f"event: status\ndata: {update.result()}\n\n"
+                else:
+                    update.cancel()
+                    if disconnected.done():
+                        break
+                    data = ": keep-alive\n\n"
+                await send({'type': 'http.response.body', 'body': data.encode('utf-8'), 'more_body': True})
+        except OSError:
+            pass  # the client went away mid-write
+        finally:
+            disconnected.cancel()
+            self.broadcaster.unsubscribe(queue)
+            self.open_streams -= 1
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+
+def create_asgi_app(config, monitoring_service):
+    """
+    Create the ASGI application
+
+    Args:
+        config (dict): Configuration dictionary
+        monitoring_service: The monitoring service instance
+
+    Returns:
+        AsgiApp: ASGI callable serving every Flask route plus /events
+    """
+    return AsgiApp(
+        create_app(config, monitoring_service),
+        monitoring_service,
+        threads=config.get('asgi_threads', 16),
+        poll_interval=float(config.get('events_poll_interval', 0.5))
+    )
@@ -0,0 +1,193 @@
+"""
+Static asset delivery and response compression for the Google Spreadsheet Monitor
+Fingerprints static URLs for long-lived caching, serves precompressed
+variants, and gzips large HTML/JSON responses on the fly.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+
+from flask import request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Optional: only .gz variants are built without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Cache lifetime of fingerprinted URLs; a new file content gets a new URL
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Lifetime of un-fingerprinted or outdated static URLs
+DEFAULT_MAX_AGE = 300
+
+# Files worth compressing; images such as PNGs are already compressed
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.webmanifest', '.svg', '.ico', '.html', '.txt', '.xml')
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/csv', 'application/x-ndjson')
+
+# Precompressed variant suffixes, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class AssetFingerprints:
+    """Content hashes of static files, recomputed only when a file changes"""
+
+    def __init__(self, static_folder):
+        """
+        Initialize the fingerprint cache
+
+        Args:
+            static_folder (str): Directory static files are served from
+        """
+        self.static_folder = static_folder
+        self.hashes = {}  # filename -> (mtime, size, hash)
+        self.lock = threading.Lock()
+
+    def get(self, filename):
+        """
+        Return the content hash of a static file
+
+        Args:
+            filename (str): Path relative to the static folder
+
+        Returns:
+            str: First 12 hex digits of the file's SHA-256, or None if it does not exist
+        """
+        path = safe_join(self.static_folder, filename)
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        if stat is None:
+            return None
+
+        with self.lock:
+            cached = self.hashes.get(filename)
+        if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+            return cached[2]
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self.lock:
+            self.hashes[filename] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+
+def accepts_encoding(encoding):
+    """Whether the current request accepts a content encoding"""
+    return request.accept_encodings[encoding] > 0
+
+def precompress_static(static_folder, min_bytes=256):
+    """
+    Write .gz (and, with the brotli package, .br) variants of compressible static files
+
+    Variants that are not smaller than the original are not kept.
+
+    Args:
+        static_folder (str): Directory static files are served from
+        min_bytes (int): Smallest file worth compressing
+
+    Returns:
+        list: Paths of the variants written
+    """
+    written = []
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_bytes:
+                continue
+            variants = [('.gz', gzip.compress(data, 9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data)))
+            for suffix, compressed in variants:
+                target = path + suffix
+                if len(compressed) < len(data):
+                    with open(target, 'wb') as f:
+                        f.write(compressed)
+                    written.append(target)
+                elif os.path.exists(target):
+                    os.unlink(target)
+    return written
+
+def init_assets(app, config):
+    """
+    Install fingerprinted static URLs, static file serving and response compression
+
+    Args:
+        app: Flask application instance
+        config (dict): Configuration dictionary
+    """
+    fingerprints = AssetFingerprints(app.static_folder)
+    min_bytes = config.get('compress_min_bytes', 1024)
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        """Add ?v=<content hash> to url_for('static', ...)"""
+        if endpoint == 'static' and 'v' not in values:
+            digest = fingerprints.get(values.get('filename', ''))
+            if digest:
+                values['v'] = digest
+
+    def serve_static(filename):
+        """Serve a static file, preferring a precompressed variant the client accepts"""
+        path = safe_join(app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            raise NotFound()
+
+        encoding = None
+        served_path = path
+        for name, suffix in ENCODINGS:
+            variant = path + suffix
+            if accepts_encoding(name) and os.path.isfile(variant) and \
+                    os.path.getmtime(variant) >= os.path.getmtime(path):
+                encoding, served_path = name, variant
+                break
+
+        response = send_file(served_path, mimetype=guess_mimetype(filename), conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        if request.args.get('v') and request.args.get('v') == fingerprints.get(filename):
+            response.headers['Cache-Control'] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response.headers['Cache-Control'] = f"public, max-age={DEFAULT_MAX_AGE}"
+        return response
+
+    app.view_functions['static'] = serve_static
+
+    @app.after_request
+    def compress_response(response):
+        """Gzip large HTML/JSON responses for clients that accept it"""
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not accepts_encoding('gzip'):
+            return response
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+        response.set_data(gzip.compress(data, 6))
+        response.headers['Content-Encoding'] = 'gzip'
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-gzip", weak)
+        return response
+
+def guess_mimetype(filename):
+    """Content type of a static file, judged by the original (uncompressed) name"""
+    if filename.endswith('.webmanifest'):
+        return 'application/manifest+json'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
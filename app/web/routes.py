@@ -1,11 +1,41 @@
 """
 Flask routes for the Google Spreadsheet Monitor web interface
 """
+import gzip
+import hmac
 import logging
-from flask import render_template, jsonify, redirect, url_for, request
+import tracemalloc
+from datetime import datetime
+from flask import Response, render_template, jsonify, redirect, url_for, request, stream_with_context
+
+from app.history_store import EXPORT_FORMATS, export_rows, get_history_store
+from app.latency import build_slo_report
+from app.profiler import memory_report, profile
+from app.registry import RegistryError, get_monitor_registry
+from app.web.assets import accepts_encoding
 
 logger = logging.getLogger(__name__)
 
+def parse_time(value):
+    """
+    Parse an export time bound given as epoch seconds or an ISO date/datetime
+    
+    Args:
+        value (str): Query parameter value (empty: unbounded)
+        
+    Returns:
+        float: Epoch seconds, or None
+        
+    Raises:
+        ValueError: If the value is neither a number nor an ISO date
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
 def register_routes(app, monitoring_service):
     """
     Register all routes for the Flask application
@@ -14,18 +44,67 @@ def register_routes(app, monitoring_service):
         app: Flask application instance
         monitoring_service: The monitoring service instance
     """
+    def admin_denied():
+        """
+        Check the X-Admin-Token header against the configured admin token
+        
+        Returns:
+            The error response to send, or None if the request may proceed
+        """
+        token = app.config.get('ADMIN_TOKEN')
+        if not token:
+            return jsonify({"status": "error", "message": "Admin endpoints are disabled"}), 404
+        if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), token.encode()):
+            return jsonify({"status": "error", "message": "Invalid admin token"}), 403
+        return None
+    
+    # page name -> {'version', 'etag', 'body', 'gzip' (for large pages)}
+    page_cache = {}
+    
+    def cached_page(name, render):
+        """
+        Serve a page rendered for the current monitor state version
+        
+        Args:
+            name (str): Cache key of the page
+            render (callable): Renders the page when the cached copy is stale
+            
+        Returns:
+            The response, 304 if the client already has this version
+        """
+        version = monitoring_service.get_state_version() if app.config.get('PAGE_CACHE') else None
+        if version is None:
+            return render()
+        cached = page_cache.get(name)
+        if cached is None or cached['version'] != version:
+            body = render().encode('utf-8')
+            cached = page_cache[name] = {'version': version, 'etag': f"{name}-{version}", 'body': body}
+            if len(body) >= app.config['COMPRESS_MIN_BYTES']:
+                cached['gzip'] = gzip.compress(body, 6)
+        
+        headers = {'ETag': f'"{cached["etag"]}"', 'Vary': 'Accept-Encoding'}
+        body = cached['body']
+        if 'gzip' in cached and accepts_encoding('gzip'):
+            headers['ETag'] = f'"{cached["etag"]}-gzip"'
+            headers['Content-Encoding'] = 'gzip'
+            body = cached['gzip']
+        if request.if_none_match.contains(headers['ETag'].strip('"')):
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype='text/html', headers=headers)
     
     @app.route('/')
     def index():
         """Main page with user interface"""
-        status = monitoring_service.get_status()
-        return render_template(
-            'index.html', 
-            is_active=status['is_active'],
-            result=status['last_result'],
-            check_time=status['last_check_time'],
-            history=status['history']
-        )
+        def render():
+            status = monitoring_service.get_status()
+            return render_template(
+                'index.html', 
+                is_active=status['is_active'],
+                result=status['last_result'],
+                check_time=status['last_check_time'],
+                history=status['history']
+            )
+        return cached_page('index', render)
     
     @app.route('/start', methods=['GET', 'POST'])
     def start_polling_endpoint():
@@ -88,7 +167,8 @@ def register_routes(app, monitoring_service):
                 "message": f"Monitoring is currently {'active' if status['is_active'] else 'inactive'}",
                 "last_result": status['last_result'],
                 "last_check_time": status['last_check_time'],
-                "history": status['history']
+                "history": status['history'],
+                "push": status.get('push')
             })
         else:
             return redirect(url_for('index'))
@@ -102,15 +182,126 @@ def register_routes(app, monitoring_service):
     @app.route('/history', methods=['GET'])
     def history():
         """Endpoint to view the history of checks"""
-        status = monitoring_service.get_status()
-        
         if request.headers.get('Accept') == 'application/json':
+            status = monitoring_service.get_status()
             return jsonify({
                 "history": status['history']
             })
         else:
-            return render_template(
-                'history.html',
-                history=status['history'],
-                is_active=status['is_active']
-            )
+            def render():
+                status = monitoring_service.get_status()
+                return render_template(
+                    'history.html',
+                    history=status['history'],
+                    is_active=status['is_active']
+                )
+            return cached_page('history', render)
+    
+    @app.route('/history/export', methods=['GET'])
+    def history_export():
+        """Endpoint streaming stored history as CSV or NDJSON, optionally gzipped"""
+        store = get_history_store(app.config.get('HISTORY_DB'))
+        if store is None:
+            return jsonify({"status": "error", "message": "History is not being stored"}), 404
+        
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"status": "error", "message": f"Unsupported format: {fmt}"}), 400
+        try:
+            start = parse_time(request.args.get('start'))
+            end = parse_time(request.args.get('end'))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": f"Invalid time range: {str(e)}"}), 400
+        monitor_ids = [m for value in request.args.getlist('monitor') for m in value.split(',') if m]
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        
+        filename = f"history.{fmt}" + ('.gz' if compress else '')
+        body = export_rows(store.iter_rows(start, end, monitor_ids), fmt, compress)
+        return Response(
+            stream_with_context(body),
+            mimetype='application/gzip' if compress else EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
+    @app.route('/slo', methods=['GET'])
+    def slo():
+        """Endpoint reporting change-to-alert latency against the SLO target"""
+        target = request.args.get('target', app.config['SLO_TARGET_SECONDS'], type=float)
+        percentile = request.args.get('percentile', app.config['SLO_PERCENTILE'], type=float)
+        return jsonify(build_slo_report(monitoring_service.get_status(), target, percentile))
+    
+    @app.route('/api/monitors', methods=['GET', 'POST'])
+    def monitors_api():
+        """Endpoint listing registered monitors, or applying a bulk batch of changes"""
+        # Monitors spend API quota and name notification topics: admins only
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        registry = get_monitor_registry(app.config.get('MONITOR_REGISTRY'))
+        if registry is None:
+            return jsonify({"status": "error", "message": "Monitor registry is disabled"}), 404
+        
+        if request.method == 'GET':
+            monitors = registry.monitors()
+            return jsonify({"count": len(monitors), "monitors": monitors})
+        
+        changes = request.get_json(silent=True)
+        try:
+            result = registry.apply(changes)
+        except RegistryError as e:
+            return jsonify({"status": "error", "message": str(e), "errors": e.errors}), 400
+        # The batch is committed; swap the running monitors over in one step
+        applied = monitoring_service.reload_monitors()
+        return jsonify({"status": "ok", "result": result, "applied": applied})
+    
+    @app.route('/admin/profile', methods=['GET'])
+    def admin_profile():
+        """Endpoint sampling every thread's stack for a while and returning collapsed stacks"""
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        seconds = request.args.get('seconds', 10, type=float)
+        hz = request.args.get('hz', 100, type=float)
+        if not 0 < seconds <= app.config['PROFILE_MAX_SECONDS'] or not 1 <= hz <= 1000:
+            return jsonify({"status": "error", "message": f"seconds must be in (0, "
+                            f"{app.config['PROFILE_MAX_SECONDS']}] and hz in [1, 1000]"}), 400
+        
+        profiler = profile(seconds, 1 / hz)
+        if profiler is None:
+            return jsonify({"status": "error", "message": "A profile is already running"}), 409
+        return Response(profiler.collapsed(), mimetype='text/plain', headers={
+            'X-Profile-Samples': str(profiler.samples),
+            'X-Profile-Seconds': f"{profiler.duration:.3f}"
+        })
+    
+    @app.route('/admin/memory', methods=['GET'])
+    def admin_memory():
+        """Endpoint reporting memory use by allocation site and subsystem (tracemalloc)"""
+        denied = admin_denied()
+        if denied:
+            return denied
+        
+        # Tracing slows allocations down, so it can be switched on just for an investigation
+        trace = request.args.get('trace')
+        if trace == 'start' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif trace == 'stop' and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        
+        report = memory_report(request.args.get('limit', 20, type=int))
+        status = monitoring_service.get_status()
+        report['monitors'] = len(status.get('monitors') or {})
+        return jsonify(report)
+    
+    @app.route('/webhooks/drive', methods=['POST'])
+    def drive_webhook():
+        """Endpoint receiving Drive change notifications for push mode"""
+        accepted = monitoring_service.handle_push_notification(
+            request.headers.get('X-Goog-Channel-ID'),
+            request.headers.get('X-Goog-Channel-Token'),
+            request.headers.get('X-Goog-Resource-State')
+        )
+        # Drive only needs a 2xx; anything else marks the delivery as failed
+        return ('', 200) if accepted else ('', 403)
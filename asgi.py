@@ -0,0 +1,8 @@
+from app.config import load_config, setup_logging
+from app.service import create_monitoring_service
+from app.web.asgi import create_asgi_app
+
+logger = setup_logging()
+config = load_config()
+monitoring_service = create_monitoring_service(config)
+app = create_asgi_app(config, monitoring_service)
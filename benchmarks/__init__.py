@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Google Spreadsheet Monitor
+Local stand-ins for external services plus load-driving harnesses.
+"""
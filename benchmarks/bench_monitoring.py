@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark for MonitoringService.
+
+Starts benchmarks/fake_sheets_server.py in a child process, builds a
+MonitoringService with N monitors pointed at it and runs full check rounds,
+reporting checks/sec, fetch latency percentiles, CPU time and memory per
+monitor count. Results are written as JSON for comparison across versions:
+
+    python -m benchmarks.bench_monitoring --monitors 1,10,100,1000 --latency-ms 20
+    python -m benchmarks.bench_monitoring --compare benchmarks/results/monitoring-<old>.json
+"""
+import argparse
+import gc
+import json
+import logging
+import threading
+import time
+
+import requests
+
+from app.monitor import MonitoringService
+from app.sheets_client import SheetsClient
+from benchmarks.common import (
+    compare_results, latency_summary, rss_mb, save_results, start_server_process
+)
+
+COMPARED_METRICS = ['checks_per_second', 'fetch_latency.p50_ms', 'fetch_latency.p99_ms',
+                    'cpu_ms_per_check', 'rss_mb.per_monitor_kb']
+
+
+class FetchRecorder:
+    """Times every Sheets API call by wrapping SheetsClient._load_range"""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.original = None
+
+    def install(self):
+        self.original = SheetsClient._load_range
+        recorder = self
+
+        def timed_load_range(client, range_name):
+            started = time.perf_counter()
+            try:
+                return recorder.original(client, range_name)
+            except Exception:
+                with recorder.lock:
+                    recorder.errors += 1
+                raise
+            finally:
+                with recorder.lock:
+                    recorder.samples.append(time.perf_counter() - started)
+
+        SheetsClient._load_range = timed_load_range
+
+    def uninstall(self):
+        SheetsClient._load_range = self.original
+
+    def reset(self):
+        with self.lock:
+            self.samples = []
+            self.errors = 0
+
+
+def build_config(endpoint, monitors, spreadsheets, range_cache_ttl):
+    """Configuration with one single-cell monitor per row, spread over several spreadsheets"""
+    return {
+        'api_key': 'benchmark',
+        'sheets_api_endpoint': endpoint,
+        'polling_interval': 60,
+        'range_cache_ttl': range_cache_ttl,
+        'monitors': [
+            {
+                'id': f"m{index}",
+                'spreadsheet_id': f"sheet-{index % spreadsheets}",
+                'range_name': f"Sheet1!A{index // spreadsheets + 1}"
+            }
+            for index in range(monitors)
+        ]
+    }
+
+
+def run_scale(endpoint, monitors, args, recorder):
+    """Benchmark one monitor count; returns the run's result entry"""
+    gc.collect()
+    rss_before = rss_mb()
+    server_before = requests.get(f"{endpoint}stats", timeout=5).json()
+
+    started = time.perf_counter()
+    service = MonitoringService(build_config(endpoint, monitors, args.spreadsheets, args.range_cache_ttl))
+    setup_seconds = time.perf_counter() - started
+
+    # The first round also builds every API client, so it is reported separately
+    started = time.perf_counter()
+    service.check_now()
+    warmup_seconds = time.perf_counter() - started
+    rss_after = rss_mb()
+
+    recorder.reset()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        service.check_now()
+    elapsed = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_started
+
+    server_after = requests.get(f"{endpoint}stats", timeout=5).json()
+    for monitor in service.monitors.values():
+        monitor.sheets_client.close()
+
+    checks = monitors * args.rounds
+    return {
+        'monitors': monitors,
+        'spreadsheets': args.spreadsheets,
+        'rounds': args.rounds,
+        'setup_seconds': round(setup_seconds, 3),
+        'warmup_seconds': round(warmup_seconds, 3),
+        'elapsed_seconds': round(elapsed, 3),
+        'checks': checks,
+        'checks_per_second': round(checks / elapsed, 1) if elapsed else None,
+        'api_calls': len(recorder.samples),
+        'fetch_errors': recorder.errors,
+        'fetch_latency': latency_summary(recorder.samples),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'cpu_percent': round(cpu_seconds / elapsed * 100, 1) if elapsed else None,
+        'cpu_ms_per_check': round(cpu_seconds / checks * 1000, 3),
+        'rss_mb': {
+            'before': round(rss_before, 1),
+            'after': round(rss_after, 1),
+            'per_monitor_kb': round((rss_after - rss_before) * 1024 / monitors, 1)
+        },
+        'server': {key: server_after[key] - server_before.get(key, 0) for key in server_after}
+    }
+
+
+def print_run(run):
+    latency = run['fetch_latency']
+    print(f"{run['monitors']:>6} monitors: {run['checks_per_second']:>8} checks/s  "
+          f"p50 {latency['p50_ms']} ms  p99 {latency['p99_ms']} ms  "
+          f"cpu {run['cpu_ms_per_check']} ms/check  {run['rss_mb']['per_monitor_kb']} KB/monitor  "
+          f"errors {run['fetch_errors']}/{run['api_calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MonitoringService against a fake Sheets API")
+    parser.add_argument('--monitors', default='1,10,100,1000',
+                        help="Comma-separated monitor counts to run (up to 10000)")
+    parser.add_argument('--rounds', type=int, default=3, help="Measured check rounds per monitor count")
+    parser.add_argument('--spreadsheets', type=int, default=10, help="Distinct spreadsheets monitors are spread over")
+    parser.add_argument('--range-cache-ttl', type=float, default=0,
+                        help="Shared fetch cache TTL (0 measures one API call per check)")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--change-every', type=float, default=5.0)
+    parser.add_argument('--output', help="Result file (default benchmarks/results/monitoring-<time>.json)")
+    parser.add_argument('--compare', help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('app').setLevel(logging.CRITICAL)  # fetch errors are counted, not logged
+
+    server_args = [
+        '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate),
+        '--change-every', str(args.change_every), '--seed', '1'
+    ]
+    server, endpoint = start_server_process('benchmarks.fake_sheets_server', server_args)
+    recorder = FetchRecorder()
+    recorder.install()
+    runs = []
+    try:
+        for monitors in [int(count) for count in args.monitors.split(',')]:
+            run = run_scale(endpoint, monitors, args, recorder)
+            print_run(run)
+            runs.append(run)
+    finally:
+        recorder.uninstall()
+        server.terminate()
+        server.wait()
+
+    settings = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+    path = save_results('monitoring', {'settings': settings, 'runs': runs}, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {run['monitors']: run for run in json.load(f)['runs']}
+        for run in runs:
+            if run['monitors'] in baseline:
+                changes = compare_results(baseline[run['monitors']], run, COMPARED_METRICS)
+                print(f"{run['monitors']} monitors vs baseline: " + ", ".join(
+                    f"{key} {change['change_pct']:+}%" for key, change in changes.items()
+                    if change['change_pct'] is not None
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Notification throughput benchmark.
+
+Runs benchmarks/fake_ntfy_server.py under several behaviours (healthy, slow,
+flaky, rate limited, stalled) and pushes bursts of alerts through
+NtfyNotifier sequentially, from concurrent senders, and through
+NotificationManager fan-out to several topics. Reports throughput, latency
+percentiles and loss per scenario, offline, in one command:
+
+    python -m benchmarks.bench_notifications
+    python -m benchmarks.bench_notifications --scenarios slow,throttled --messages 500
+"""
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app.notifier import NotificationManager, NtfyNotifier
+from benchmarks.common import compare_results, latency_summary, save_results, start_server_process
+
+# Server behaviour per scenario; 'messages' caps the burst where each send is slow by design
+SCENARIOS = {
+    'healthy': {'server': []},
+    'slow': {'server': ['--latency-ms', '250', '--jitter-ms', '100']},
+    'flaky': {'server': ['--failure-rate', '0.1']},
+    'throttled': {'server': ['--rate-limit', '20', '--burst', '30']},
+    'stalled': {'server': ['--latency-ms', '3000'], 'messages': 10},
+}
+
+MODES = ('sequential', 'concurrent', 'fanout')
+
+COMPARED_METRICS = ['throughput_per_second', 'latency.p50_ms', 'latency.p99_ms', 'loss']
+
+
+def send_burst(mode, server_url, messages, args):
+    """
+    Send one burst of alerts
+
+    In fan-out mode every alert goes to args.fanout topics, so the server should
+    see messages * fanout deliveries.
+
+    Returns:
+        tuple: (per-send latencies in seconds, number of sends reported successful,
+                elapsed seconds, deliveries expected at the server)
+    """
+    config = {'notification_topic': 'bench', 'ntfy_server': server_url, 'ntfy_timeout': args.timeout}
+    latencies = []
+
+    def timed(sender, index):
+        started = time.perf_counter()
+        ok = sender(f"alert {index}", title="Benchmark")
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    started = time.perf_counter()
+    if mode == 'fanout':
+        manager = NotificationManager(config)
+        manager.notifiers = [
+            NtfyNotifier(dict(config, notification_topic=f"bench-{topic}")) for topic in range(args.fanout)
+        ] + manager.notifiers[-1:]  # keep the log notifier the manager always adds
+        successes = sum(timed(manager.send_notification, index) for index in range(messages))
+        expected = messages * args.fanout
+    elif mode == 'concurrent':
+        notifier = NtfyNotifier(config)
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            successes = sum(pool.map(lambda index: timed(notifier.send, index), range(messages)))
+        expected = messages
+    else:
+        notifier = NtfyNotifier(config)
+        successes = sum(timed(notifier.send, index) for index in range(messages))
+        expected = messages
+    return latencies, successes, time.perf_counter() - started, expected
+
+
+def wait_until_idle(url, timeout=15):
+    """Wait for the server to finish in-flight publishes; returns its stats"""
+    deadline = time.monotonic() + timeout
+    while True:
+        stats = requests.get(f"{url}/stats", timeout=5).json()
+        if not stats['in_flight'] or time.monotonic() > deadline:
+            return stats
+        time.sleep(0.05)
+
+
+def run_scenario(name, scenario, args):
+    """Benchmark every mode against one server behaviour"""
+    process, url = start_server_process('benchmarks.fake_ntfy_server', scenario['server'] + ['--seed', '1'])
+    url = url.rstrip('/')
+    runs = []
+    try:
+        for mode in args.modes:
+            messages = min(args.messages, scenario.get('messages', args.messages))
+            wait_until_idle(url)
+            requests.delete(f"{url}/stats", timeout=5)
+            latencies, successes, elapsed, expected = send_burst(mode, url, messages, args)
+            # Requests abandoned by a client timeout may still complete on the server
+            server = wait_until_idle(url)
+            runs.append({
+                'scenario': name,
+                'mode': mode,
+                'messages': messages,
+                'expected_deliveries': expected,
+                'reported_successes': successes,
+                'delivered': server['unique_delivered'],
+                'loss': expected - server['unique_delivered'],
+                # The manager reports success if any provider (including the log) succeeded
+                'false_failures': None if mode == 'fanout' else max(0, server['unique_delivered'] - successes),
+                'elapsed_seconds': round(elapsed, 3),
+                'throughput_per_second': round(successes / elapsed, 1) if elapsed else None,
+                'latency': latency_summary(latencies),
+                'server': {key: server[key] for key in ('requests', 'delivered', 'failed', 'throttled')}
+            })
+            print_run(runs[-1])
+    finally:
+        process.terminate()
+        process.wait()
+    return runs
+
+
+def print_run(run):
+    latency = run['latency']
+    print(f"{run['scenario']:>9} {run['mode']:>10}: {run['throughput_per_second']:>7} msg/s  "
+          f"p50 {latency['p50_ms']} ms  p99 {latency['p99_ms']} ms  "
+          f"delivered {run['delivered']}/{run['expected_deliveries']}  "
+          f"loss {run['loss']}  false failures {run['false_failures']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification delivery against a fake ntfy server")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma-separated scenarios ({', '.join(SCENARIOS)})")
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated modes ({', '.join(MODES)})")
+    parser.add_argument('--messages', type=int, default=100, help="Alerts per burst")
+    parser.add_argument('--concurrency', type=int, default=8, help="Sender threads in concurrent mode")
+    parser.add_argument('--fanout', type=int, default=3, help="ntfy topics in fan-out mode")
+    parser.add_argument('--timeout', type=float, default=1.0, help="ntfy_timeout used by the notifiers")
+    parser.add_argument('--output', help="Result file (default benchmarks/results/notifications-<time>.json)")
+    parser.add_argument('--compare', help="Earlier result file to compare against")
+    args = parser.parse_args()
+    args.modes = args.modes.split(',')
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('app').setLevel(logging.CRITICAL)  # failures are counted, not logged
+
+    runs = []
+    for name in args.scenarios.split(','):
+        runs.extend(run_scenario(name, SCENARIOS[name], args))
+
+    settings = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+    path = save_results('notifications', {'settings': settings, 'runs': runs}, args.output)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(run['scenario'], run['mode']): run for run in json.load(f)['runs']}
+        for run in runs:
+            key = (run['scenario'], run['mode'])
+            if key in baseline:
+                changes = compare_results(baseline[key], run, COMPARED_METRICS)
+                print(f"{run['scenario']} {run['mode']} vs baseline: " + ", ".join(
+                    f"{metric} {change['change_pct']:+}%" for metric, change in changes.items()
+                    if change['change_pct'] is not None
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Shared helpers for the benchmark harnesses
+Percentiles, process resource usage and JSON result files.
+"""
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile
+
+    Args:
+        samples (list): Numeric samples (need not be sorted)
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float or None: The percentile, or None without samples
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples):
+    """Summarize latencies in seconds as p50/p90/p99/max milliseconds"""
+    summary = {'count': len(samples)}
+    for name, pct in (('p50_ms', 50), ('p90_ms', 90), ('p99_ms', 99), ('max_ms', 100)):
+        value = percentile(samples, pct)
+        summary[name] = round(value * 1000, 3) if value is not None else None
+    return summary
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def environment():
+    """Describe the machine and code version a result was produced on"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def save_results(name, results, path=None):
+    """
+    Write benchmark results as JSON
+
+    Args:
+        name (str): Benchmark name, used in the default file name
+        results (dict): Results to save; environment details are added
+        path (str): Output file (default benchmarks/results/<name>-<timestamp>.json)
+
+    Returns:
+        str: The path written
+    """
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(dict(results, benchmark=name, environment=environment()), f, indent=2)
+    return path
+
+
+def compare_results(baseline, current, keys):
+    """
+    Relative change of selected metrics between two result runs
+
+    Args:
+        baseline (dict): One run entry from an earlier result file
+        current (dict): The matching run entry from this result file
+        keys (list): Dotted metric paths such as 'fetch_latency.p99_ms'
+
+    Returns:
+        dict: path -> {'baseline', 'current', 'change_pct'}
+    """
+    def lookup(data, path):
+        for part in path.split('.'):
+            if not isinstance(data, dict):
+                return None
+            data = data.get(part)
+        return data
+
+    changes = {}
+    for key in keys:
+        old, new = lookup(baseline, key), lookup(current, key)
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            change = round((new - old) / old * 100, 1) if old else None
+            changes[key] = {'baseline': old, 'current': new, 'change_pct': change}
+    return changes
+
+
+def free_port():
+    """Return a TCP port that is currently free on localhost"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server_process(module, args, timeout=10):
+    """
+    Run one of the fake servers in a child process so its CPU time is not
+    attributed to the code being measured
+
+    Args:
+        module (str): Module to run with python -m, e.g. 'benchmarks.fake_sheets_server'
+        args (list): Extra command line arguments (--port is added)
+        timeout (float): Seconds to wait for the server to accept connections
+
+    Returns:
+        tuple: (subprocess.Popen, base URL ending in '/')
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', module, '--port', str(port)] + list(args),
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{module} exited with code {process.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}/"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{module} did not start within {timeout}s")
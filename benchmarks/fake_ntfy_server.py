@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an ntfy server.
+
+Accepts POST /<topic> publishes like ntfy.sh, with configurable latency,
+random failures and token-bucket rate limiting (HTTP 429), and records what
+was delivered so benchmarks can measure loss. Delivery counters are
+available at GET /stats. Point the app at it with NTFY_SERVER:
+
+    python -m benchmarks.fake_ntfy_server --port 8098 --latency-ms 50 --rate-limit 5 --burst 20
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Does not print tracebacks when a client gives up on a slow response"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, with bursts of up to burst"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Consume a token; returns False when the bucket is empty"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FakeNtfyServer:
+    """Threaded HTTP server accepting ntfy publish requests"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0,
+                 failure_rate=0.0, rate_limit=None, burst=60, seed=None):
+        """
+        Initialize the server (call start() to begin serving)
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+            latency_ms (float): Delay added before answering each publish
+            jitter_ms (float): Uniform random extra delay per publish
+            failure_rate (float): Fraction of publishes answered with HTTP 500
+            rate_limit (float): Sustained publishes per second before HTTP 429 (None: unlimited)
+            burst (int): Publishes allowed at once before the rate limit applies
+            seed (int): Seed for the failure/latency random generator
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.failure_rate = failure_rate
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'delivered': 0, 'failed': 0, 'throttled': 0}
+        self.messages = {}  # topic -> delivered message bodies
+        self.in_flight = 0
+        self.httpd = _QuietHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        """Base URL to use as the ntfy server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_stats(self):
+        """Return the request counters and the number of distinct messages delivered"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+            stats['unique_delivered'] = sum(len(set(bodies)) for bodies in self.messages.values())
+            stats['topics'] = {topic: len(bodies) for topic, bodies in self.messages.items()}
+            stats['in_flight'] = self.in_flight
+        return stats
+
+    def reset(self):
+        """Clear counters and delivered messages"""
+        with self.stats_lock:
+            self.stats = dict.fromkeys(self.stats, 0)
+            self.messages = {}
+
+    def _draw(self):
+        with self.random_lock:
+            return self.random.random(), self.random.random()
+
+    def _count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body, headers=None):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path == '/stats':
+                    self._reply(200, server.get_stats())
+                else:
+                    self._reply(404, {'code': 40401, 'http': 404, 'error': 'page not found'})
+
+            def do_DELETE(self):
+                if self.path == '/stats':
+                    server.reset()
+                    self._reply(200, {})
+                else:
+                    self._reply(404, {'code': 40401, 'http': 404, 'error': 'page not found'})
+
+            def do_POST(self):
+                with server.stats_lock:
+                    server.in_flight += 1
+                try:
+                    self._publish()
+                finally:
+                    with server.stats_lock:
+                        server.in_flight -= 1
+
+            def _publish(self):
+                topic = self.path.strip('/').split('?')[0]
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8', 'replace')
+                server._count('requests')
+
+                if server.bucket and not server.bucket.take():
+                    server._count('throttled')
+                    self._reply(429, {'code': 42901, 'http': 429, 'error': 'limit reached: too many requests'},
+                                {'Retry-After': '1'})
+                    return
+
+                outcome, jitter = server._draw()
+                delay = server.latency + server.jitter * jitter
+                if delay:
+                    time.sleep(delay)
+                if outcome < server.failure_rate:
+                    server._count('failed')
+                    self._reply(500, {'code': 50001, 'http': 500, 'error': 'internal server error'})
+                    return
+
+                with server.stats_lock:
+                    server.stats['delivered'] += 1
+                    server.messages.setdefault(topic, []).append(body)
+                self._reply(200, {
+                    'id': f"{time.time_ns():x}", 'time': int(time.time()), 'event': 'message',
+                    'topic': topic, 'message': body, 'title': self.headers.get('Title')
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake ntfy server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Delay added to every publish")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random extra delay per publish")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of publishes failing with 500")
+    parser.add_argument('--rate-limit', type=float, help="Sustained publishes/sec before HTTP 429")
+    parser.add_argument('--burst', type=int, default=60, help="Publishes allowed at once before throttling")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeNtfyServer(
+        args.host, args.port, args.latency_ms, args.jitter_ms,
+        args.failure_rate, args.rate_limit, args.burst, args.seed
+    ).start()
+    print(f"Fake ntfy server listening on {server.url} (NTFY_SERVER={server.url})")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google Sheets v4 values API.
+
+Serves GET /v4/spreadsheets/<id>/values/<range> with configurable latency,
+error and throttling rates and scripted cell-value timelines, so the monitor
+can be exercised end to end without network access or quota. Like the real
+API it honours fields=values and majorDimension, and gzips responses for
+clients that accept it. Request counters are available at GET /stats. Point the monitor at it with
+SHEETS_API_ENDPOINT=http://127.0.0.1:<port>/ or run:
+
+    python -m benchmarks.fake_sheets_server --port 8099 --latency-ms 40 --change-every 30
+"""
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app.fetch_cache import parse_a1
+
+_VALUES_PATH = re.compile(r"^/v4/spreadsheets/(?P<spreadsheet>[^/]+)/values/(?P<range>[^?]+)")
+
+DEFAULT_VALUE = 'ON TIME'
+CHANGED_VALUE = 'DEPARTED'
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Does not print tracebacks when a client gives up on a slow response"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeSheetsServer:
+    """
+    Threaded HTTP server answering Sheets values.get requests.
+
+    Cell values come from, in order: an explicit timeline for the cell
+    ("Sheet1!A1" -> [[seconds_after_start, value], ...]), a periodic flip
+    between ON TIME and DEPARTED every change_every seconds (staggered by row),
+    or ON TIME.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, throttle_rate=0.0, change_every=None, timeline=None, seed=None):
+        """
+        Initialize the server (call start() to begin serving)
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+            latency_ms (float): Added delay per request
+            jitter_ms (float): Uniform random extra delay per request
+            error_rate (float): Fraction of requests answered with HTTP 500
+            throttle_rate (float): Fraction of requests answered with HTTP 429
+            change_every (float): Flip every cell's value this often (seconds)
+            timeline (dict): Scripted values per cell, see class docstring
+            seed (int): Seed for the error/latency random generator
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.change_every = change_every
+        self.timeline = {
+            self._cell_key(parse_a1(cell)): sorted(points)
+            for cell, points in (timeline or {}).items()
+        }
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0, 'cells_served': 0, 'bytes_sent': 0}
+        self.last_query = {}  # query parameters of the last values request
+        self.started_at = time.monotonic()
+        self.httpd = _QuietHTTPServer((host, port), self._handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        """Base URL to use as the Sheets API endpoint"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Serve requests in a background thread"""
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_stats(self):
+        """Return a copy of the request counters"""
+        with self.stats_lock:
+            return dict(self.stats)
+
+    @staticmethod
+    def _cell_key(ref):
+        return (ref.sheet, ref.row1, ref.col1)
+
+    def cell_value(self, sheet, row, col, elapsed):
+        """Value of one cell elapsed seconds after start()"""
+        points = self.timeline.get((sheet, row, col))
+        if points:
+            value = DEFAULT_VALUE
+            for offset, point_value in points:
+                if offset > elapsed:
+                    break
+                value = point_value
+            return value
+        if self.change_every:
+            # Stagger rows so changes are spread over the period rather than simultaneous
+            phase = (row % 10) * self.change_every / 10
+            return CHANGED_VALUE if int((elapsed + phase) / self.change_every) % 2 else DEFAULT_VALUE
+        return DEFAULT_VALUE
+
+    def values_for(self, range_name):
+        """Row-major values for an A1 range at the current time"""
+        ref = parse_a1(range_name)
+        if ref is None:
+            return [[DEFAULT_VALUE]]
+        elapsed = time.monotonic() - self.started_at
+        return [
+            [self.cell_value(ref.sheet, row, col, elapsed) for col in range(ref.col1, ref.col2 + 1)]
+            for row in range(ref.row1, ref.row2 + 1)
+        ]
+
+    def _draw(self):
+        with self.random_lock:
+            return self.random.random(), self.random.random()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; without this, Nagle's algorithm
+            # plus delayed ACKs add ~40 ms to keep-alive responses
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    payload = gzip.compress(payload)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server.stats_lock:
+                    server.stats['bytes_sent'] += len(payload)
+
+            def do_GET(self):
+                if self.path == '/stats':
+                    self._reply(200, server.get_stats())
+                    return
+                match = _VALUES_PATH.match(self.path)
+                if not match:
+                    self._reply(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+                    return
+
+                outcome, jitter = server._draw()
+                delay = server.latency + server.jitter * jitter
+                if delay:
+                    time.sleep(delay)
+
+                with server.stats_lock:
+                    server.stats['requests'] += 1
+                if outcome < server.throttle_rate:
+                    with server.stats_lock:
+                        server.stats['throttled'] += 1
+                    self._reply(429, {'error': {
+                        'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                        'message': 'Quota exceeded for quota metric Read requests per minute per user'
+                    }})
+                    return
+                if outcome < server.throttle_rate + server.error_rate:
+                    with server.stats_lock:
+                        server.stats['errors'] += 1
+                    self._reply(500, {'error': {'code': 500, 'status': 'INTERNAL', 'message': 'Internal error'}})
+                    return
+
+                range_name = unquote(match.group('range'))
+                query = parse_qs(urlsplit(self.path).query)
+                values = server.values_for(range_name)
+                dimension = query.get('majorDimension', ['ROWS'])[0]
+                if dimension == 'COLUMNS':
+                    values = [list(column) for column in zip(*values)]
+                with server.stats_lock:
+                    server.stats['ok'] += 1
+                    server.stats['cells_served'] += sum(len(row) for row in values)
+                    server.last_query = query
+                body = {'range': range_name, 'majorDimension': dimension, 'values': values}
+                if 'fields' in query:
+                    body = {key: body[key] for key in query['fields'][0].split(',') if key in body}
+                self._reply(200, body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Google Sheets values API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random extra delay per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument('--change-every', type=float, help="Flip cell values every N seconds")
+    parser.add_argument('--timeline', help="JSON file: {\"Sheet1!A1\": [[seconds, value], ...]}")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    timeline = None
+    if args.timeline:
+        with open(args.timeline) as f:
+            timeline = json.load(f)
+
+    server = FakeSheetsServer(
+        args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+        args.throttle_rate, args.change_every, timeline, args.seed
+    ).start()
+    print(f"Fake Sheets API listening on {server.url} (SHEETS_API_ENDPOINT={server.url})")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
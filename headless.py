@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Google Spreadsheet Cell Monitor - Headless Entry Point
+Runs the monitoring service with notifications only, without the web interface.
+"""
+import argparse
+import json
+import resource
+import signal
+import sys
+import threading
+import time
+
+_started = time.perf_counter()
+
+from app.config import load_config, setup_logging
+from app.service import create_monitoring_service
+
+
+def rss_mb():
+    """
+    Get the resident set size of this process
+
+    Returns:
+        float: Current RSS in MB (peak RSS where /proc is unavailable)
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def main(argv=None):
+    """Main entry point for headless monitoring"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--once', action='store_true',
+                        help='Run a single check, print startup metrics as JSON and exit')
+    args = parser.parse_args(argv)
+
+    logger = setup_logging()
+    config = load_config()
+    if not config:
+        logger.error("Failed to load configuration. Exiting.")
+        return 1
+    if args.once:
+        config['hot_reload'] = False
+
+    service = create_monitoring_service(config)
+    metrics = {'startup_seconds': round(time.perf_counter() - _started, 3)}
+
+    if args.once:
+        service.check_now()
+        # Alerts and history writes run on subscriber threads; let them land before exiting
+        flush = getattr(service, 'flush', None)
+        if flush:
+            flush(timeout=30)
+        metrics['rss_mb'] = round(rss_mb(), 1)
+        print(json.dumps(metrics))
+        return 0
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    service.start()
+    logger.info("Headless monitor started in %.2fs, RSS %.1f MB", metrics['startup_seconds'], rss_mb())
+    stop_event.wait()
+
+    logger.info("Shutting down headless monitor")
+    service.stop()
+    reloader = getattr(service, 'config_reloader', None)
+    if reloader:
+        reloader.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@ This script starts the monitoring service and web interface.
 import sys
 import logging
 from app.config import load_config, setup_logging
-from app.monitor import MonitoringService
+from app.service import create_monitoring_service
 from app.web.app import create_app
 
 def main():
@@ -24,7 +24,7 @@ def main():
     
     # Create monitoring service
     logger.info("Initializing monitoring service...")
-    monitoring_service = MonitoringService(config)
+    monitoring_service = create_monitoring_service(config)
     
     # Create Flask app
     logger.info("Creating Flask application...")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Google Drive push notifications.
+
+Posts fake change notifications to the monitor's /webhooks/drive endpoint,
+mimicking the headers Drive sends for a files.watch channel. Run the monitor
+with PUSH_MODE=1, PUSH_REGISTER=0 and a known PUSH_TOKEN, then:
+
+    python scripts/fake_drive_push.py --token <PUSH_TOKEN> --count 3
+
+Channel ids are discovered from /status unless given with --channel.
+"""
+import argparse
+import sys
+import time
+
+import requests
+
+def discover_channels(base_url):
+    """Return the push channel ids the running monitor has registered"""
+    response = requests.get(f"{base_url}/status", headers={'Accept': 'application/json'}, timeout=5)
+    response.raise_for_status()
+    push = response.json().get('push') or {}
+    return list(push.get('channels', {}))
+
+def send_notification(base_url, channel_id, token, state, message_number):
+    """Post one Drive-style notification; returns the HTTP status code"""
+    headers = {
+        'X-Goog-Channel-ID': channel_id,
+        'X-Goog-Channel-Token': token,
+        'X-Goog-Resource-State': state,
+        'X-Goog-Resource-ID': 'fake-resource',
+        'X-Goog-Message-Number': str(message_number),
+    }
+    response = requests.post(f"{base_url}/webhooks/drive", headers=headers, timeout=5)
+    return response.status_code
+
+def main():
+    parser = argparse.ArgumentParser(description="Send fake Drive change notifications")
+    parser.add_argument('--url', default='http://localhost:5588', help="Base URL of the monitor")
+    parser.add_argument('--token', required=True, help="PUSH_TOKEN configured on the monitor")
+    parser.add_argument('--channel', action='append', help="Channel id (repeatable); discovered if omitted")
+    parser.add_argument('--state', default='update', help="X-Goog-Resource-State to send")
+    parser.add_argument('--count', type=int, default=1, help="Notifications per channel")
+    parser.add_argument('--interval', type=float, default=1.0, help="Seconds between notifications")
+    args = parser.parse_args()
+
+    base_url = args.url.rstrip('/')
+    channels = args.channel or discover_channels(base_url)
+    if not channels:
+        print("No push channels registered; is the monitor running with PUSH_MODE=1 and started?")
+        sys.exit(1)
+
+    for number in range(1, args.count + 1):
+        for channel_id in channels:
+            status_code = send_notification(base_url, channel_id, args.token, args.state, number)
+            print(f"#{number} channel={channel_id} state={args.state} -> HTTP {status_code}")
+        if number < args.count:
+            time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Build precompressed variants of the static files.
+
+Writes <file>.gz (and <file>.br when the brotli package is installed) next to
+each compressible file under static/, so they can be served without
+compressing on every request. Run after changing static files:
+
+    python scripts/precompress_static.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.web.assets import brotli, precompress_static  # noqa: E402
+
+
+def main():
+    default_static = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+    parser = argparse.ArgumentParser(description="Precompress static files")
+    parser.add_argument('--static-dir', default=default_static)
+    parser.add_argument('--min-bytes', type=int, default=256, help="Skip files smaller than this")
+    args = parser.parse_args()
+
+    written = precompress_static(args.static_dir, args.min_bytes)
+    for path in written:
+        print(f"{path} ({os.path.getsize(path)} bytes)")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were built")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Tests for the ASGI serving mode
+"""
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock
+from app.events import CheckEvent, EventBus
+from app.web.asgi import create_asgi_app
+
+def http_scope(method, path, query=b'', headers=()):
+    return {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query,
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+        'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 5000)
+    }
+
+async def request(app, method, path, body=b'', headers=()):
+    """Drive one request through the ASGI app and collect the response"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(http_scope(method, path, headers=headers), receive, send)
+    headers = dict(sent[0]['headers'])
+    return sent[0]['status'], headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+class EventStream:
+    """An open /events connection, recording the events it receives"""
+
+    def __init__(self, app):
+        self.events = []
+        self.received = asyncio.Event()
+        self.disconnect = asyncio.Event()
+        self.task = asyncio.ensure_future(app(http_scope('GET', '/events'), self.receive, self.send))
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        body = message.get('body', b'').decode()
+        if body.startswith('event: status'):
+            self.events.append(json.loads(body.split('data: ', 1)[1]))
+            self.received.set()
+
+    async def next_event(self):
+        await asyncio.wait_for(self.received.wait(), 5)
+        self.received.clear()
+        return self.events[-1]
+
+    async def close(self):
+        self.disconnect.set()
+        await asyncio.wait_for(self.task, 5)
+
+class TestAsgiApp(unittest.TestCase):
+    """Test suite for AsgiApp class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.service = MagicMock()
+        self.service.is_active = True
+        self.service.get_state_version.return_value = 1
+        self.service.get_status.return_value = {
+            'is_active': True,
+            'last_result': "Current Status: 'ON TIME'",
+            'last_check_time': 'Last Checked: 2024-01-01 07:00:00',
+            'history': []
+        }
+        self.app = create_asgi_app({'events_poll_interval': 0.01}, self.service)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.app.executor.shutdown()
+
+    def test_flask_routes(self):
+        """Test that register_routes endpoints are served through the bridge"""
+        async def run():
+            status, headers, body = await request(self.app, 'GET', '/status',
+                                                  headers=[('Accept', 'application/json')])
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(body)['status'], 'active')
+
+            status, headers, _ = await request(self.app, 'POST', '/check_now', body=b'x=1',
+                                               headers=[('Content-Type', 'application/x-www-form-urlencoded')])
+            self.assertEqual(status, 302)
+            self.service.check_now.assert_called_once()
+        asyncio.run(run())
+
+    def test_events_follow_state_changes(self):
+        """Test that streams get the status, then an update when the version changes"""
+        async def run():
+            stream = EventStream(self.app)
+            first = await stream.next_event()
+            self.assertEqual(first['last_result'], "Current Status: 'ON TIME'")
+
+            self.service.get_status.return_value = dict(self.service.get_status.return_value,
+                                                        last_result='*** DEPARTED ***')
+            self.service.get_state_version.return_value = 2
+            second = await stream.next_event()
+            self.assertEqual(second['last_result'], '*** DEPARTED ***')
+            self.assertEqual(second['version'], 2)
+
+            await stream.close()
+            self.assertEqual(self.app.open_streams, 0)
+            await self.app.broadcaster.stop()
+        asyncio.run(run())
+
+    def test_many_streams_share_one_poll(self):
+        """Test that thousands of open streams hold no threads and share status reads"""
+        async def run():
+            streams = [EventStream(self.app) for _ in range(2000)]
+            await asyncio.gather(*(stream.next_event() for stream in streams))
+            self.assertEqual(self.app.open_streams, 2000)
+            self.assertEqual(self.service.get_status.call_count, 1)
+
+            await asyncio.gather(*(stream.close() for stream in streams))
+            await self.app.broadcaster.stop()
+        asyncio.run(run())
+
+    def test_check_events_wake_streams(self):
+        """Test that a check event pushes the new status without waiting for the poll interval"""
+        self.service.events = EventBus()
+        app = create_asgi_app({'events_poll_interval': 30}, self.service)
+        self.addCleanup(app.executor.shutdown)
+
+        async def run():
+            stream = EventStream(app)
+            await stream.next_event()
+            self.service.get_state_version.return_value = 2
+            self.service.events.publish(CheckEvent('normal', MagicMock(monitor_id='a')))
+            self.assertEqual((await stream.next_event())['version'], 2)
+
+            stats = self.service.events.get_stats()['subscribers']
+            self.assertEqual(stats['live']['received'], 1)
+            await stream.close()
+            await app.broadcaster.stop()
+            self.assertEqual(self.service.events.subscriptions, [])
+        asyncio.run(run())
+
+    def test_lifespan(self):
+        """Test the lifespan startup and shutdown handshake"""
+        async def run():
+            messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message['type'])
+
+            await self.app({'type': 'lifespan'}, receive, send)
+            self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for static asset delivery and response compression
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from flask import Flask, jsonify, url_for
+from app.web.assets import AssetFingerprints, IMMUTABLE_MAX_AGE, init_assets, precompress_static
+
+class TestAssets(unittest.TestCase):
+    """Test suite for init_assets and precompress_static"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.static_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.static_dir, 'site.webmanifest'), 'w') as f:
+            f.write('{"name": "monitor", "icons": []}' * 40)
+        with open(os.path.join(self.static_dir, 'logo.png'), 'wb') as f:
+            f.write(os.urandom(2048))
+
+        self.app = Flask(__name__, static_folder=self.static_dir, static_url_path='/static')
+        init_assets(self.app, {'compress_min_bytes': 100})
+
+        @self.app.route('/data')
+        def data():
+            return jsonify({'history': [['2024-01-01 07:00:00', 'normal', 'ON TIME']] * 50})
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        shutil.rmtree(self.static_dir)
+
+    def test_fingerprinted_url(self):
+        """Test that static URLs carry a content hash and are cached for a year"""
+        with self.app.test_request_context():
+            url = url_for('static', filename='site.webmanifest')
+        digest = AssetFingerprints(self.static_dir).get('site.webmanifest')
+        self.assertTrue(url.endswith(f"?v={digest}"))
+
+        response = self.client.get(url)
+        self.assertIn(f"max-age={IMMUTABLE_MAX_AGE}", response.headers['Cache-Control'])
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertNotIn('immutable', self.client.get('/static/site.webmanifest?v=old').headers['Cache-Control'])
+
+    def test_precompressed_variant(self):
+        """Test that a .gz variant is served only to clients accepting gzip"""
+        written = precompress_static(self.static_dir)
+        self.assertEqual([os.path.basename(path) for path in written], ['site.webmanifest.gz'])
+
+        response = self.client.get('/static/site.webmanifest', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'application/manifest+json')
+        with open(os.path.join(self.static_dir, 'site.webmanifest'), 'rb') as f:
+            self.assertEqual(gzip.decompress(response.data), f.read())
+
+        plain = self.client.get('/static/site.webmanifest')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+    def test_missing_static_file(self):
+        """Test that unknown and escaping paths are not found"""
+        self.assertEqual(self.client.get('/static/nope.js').status_code, 404)
+        self.assertEqual(self.client.get('/static/../tests/test_assets.py').status_code, 404)
+
+    def test_large_json_compressed(self):
+        """Test on-the-fly gzip of large JSON responses only"""
+        response = self.client.get('/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'ON TIME', gzip.decompress(response.data))
+
+        self.assertNotIn('Content-Encoding', self.client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers)
+        self.assertNotIn('Content-Encoding', self.client.get('/data').headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the auth module
+"""
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from app.auth import AuthorizedHttp, TokenProvider
+from app.clock import VirtualClock
+from app.sheets_client import SheetsClient, reset_shared_services
+
+class FakeCredentials:
+    """Credentials issuing numbered tokens valid for an hour"""
+
+    def __init__(self, clock, fail=False):
+        self.clock = clock
+        self.fail = fail
+        self.refreshes = 0
+        self.token = None
+        self.expiry = None
+
+    def refresh(self, request):
+        if self.fail:
+            raise RuntimeError("invalid_grant")
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.expiry = datetime.fromtimestamp(self.clock.time() + 3600, timezone.utc).replace(tzinfo=None)
+
+class TestTokenProvider(unittest.TestCase):
+    """Test suite for TokenProvider class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = VirtualClock(start=1704067200)
+        self.credentials = FakeCredentials(self.clock)
+        self.provider = TokenProvider(self.credentials, refresh_margin=300, clock=self.clock,
+                                      request_factory=lambda: None)
+
+    def test_proactive_refresh(self):
+        """Test that the background refresh renews the token before callers need it"""
+        self.assertTrue(self.provider.refresh_if_due())
+        self.assertEqual(self.provider.token(), 'token-1')
+
+        self.clock.advance(3000)
+        self.assertFalse(self.provider.refresh_if_due())
+        self.clock.advance(400)  # inside the 300 s margin
+        self.assertTrue(self.provider.refresh_if_due())
+        self.assertEqual(self.provider.token(), 'token-2')
+
+        stats = self.provider.get_stats()
+        self.assertEqual((stats['background_refreshes'], stats['sync_refreshes']), (2, 0))
+        self.assertEqual(stats['blocked_calls'], 0)
+        self.assertEqual(stats['expires_in'], 3600)
+
+    def test_sync_refresh_when_expired(self):
+        """Test that an expired token is refreshed by the caller, and counted"""
+        self.provider.refresh_if_due()
+        self.clock.advance(3590)
+        self.assertEqual(self.provider.token(), 'token-2')
+        stats = self.provider.get_stats()
+        self.assertEqual((stats['sync_refreshes'], stats['blocked_calls']), (1, 1))
+
+    def test_refresh_failure(self):
+        """Test that failed refreshes raise and are counted"""
+        self.credentials.fail = True
+        with self.assertRaises(RuntimeError):
+            self.provider.token()
+        self.assertEqual(self.provider.get_stats()['failures'], 1)
+        self.assertEqual(self.provider.get_stats()['last_error'], 'invalid_grant')
+
+    def test_background_thread(self):
+        """Test that a started provider has a token ready without blocking callers"""
+        credentials = FakeCredentials(VirtualClock())
+        provider = TokenProvider(credentials, request_factory=lambda: None)
+        provider.start()
+        try:
+            deadline = time.monotonic() + 5
+            while provider.access_token is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(provider.token(), 'token-1')
+            self.assertEqual(provider.get_stats()['blocked_calls'], 0)
+        finally:
+            provider.stop()
+
+class TestAuthorizedHttp(unittest.TestCase):
+    """Test suite for AuthorizedHttp class"""
+
+    def test_bearer_token_and_retry(self):
+        """Test that requests carry the token and a rejected token is replaced once"""
+        provider = MagicMock()
+        provider.token.side_effect = ['old', 'new']
+        http = MagicMock()
+        http.request.side_effect = [(MagicMock(status=401), b''), (MagicMock(status=200), b'{}')]
+        response, content = AuthorizedHttp(provider, http).request('https://sheets', 'GET', headers={'a': 'b'})
+
+        self.assertEqual(response.status, 200)
+        provider.invalidate.assert_called_once()
+        self.assertEqual(http.request.call_args[1]['headers'], {'a': 'b', 'authorization': 'Bearer new'})
+
+class TestSheetsClientAuth(unittest.TestCase):
+    """Test suite for SheetsClient with a service account"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        reset_shared_services()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        reset_shared_services()
+
+    @patch('app.sheets_client.build')
+    @patch('app.sheets_client.get_token_provider')
+    def test_requests_are_authorized(self, mock_get_provider, mock_build):
+        """Test that the service is built without ADC lookup and calls carry the shared token"""
+        client = SheetsClient({'service_account_file': '/keys/monitor.json', 'spreadsheet_id': 's',
+                               'range_name': 'A1'})
+        client.get_service()
+        self.assertIsNone(mock_build.call_args[1]['developerKey'])
+        self.assertIn('http', mock_build.call_args[1])
+
+        http = client._http()
+        self.assertIsInstance(http, AuthorizedHttp)
+        self.assertIs(http.provider, mock_get_provider.return_value)
+        mock_get_provider.assert_called_with('/keys/monitor.json', 300)
+
+if __name__ == '__main__':
+    unittest.main()
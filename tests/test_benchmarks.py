@@ -0,0 +1,121 @@
+"""
+Tests for the benchmark stand-ins
+"""
+import time
+import unittest
+from app.notifier import NtfyNotifier
+from app.sheets_client import SheetsClient, reset_shared_services
+from benchmarks.common import percentile, compare_results
+from benchmarks.fake_ntfy_server import FakeNtfyServer
+from benchmarks.fake_sheets_server import FakeSheetsServer
+
+class TestFakeSheetsServer(unittest.TestCase):
+    """Test suite for FakeSheetsServer class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        reset_shared_services()
+        self.server = None
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        if self.server:
+            self.server.stop()
+        reset_shared_services()
+
+    def _client(self, range_name='Sheet1!A1'):
+        return SheetsClient({
+            'api_key': 'benchmark',
+            'sheets_api_endpoint': self.server.url,
+            'spreadsheet_id': 'sheet-1',
+            'range_name': range_name
+        })
+
+    def test_real_client_round_trip(self):
+        """Test that the real Sheets client reads values from the fake server"""
+        self.server = FakeSheetsServer(timeline={'Sheet1!B2': [[0, 'departed']]}).start()
+
+        self.assertEqual(self._client().get_cell_value()['value'], 'ON TIME')
+        self.assertEqual(self._client('Sheet1!B2').get_cell_value()['value'], 'DEPARTED')
+        self.assertEqual(self.server.get_stats()['ok'], 2)
+
+    def test_timeline(self):
+        """Test that scripted values change over time"""
+        self.server = FakeSheetsServer(timeline={'Sheet1!A1': [[0.2, 'DEPARTED']]}).start()
+        client = self._client()
+        client.get_cell_value()  # the first call builds the API client
+        self.server.started_at = time.monotonic()
+
+        self.assertEqual(client.get_cell_value()['value'], 'ON TIME')
+        time.sleep(0.25)
+        result = client.get_cell_value()
+        self.assertEqual(result['value'], 'DEPARTED')
+        self.assertTrue(result['is_new'])
+
+    def test_merged_range(self):
+        """Test that multi-cell ranges return a full grid"""
+        self.server = FakeSheetsServer().start()
+        self.assertEqual(self.server.values_for('Sheet1!A1:B2'), [['ON TIME', 'ON TIME']] * 2)
+
+    def test_throttling(self):
+        """Test that throttled requests surface as fetch errors"""
+        self.server = FakeSheetsServer(throttle_rate=1.0).start()
+        result = self._client().get_cell_value()
+        self.assertIn('429', result['error'])
+        self.assertEqual(self.server.get_stats()['throttled'], 1)
+
+class TestFakeNtfyServer(unittest.TestCase):
+    """Test suite for FakeNtfyServer class"""
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.server.stop()
+
+    def _notifier(self, **config):
+        return NtfyNotifier(dict({'notification_topic': 'bench', 'ntfy_server': self.server.url}, **config))
+
+    def test_delivery(self):
+        """Test that NtfyNotifier publishes to a configured server"""
+        self.server = FakeNtfyServer().start()
+        self.assertTrue(self._notifier().send("Bus departed"))
+        self.assertEqual(self.server.get_stats()['topics'], {'bench': 1})
+
+    def test_rate_limit(self):
+        """Test that publishes beyond the burst are rejected"""
+        self.server = FakeNtfyServer(rate_limit=0.1, burst=2).start()
+        notifier = self._notifier()
+        results = [notifier.send(f"alert {index}") for index in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(self.server.get_stats()['throttled'], 2)
+
+    def test_timeout(self):
+        """Test that a stalled server does not block the sender beyond ntfy_timeout"""
+        self.server = FakeNtfyServer(latency_ms=1000).start()
+        started = time.monotonic()
+        self.assertFalse(self._notifier(ntfy_timeout=0.2).send("alert"))
+        self.assertLess(time.monotonic() - started, 0.9)
+
+class TestBenchmarkHelpers(unittest.TestCase):
+    """Test suite for benchmark result helpers"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile(samples, 100), 100)
+        self.assertIsNone(percentile([], 50))
+
+    def test_compare(self):
+        """Test relative change between result runs"""
+        changes = compare_results(
+            {'checks_per_second': 100, 'fetch_latency': {'p99_ms': 10}},
+            {'checks_per_second': 150, 'fetch_latency': {'p99_ms': 5}},
+            ['checks_per_second', 'fetch_latency.p99_ms', 'missing']
+        )
+        self.assertEqual(changes['checks_per_second']['change_pct'], 50.0)
+        self.assertEqual(changes['fetch_latency.p99_ms']['change_pct'], -50.0)
+        self.assertNotIn('missing', changes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for configuration and logging setup
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from app import config as config_module
+
+class TestSetupLogging(unittest.TestCase):
+    """Test suite for setup_logging"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.log_dir = tempfile.mkdtemp()
+        config_module.shutdown_logging()
+        self.env_patcher = patch.dict(os.environ, {
+            'LOG_DIR': self.log_dir, 'LOG_MAX_BYTES': '2000', 'LOG_BACKUP_COUNT': '2'
+        })
+        self.env_patcher.start()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        config_module.shutdown_logging()
+        self.env_patcher.stop()
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _queue_handlers(self):
+        return [h for h in logging.getLogger().handlers if isinstance(h, config_module._DeferredQueueHandler)]
+
+    def test_idempotent(self):
+        """Test that repeated setup installs a single handler"""
+        config_module.setup_logging()
+        config_module.setup_logging()
+        self.assertEqual(len(self._queue_handlers()), 1)
+
+    def test_records_written_by_listener(self):
+        """Test that queued records are formatted and written to the log file"""
+        config_module.setup_logging()
+        logging.getLogger('test').info("value %s", 'ON TIME')
+        config_module.shutdown_logging()
+
+        with open(os.path.join(self.log_dir, 'app.log')) as f:
+            self.assertIn("value ON TIME", f.read())
+
+    def test_rotation(self):
+        """Test that the log file is rotated by size"""
+        config_module.setup_logging()
+        for i in range(100):
+            logging.getLogger('test').info("line %d %s", i, 'x' * 50)
+        config_module.shutdown_logging()
+
+        files = sorted(os.listdir(self.log_dir))
+        self.assertEqual(files, ['app.log', 'app.log.1', 'app.log.2'])
+        self.assertLessEqual(os.path.getsize(os.path.join(self.log_dir, 'app.log')), 2000)
+
+    def test_process_log_file(self):
+        """Test that a named process writes its own log file"""
+        config_module.setup_logging(process_name='shard-1')
+        logging.getLogger('test').info("from shard")
+        config_module.shutdown_logging()
+        self.assertTrue(os.path.exists(os.path.join(self.log_dir, 'app-shard-1.log')))
+
+    def test_process_name_replaces_handlers(self):
+        """Test that naming the process after setup moves logging to its own file"""
+        config_module.setup_logging()
+        config_module.setup_logging(process_name='shard-2')
+        logging.getLogger('test').info("from shard")
+        config_module.shutdown_logging()
+        self.assertEqual(len(self._queue_handlers()), 0)
+        with open(os.path.join(self.log_dir, 'app-shard-2.log')) as f:
+            self.assertIn("from shard", f.read())
+        with open(os.path.join(self.log_dir, 'app.log')) as f:
+            self.assertNotIn("from shard", f.read())
+
+    def test_emit_does_not_wait_for_writer(self):
+        """Test that logging returns while the writer is blocked"""
+        config_module.setup_logging()
+        file_handler = config_module._log_listener.handlers[0]
+        with patch.object(file_handler, 'emit', side_effect=lambda record: time.sleep(0.2)):
+            started = time.perf_counter()
+            for _ in range(20):
+                logging.getLogger('test').info("slow disk")
+            self.assertLess(time.perf_counter() - started, 0.2)
+
+if __name__ == '__main__':
+    unittest.main()
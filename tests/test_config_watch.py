@@ -0,0 +1,141 @@
+"""
+Tests for configuration hot reload
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from app.config_watch import ConfigWatcher, ConfigReloader
+from app.monitor import MonitoringService, diff_monitor_configs
+
+class TestConfigWatcher(unittest.TestCase):
+    """Test suite for ConfigWatcher class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'config.yaml')
+        with open(self.path, 'w') as f:
+            f.write("polling_interval: 30\n")
+        self.changed = threading.Event()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _assert_detects_edit(self, watcher):
+        watcher.start()
+        try:
+            with open(os.path.join(self.tmp_dir, 'unrelated.txt'), 'w') as f:
+                f.write("ignored")
+            with open(self.path, 'w') as f:
+                f.write("polling_interval: 10\n")
+            self.assertTrue(self.changed.wait(3))
+        finally:
+            watcher.stop()
+
+    def test_detects_edit(self):
+        """Test that editing the file triggers a reload"""
+        watcher = ConfigWatcher([self.path], self.changed.set, debounce=0.05)
+        self._assert_detects_edit(watcher)
+
+    @patch('app.config_watch._load_libc', return_value=None)
+    def test_polling_fallback(self, mock_libc):
+        """Test change detection without inotify"""
+        watcher = ConfigWatcher([self.path], self.changed.set, poll_interval=0.05, debounce=0.05)
+        self._assert_detects_edit(watcher)
+        self.assertEqual(watcher.mode, 'polling')
+
+    def test_invalid_config_not_applied(self):
+        """Test that a config the loader rejects is not applied"""
+        service = MagicMock()
+        reloader = ConfigReloader(service, lambda: None, [self.path])
+        self.assertIsNone(reloader.reload())
+        service.apply_config.assert_not_called()
+
+class TestApplyConfig(unittest.TestCase):
+    """Test suite for MonitoringService.apply_config"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.monitor_patcher = patch('app.monitor.SheetMonitor')
+        mock_monitor_class = self.monitor_patcher.start()
+        mock_monitor_class.side_effect = lambda config, **kwargs: MagicMock(config=config)
+
+        self.config = {
+            'polling_interval': 30,
+            'spreadsheet_id': 's',
+            'monitors': [{'id': 'a', 'range_name': 'A1'}, {'id': 'b', 'range_name': 'B1'}]
+        }
+        self.service = MonitoringService(self.config)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.monitor_patcher.stop()
+
+    def test_diff(self):
+        """Test the per-monitor diff"""
+        added, removed, changed = diff_monitor_configs(
+            [{'id': 'a', 'x': 1}, {'id': 'b', 'x': 1}],
+            [{'id': 'a', 'x': 2}, {'id': 'c', 'x': 1}]
+        )
+        self.assertEqual((added, removed, changed), (['c'], ['b'], {'a': {'x'}}))
+
+    def test_only_affected_monitors_touched(self):
+        """Test that unchanged monitors keep their instance"""
+        monitor_a = self.service.monitors['a']
+        monitor_b = self.service.monitors['b']
+
+        summary = self.service.apply_config(dict(self.config, monitors=[
+            {'id': 'a', 'range_name': 'A1'},
+            {'id': 'b', 'range_name': 'B2'},
+            {'id': 'c', 'range_name': 'C1'}
+        ]))
+
+        self.assertEqual(summary, {'added': ['c'], 'removed': [], 'changed': ['b']})
+        self.assertIs(self.service.monitors['a'], monitor_a)
+        self.assertIs(self.service.monitors['b'], monitor_b)
+        monitor_a.reconfigure.assert_not_called()
+        monitor_b.reconfigure.assert_called_once()
+        self.assertEqual(monitor_b.reconfigure.call_args[0][1], {'range_name'})
+
+    def test_removed_monitor_dropped(self):
+        """Test that monitors missing from the new config are removed"""
+        summary = self.service.apply_config(dict(self.config, monitors=[{'id': 'b', 'range_name': 'B1'}]))
+        self.assertEqual(summary['removed'], ['a'])
+        self.assertEqual(list(self.service.monitors), ['b'])
+        self.assertIs(self.service.monitor, self.service.monitors['b'])
+
+    def test_interval_change_reschedules(self):
+        """Test that a new polling interval wakes the loop to reschedule"""
+        self.service.apply_config(dict(self.config, polling_interval=5))
+        self.assertEqual(self.service.polling_interval, 5)
+        self.assertTrue(self.service.reschedule)
+        self.assertTrue(self.service.wake_event.is_set())
+
+class TestSheetMonitorReconfigure(unittest.TestCase):
+    """Test suite for SheetMonitor.reconfigure"""
+
+    @patch('app.monitor.NotificationManager')
+    @patch('app.monitor.SheetsClient')
+    def test_history_kept(self, mock_client_class, mock_notif_class):
+        """Test that reconfiguring keeps history and change detection"""
+        from app.monitor import SheetMonitor
+        mock_client_class.side_effect = lambda config: MagicMock()
+        monitor = SheetMonitor({'api_key': 'old', 'range_name': 'A1'})
+        monitor._publish('normal', 'msg')
+        old_client = monitor.sheets_client
+        old_client.last_cell_value = 'ON TIME'
+
+        monitor.reconfigure({'api_key': 'new', 'range_name': 'A1'}, {'api_key'})
+
+        self.assertEqual(len(monitor.status_history), 1)
+        self.assertIsNot(monitor.sheets_client, old_client)
+        old_client.close.assert_called_once()
+        self.assertEqual(monitor.sheets_client.last_cell_value, 'ON TIME')
+        self.assertEqual(mock_notif_class.call_count, 1)  # notifier untouched
+
+if __name__ == '__main__':
+    unittest.main()
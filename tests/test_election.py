@@ -0,0 +1,204 @@
+"""
+Tests for poller election and the local state channel
+"""
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+from app.election import FileLockElection, ElectedMonitoringService
+from app.ipc import StateServer, RemoteMonitoringService
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+class TestFileLockElection(unittest.TestCase):
+    """Test suite for FileLockElection class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.lock_path = os.path.join(self.tmp_dir, 'poller.lock')
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_single_leader(self):
+        """Test that only one candidate holds the lock"""
+        first = FileLockElection(self.lock_path, MagicMock())
+        second = FileLockElection(self.lock_path, MagicMock())
+
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+
+        first.release()
+        second.release()
+
+    def test_failover(self):
+        """Test that a standby is elected once the leader releases"""
+        first = FileLockElection(self.lock_path, MagicMock())
+        on_elected = MagicMock()
+        second = FileLockElection(self.lock_path, on_elected, retry_interval=0.05)
+
+        self.assertTrue(first.try_acquire())
+        second.start()
+        time.sleep(0.15)
+        on_elected.assert_not_called()
+
+        first.release()
+        self.assertTrue(_wait_for(lambda: on_elected.called))
+        self.assertTrue(second.is_leader)
+        second.release()
+
+    def test_state_persisted_across_leaders(self):
+        """Test that state written by one leader is visible to the next"""
+        first = FileLockElection(self.lock_path, MagicMock())
+        first.try_acquire()
+        first.write_state('active')
+        first.release()
+
+        second = FileLockElection(self.lock_path, MagicMock())
+        second.try_acquire()
+        self.assertEqual(second.read_state(), 'active')
+        second.release()
+
+class TestStateChannel(unittest.TestCase):
+    """Test suite for StateServer and RemoteMonitoringService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, 'state.sock')
+        self.service = MagicMock()
+        self.service.is_active = True
+        self.service.get_status.return_value = {
+            'is_active': True,
+            'last_result': 'Test result',
+            'last_check_time': 'Test time',
+            'history': [['time', 'normal', 'msg']]
+        }
+        self.service.check_now.return_value = True
+        self.server = StateServer(self.service, self.socket_path)
+        self.server.start()
+        self.remote = RemoteMonitoringService(self.socket_path)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.server.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_status_round_trip(self):
+        """Test reading status through the socket"""
+        status = self.remote.get_status()
+        self.assertEqual(status['last_result'], 'Test result')
+        self.assertTrue(self.remote.is_active)
+
+    def test_state_version(self):
+        """Test reading the state version, and None without a poller"""
+        self.service.get_state_version.return_value = 7
+        self.assertEqual(self.remote.get_state_version(), 7)
+        self.server.stop()
+        self.assertIsNone(self.remote.get_state_version())
+
+    def test_commands_forwarded(self):
+        """Test that commands reach the served service"""
+        self.assertTrue(self.remote.check_now())
+        self.service.check_now.assert_called_once()
+
+    def test_socket_private(self):
+        """Test that only the owner can connect to the state socket"""
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_refuses_symlink_and_other_files(self):
+        """Test that a symlink or regular file at the socket path is never replaced"""
+        target = os.path.join(self.tmp_dir, 'target')
+        with open(target, 'w') as f:
+            f.write('keep')
+        link = os.path.join(self.tmp_dir, 'link.sock')
+        os.symlink(target, link)
+        with self.assertRaises(RuntimeError):
+            StateServer(self.service, link).start()
+        with self.assertRaises(RuntimeError):
+            StateServer(self.service, target).start()
+        self.assertTrue(os.path.islink(link))
+        with open(target) as f:
+            self.assertEqual(f.read(), 'keep')
+
+    def test_unavailable_server(self):
+        """Test placeholder status when no poller is listening"""
+        self.server.stop()
+        status = self.remote.get_status()
+        self.assertFalse(status['is_active'])
+        self.assertFalse(self.remote.is_active)
+
+class TestElectedMonitoringService(unittest.TestCase):
+    """Test suite for ElectedMonitoringService class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = {
+            'poller_lock_file': os.path.join(self.tmp_dir, 'poller.lock'),
+            'state_socket': os.path.join(self.tmp_dir, 'state.sock'),
+            'election_retry_interval': 0.05
+        }
+        self.services = []
+        self.elected = []
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        for elected in self.elected:
+            elected.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _factory(self, config):
+        service = MagicMock()
+        service.is_active = False
+        service.get_status.return_value = {
+            'is_active': False, 'last_result': '', 'last_check_time': '', 'history': []
+        }
+        self.services.append(service)
+        return service
+
+    def _join(self):
+        elected = ElectedMonitoringService(self.config, self._factory)
+        self.elected.append(elected)
+        return elected
+
+    def test_only_one_poller_built(self):
+        """Test that followers forward to the single leader"""
+        leader = self._join()
+        self.assertTrue(_wait_for(lambda: leader.is_leader))
+        follower = self._join()
+        time.sleep(0.15)
+
+        self.assertFalse(follower.is_leader)
+        self.assertEqual(len(self.services), 1)
+
+        follower.start()
+        self.services[0].start.assert_called_once()
+
+    def test_new_leader_resumes_monitoring(self):
+        """Test that failover resumes monitoring that was active"""
+        leader = self._join()
+        self.assertTrue(_wait_for(lambda: leader.is_leader))
+        leader.start()
+
+        follower = self._join()
+        leader.close()
+
+        self.assertTrue(_wait_for(lambda: follower.is_leader))
+        # is_leader turns true as soon as the service is built, just before it is started
+        self.assertTrue(_wait_for(lambda: self.services[-1].start.called))
+        self.services[-1].start.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
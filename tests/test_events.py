@@ -0,0 +1,202 @@
+"""
+Tests for the events module
+"""
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.events import CheckEvent, EventBus, Subscription
+from app.monitor import MonitoringService, SheetMonitor
+
+class FakeMonitor:
+    def __init__(self, monitor_id):
+        self.monitor_id = monitor_id
+
+def event(monitor_id='a', kind='normal', value=''):
+    return CheckEvent(kind, FakeMonitor(monitor_id), value)
+
+class TestSubscription(unittest.TestCase):
+    """Test suite for Subscription class"""
+
+    def blocked(self, overflow, maxsize=2):
+        """A subscription whose single worker is stuck on the first event until released"""
+        self.release = threading.Event()
+        self.handled = []
+        started = threading.Event()
+
+        def handler(e):
+            started.set()
+            self.release.wait(5)
+            self.handled.append(e.value)
+
+        subscription = Subscription('test', handler, maxsize=maxsize, overflow=overflow)
+        self.addCleanup(self.release.set)
+        subscription.offer(event(value='first'))
+        self.assertTrue(started.wait(5))
+        return subscription
+
+    def test_drop_oldest(self):
+        """Test that a full queue discards its oldest event"""
+        subscription = self.blocked('drop_oldest')
+        self.assertTrue(subscription.offer(event(value='1')))
+        self.assertTrue(subscription.offer(event(value='2')))
+        self.assertFalse(subscription.offer(event(value='3')))
+        self.release.set()
+        self.assertTrue(subscription.flush(5))
+        self.assertEqual(self.handled, ['first', '2', '3'])
+        self.assertEqual(subscription.get_stats()['dropped'], 1)
+
+    def test_drop_newest(self):
+        """Test that a full queue discards the new event"""
+        subscription = self.blocked('drop_newest')
+        subscription.offer(event(value='1'))
+        subscription.offer(event(value='2'))
+        self.assertFalse(subscription.offer(event(value='3')))
+        self.release.set()
+        subscription.flush(5)
+        self.assertEqual(self.handled, ['first', '1', '2'])
+
+    def test_latest(self):
+        """Test that only the latest event per monitor is kept"""
+        subscription = self.blocked('latest')
+        subscription.offer(event('a', value='a1'))
+        subscription.offer(event('b', value='b1'))
+        subscription.offer(event('a', value='a2'))
+        self.assertFalse(subscription.offer(event('c', value='c1')))  # full: b1 goes
+        self.release.set()
+        subscription.flush(5)
+        self.assertEqual(self.handled, ['first', 'a2', 'c1'])
+        stats = subscription.get_stats()
+        self.assertEqual((stats['coalesced'], stats['dropped']), (1, 1))
+
+    def test_lag_and_errors(self):
+        """Test that queue depth and lag are reported and handler errors are counted"""
+        subscription = self.blocked('drop_oldest', maxsize=10)
+        queued = event()
+        queued.published_at = time.monotonic() - 3
+        subscription.offer(queued)
+        stats = subscription.get_stats()
+        self.assertEqual(stats['queued'], 1)
+        self.assertGreaterEqual(stats['lag_seconds'], 3)
+
+        failing = Subscription('failing', MagicMock(side_effect=RuntimeError('boom')))
+        failing.offer(event())
+        failing.flush(5)
+        self.assertEqual(failing.get_stats()['errors'], 1)
+
+    def test_unbounded(self):
+        """Test that a subscription without maxsize never drops events"""
+        subscription = self.blocked('drop_oldest', maxsize=None)
+        for index in range(100):
+            self.assertTrue(subscription.offer(event(value=str(index))))
+        self.release.set()
+        self.assertTrue(subscription.flush(5))
+        self.assertEqual(len(self.handled), 101)
+        self.assertEqual(subscription.get_stats()['dropped'], 0)
+
+    def test_concurrent_workers_count_every_event(self):
+        """Test that stats stay exact while several workers handle events at once"""
+        def handler(e):
+            if int(e.value) % 2:
+                raise RuntimeError('odd')
+
+        subscription = Subscription('test', handler, maxsize=None, workers=4)
+        with patch('app.events.logger'):
+            for index in range(2000):
+                subscription.offer(event(value=str(index)))
+            self.assertTrue(subscription.flush(10))
+        stats = subscription.get_stats()
+        self.assertEqual((stats['handled'], stats['errors']), (2000, 1000))
+
+    def test_invalid_overflow(self):
+        """Test that an unknown overflow policy is rejected"""
+        with self.assertRaises(ValueError):
+            Subscription('test', print, overflow='block')
+
+class TestEventBus(unittest.TestCase):
+    """Test suite for EventBus class"""
+
+    def test_slow_subscriber_does_not_block(self):
+        """Test that publishing and other subscribers do not wait for a slow subscriber"""
+        bus = EventBus()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        fast = []
+        bus.subscribe('slow', lambda e: release.wait(5), maxsize=5)
+        bus.subscribe('fast', lambda e: fast.append(e.value), kinds=('departed',))
+
+        started = time.monotonic()
+        for index in range(100):
+            bus.publish(event(kind='departed' if index % 10 == 0 else 'normal', value=str(index)))
+        self.assertLess(time.monotonic() - started, 1)
+
+        self.assertTrue(bus.subscriptions[1].flush(5))
+        self.assertEqual(fast, [str(index) for index in range(0, 100, 10)])
+        stats = bus.get_stats()
+        self.assertEqual(stats['published'], 100)
+        self.assertEqual(stats['subscribers']['slow']['dropped'], 100 - 1 - 5)
+        self.assertEqual(stats['subscribers']['fast']['received'], 10)
+
+        release.set()
+        self.assertTrue(bus.flush(5))
+
+    def test_synchronous(self):
+        """Test that a synchronous bus handles events before publish returns"""
+        bus = EventBus(synchronous=True)
+        handled = []
+        bus.subscribe('inline', handled.append)
+        bus.publish(event())
+        self.assertEqual(len(handled), 1)
+        self.assertEqual(bus.get_stats()['subscribers']['inline']['handled'], 1)
+
+class SlowNotifier:
+    def __init__(self):
+        self.release = threading.Event()
+        self.messages = []
+
+    def send_notification(self, message):
+        self.release.wait(5)
+        self.messages.append(message)
+        return True
+
+class TestServiceEvents(unittest.TestCase):
+    """Test suite for check events in MonitoringService"""
+
+    @patch('app.monitor.NotificationManager')
+    @patch('app.monitor.SheetsClient')
+    def test_slow_notifier_does_not_delay_checks(self, mock_client_class, mock_notifier_class):
+        """Test that checks finish while an alert is still being sent"""
+        notifier = SlowNotifier()
+        mock_notifier_class.return_value = notifier
+        mock_client_class.return_value.get_cell_value_with_retry.return_value = {
+            'value': 'BUS DEPARTED', 'is_new': True
+        }
+        service = MonitoringService({'spreadsheet_id': 's', 'range_name': 'A1', 'history_db': None,
+                                     'monitor_registry': None})
+        self.addCleanup(notifier.release.set)
+
+        started = time.monotonic()
+        service.check_now()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(service.monitor.last_check_result, '*** BUS DEPARTED ***')
+        self.assertEqual(notifier.messages, [])
+        self.assertIsInstance(service.monitor, SheetMonitor)
+
+        notifications = service.get_status()['events']['subscribers']['notifications']
+        self.assertEqual(notifications['received'], 1)
+
+        notifier.release.set()
+        self.assertTrue(service.events.flush(5))
+        self.assertEqual(notifier.messages, ['*** BUS DEPARTED ***'])
+        self.assertEqual(service.events.get_stats()['subscribers']['metrics']['handled'], 1)  # the delivery
+
+    def test_alerts_are_never_dropped(self):
+        """Test that the notifications queue is unbounded while the others are not"""
+        service = MonitoringService({'spreadsheet_id': 's', 'range_name': 'A1', 'history_db': None,
+                                     'monitor_registry': None, 'event_queue_size': 5})
+        subscribers = service.events.get_stats()['subscribers']
+        self.assertIsNone(subscribers['notifications']['maxsize'])
+        self.assertEqual(subscribers['history']['maxsize'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
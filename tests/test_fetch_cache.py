@@ -0,0 +1,146 @@
+"""
+Tests for the shared range fetch layer
+"""
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from app.fetch_cache import SharedRangeFetcher, parse_a1
+
+class TestParseA1(unittest.TestCase):
+    """Test suite for parse_a1"""
+
+    def test_single_cell(self):
+        """Test parsing a single cell with a sheet name"""
+        ref = parse_a1('Sheet1!D19')
+        self.assertEqual((ref.sheet, ref.row1, ref.col1, ref.row2, ref.col2), ('Sheet1', 19, 4, 19, 4))
+
+    def test_quoted_sheet_range(self):
+        """Test parsing a quoted sheet name and round-tripping"""
+        ref = parse_a1("'Bus Routes'!A1:AB10")
+        self.assertEqual(ref.sheet, 'Bus Routes')
+        self.assertEqual(ref.col2, 28)
+        self.assertEqual(ref.to_a1(), "'Bus Routes'!A1:AB10")
+
+    def test_unbounded_range(self):
+        """Test that ranges which cannot be merged are rejected"""
+        self.assertIsNone(parse_a1('Sheet1!A:A'))
+        self.assertIsNone(parse_a1('NamedRange'))
+
+class TestSharedRangeFetcher(unittest.TestCase):
+    """Test suite for SharedRangeFetcher class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.fetcher = SharedRangeFetcher()
+
+    def test_cache_hit_within_ttl(self):
+        """Test that a second request within the TTL does not call the API"""
+        loader = MagicMock(return_value=[['DEPARTED']])
+
+        self.fetcher.get_values('s', 'Sheet1!A1', loader, ttl=10)
+        values = self.fetcher.get_values('s', 'Sheet1!A1', loader, ttl=10)
+
+        self.assertEqual(values, [['DEPARTED']])
+        loader.assert_called_once()
+        self.assertEqual(self.fetcher.get_stats()['cache_hits'], 1)
+
+    def test_no_cache_without_ttl(self):
+        """Test that ttl=0 always fetches"""
+        loader = MagicMock(return_value=[['A']])
+        self.fetcher.get_values('s', 'Sheet1!A1', loader)
+        self.fetcher.get_values('s', 'Sheet1!A1', loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_concurrent_requests_coalesced(self):
+        """Test that concurrent callers share one in-flight fetch"""
+        release = threading.Event()
+        calls = []
+
+        def loader(range_name):
+            calls.append(range_name)
+            release.wait(1)
+            return [['X']]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.fetcher.get_values('s', 'Sheet1!A1', loader)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[['X']]] * 5)
+        self.assertEqual(self.fetcher.get_stats()['coalesced'], 4)
+
+    def test_errors_shared_with_waiters(self):
+        """Test that a failed fetch raises in every waiting caller and is not cached"""
+        loader = MagicMock(side_effect=RuntimeError("boom"))
+        with self.assertRaises(RuntimeError):
+            self.fetcher.get_values('s', 'Sheet1!A1', loader, ttl=10)
+        with self.assertRaises(RuntimeError):
+            self.fetcher.get_values('s', 'Sheet1!A1', loader, ttl=10)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_waiters_time_out(self):
+        """Test that callers sharing a hung fetch give up after their timeout"""
+        release = threading.Event()
+        leader = threading.Thread(target=self.fetcher.get_values,
+                                  args=('s', 'Sheet1!A1', lambda range_name: release.wait(5) and [['A']]))
+        leader.start()
+        try:
+            while not self.fetcher.inflight:
+                time.sleep(0.01)
+            started = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                self.fetcher.get_values('s', 'Sheet1!A1', MagicMock(), timeout=0.1)
+            self.assertLess(time.monotonic() - started, 2)
+        finally:
+            release.set()
+            leader.join()
+
+    def test_overlapping_ranges_merged(self):
+        """Test that overlapping subscribed ranges are served by one fetch"""
+        self.fetcher.register('s', 'Sheet1!A1:B2')
+        self.fetcher.register('s', 'Sheet1!B2:C3')
+        self.fetcher.register('s', 'Other!A1')
+        loader = MagicMock(return_value=[['a1', 'b1'], ['a2', 'b2', 'c2'], ['', '', 'c3']])
+
+        first = self.fetcher.get_values('s', 'Sheet1!A1:B2', loader, ttl=10)
+        second = self.fetcher.get_values('s', 'Sheet1!B2:C3', loader, ttl=10)
+
+        loader.assert_called_once_with("'Sheet1'!A1:C3")
+        self.assertEqual(first, [['a1', 'b1'], ['a2', 'b2']])
+        self.assertEqual(second, [['b2', 'c2'], ['', 'c3']])
+
+    def test_credentials_not_shared(self):
+        """Test that a result fetched with one key is never served to another"""
+        self.fetcher.register('s', 'Sheet1!A1:B2', credentials='reader')
+        self.fetcher.register('s', 'Sheet1!B2', credentials='outsider')
+        reader = MagicMock(return_value=[['a1', 'b1'], ['a2', 'b2']])
+        outsider = MagicMock(side_effect=PermissionError('403'))
+
+        self.assertEqual(self.fetcher.get_values('s', 'Sheet1!A1:B2', reader, ttl=10, credentials='reader'),
+                         [['a1', 'b1'], ['a2', 'b2']])
+        with self.assertRaises(PermissionError):
+            self.fetcher.get_values('s', 'Sheet1!B2', outsider, ttl=10, credentials='outsider')
+        outsider.assert_called_once_with('Sheet1!B2')  # not merged with the reader's range
+
+        self.fetcher.invalidate('s')
+        self.assertEqual(self.fetcher.cache, {})
+
+    def test_empty_slice_trimmed(self):
+        """Test that a slice with no data looks like an empty API response"""
+        self.fetcher.register('s', 'Sheet1!A1:A3')
+        self.fetcher.register('s', 'Sheet1!A3')
+        loader = MagicMock(return_value=[['a1']])
+
+        self.assertEqual(self.fetcher.get_values('s', 'Sheet1!A3', loader, ttl=10), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Tests for the headless entry point
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import headless
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestHeadless(unittest.TestCase):
+    """Test suite for headless.py"""
+
+    def test_web_stack_not_imported(self):
+        """Test that importing the headless entry point leaves Flask unloaded"""
+        with tempfile.TemporaryDirectory() as log_dir:
+            output = subprocess.run(
+                [sys.executable, '-c',
+                 "import sys, headless; print('app.web' in sys.modules, 'flask' in sys.modules)"],
+                cwd=ROOT, env=dict(os.environ, LOG_DIR=log_dir),
+                capture_output=True, text=True, check=True
+            ).stdout
+        self.assertEqual(output.strip(), 'False False')
+
+    @patch('headless.create_monitoring_service')
+    @patch('headless.load_config')
+    def test_once(self, mock_load_config, mock_create_service):
+        """Test a single check with startup metrics"""
+        mock_load_config.return_value = {'api_key': 'key', 'hot_reload': True}
+        service = MagicMock()
+        mock_create_service.return_value = service
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            exit_code = headless.main(['--once'])
+
+        self.assertEqual(exit_code, 0)
+        service.check_now.assert_called_once()
+        service.flush.assert_called_once()  # queued alerts are delivered before exiting
+        service.start.assert_not_called()
+        self.assertFalse(mock_create_service.call_args[0][0]['hot_reload'])
+        metrics = json.loads(stdout.getvalue())
+        self.assertGreater(metrics['rss_mb'], 0)
+        self.assertIn('startup_seconds', metrics)
+
+    @patch('headless.load_config', return_value=None)
+    def test_missing_config(self, mock_load_config):
+        """Test that an invalid configuration exits with an error"""
+        self.assertEqual(headless.main([]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
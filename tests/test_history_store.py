@@ -0,0 +1,107 @@
+"""
+Tests for the history_store module
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock
+from app.clock import VirtualClock
+from app.history_store import HistoryStore, export_rows, format_timestamp
+from app.monitor import SheetMonitor
+from app.web.app import create_app
+
+class TestHistoryStore(unittest.TestCase):
+    """Test suite for HistoryStore class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'history.db')
+        self.store = HistoryStore(self.path)
+        for index in range(10):
+            self.store.append('bus' if index % 2 else 'train', 1000 + index, 'normal', f"value {index}")
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_filters(self):
+        """Test time range and monitor filters"""
+        rows = list(self.store.iter_rows(start=1002, end=1008, monitor_ids=['bus']))
+        self.assertEqual([row[0] for row in rows], [1003, 1005, 1007])
+        self.assertEqual(len(list(self.store.iter_rows())), 10)
+
+    def test_export_csv(self):
+        """Test CSV export with a header row"""
+        output = b''.join(export_rows(self.store.iter_rows(end=1002), 'csv'))
+        rows = list(csv.reader(io.StringIO(output.decode('utf-8'))))
+        self.assertEqual(rows[0], ['timestamp', 'monitor_id', 'status', 'message'])
+        self.assertEqual(rows[1], [format_timestamp(1000), 'train', 'normal', 'value 0'])
+        self.assertEqual(len(rows), 3)
+
+    def test_export_ndjson_gzip(self):
+        """Test gzip-compressed NDJSON export"""
+        output = b''.join(export_rows(self.store.iter_rows(), 'ndjson', compress=True, chunk_size=64))
+        lines = gzip.decompress(output).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(json.loads(lines[-1])['message'], 'value 9')
+
+    def test_export_constant_memory(self):
+        """Test that exporting many rows keeps only a batch in memory"""
+        self.store.conn.executemany(
+            "INSERT INTO history (monitor_id, ts, status, message) VALUES (?, ?, ?, ?)",
+            ((f"m{i % 50}", 2000 + i, 'normal', 'x' * 100) for i in range(20000))
+        )
+        tracemalloc.start()
+        try:
+            size = sum(len(chunk) for chunk in export_rows(self.store.iter_rows(), 'csv'))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(size, 2 * 1024 * 1024)
+        self.assertLess(peak, 1024 * 1024)
+
+class TestHistoryExport(unittest.TestCase):
+    """Test suite for the /history/export endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.config = {'history_db': os.path.join(self.tmpdir, 'history.db')}
+        clock = VirtualClock(start=1704067200)
+        client = MagicMock()
+        client.get_cell_value_with_retry.return_value = {'value': 'BUS DEPARTED', 'is_new': True}
+        monitor = SheetMonitor(dict(self.config, id='bus'), sheets_client=client,
+                               notification_manager=MagicMock(), clock=clock)
+        monitor.check_cell()
+        self.client = create_app(self.config, MagicMock()).test_client()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        from app.history_store import _stores
+        _stores.pop(self.config['history_db']).close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_stream_monitor_entries(self):
+        """Test that entries written by a monitor are exported"""
+        response = self.client.get('/history/export?format=ndjson&monitor=bus&start=2024-01-01')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        entry = json.loads(response.get_data(as_text=True).splitlines()[0])
+        self.assertEqual(entry['status'], 'departed')
+        self.assertEqual(entry['monitor_id'], 'bus')
+
+    def test_invalid_arguments(self):
+        """Test that bad formats and times are rejected"""
+        self.assertEqual(self.client.get('/history/export?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/history/export?start=yesterday').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
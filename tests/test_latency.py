@@ -0,0 +1,163 @@
+"""
+Tests for the latency module
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.clock import VirtualClock
+from app.latency import (LatencyTracker, bucket_index, bucket_upper, build_slo_report, load_latency,
+                         percentile, save_latency)
+from app.monitor import SheetMonitor
+
+class TestHistogram(unittest.TestCase):
+    """Test suite for the histogram helpers"""
+
+    def test_bucket_bounds(self):
+        """Test that a duration falls inside its bucket"""
+        for seconds in (0.005, 0.3, 1, 17.5, 3600, 86400 * 3):
+            index = bucket_index(seconds)
+            self.assertGreaterEqual(bucket_upper(index), seconds)
+            if index:
+                self.assertLess(bucket_upper(index - 1), seconds)
+
+    def test_percentile(self):
+        """Test percentiles from bucket counts, including string keys from JSON"""
+        buckets = {bucket_index(1): 90, bucket_index(60): 10}
+        self.assertAlmostEqual(percentile(buckets, 50), bucket_upper(bucket_index(1)), places=3)
+        self.assertAlmostEqual(percentile(buckets, 95), bucket_upper(bucket_index(60)), places=3)
+        self.assertEqual(percentile(json.loads(json.dumps(buckets)), 95), percentile(buckets, 95))
+        self.assertIsNone(percentile({}, 50))
+
+class TestLatencyTracker(unittest.TestCase):
+    """Test suite for LatencyTracker class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = VirtualClock(start=1704067200)  # 2024-01-01 00:00 UTC
+        self.tracker = LatencyTracker(self.clock, retention_days=3, window_days=2)
+
+    def test_change_estimated_from_poll_bracket(self):
+        """Test that the change is placed midway between fetches"""
+        start = self.clock.time()
+        self.assertIsNone(self.tracker.record_fetch(start, start + 1))
+        previous = self.tracker.record_fetch(start + 60, start + 61)
+        self.assertEqual(previous, start)
+
+        event = self.tracker.record_change('BUS DEPARTED', previous, start + 61, start + 61, start + 62)
+
+        self.assertEqual(event['estimated_change'], start + 30.5)
+        self.assertEqual(event['detection_seconds'], 30.5)
+        self.assertEqual(event['alert_seconds'], 31.5)
+        stages = self.tracker.snapshot()['stages']
+        self.assertEqual(sum(stages['fetch'].values()), 2)
+        self.assertEqual(sum(stages['alert'].values()), 1)
+
+    def test_retention_and_window(self):
+        """Test that old days leave the window and then the retention"""
+        for day in range(5):
+            now = self.clock.time()
+            self.tracker.record_change('A', now - 10, now)
+            self.clock.advance(86400)
+        self.assertEqual(len(self.tracker.days), 3)
+        self.assertEqual(sum(self.tracker.snapshot()['stages']['detection'].values()), 1)
+
+    def test_undelivered_alert(self):
+        """Test that an alert that was never delivered is counted"""
+        now = self.clock.time()
+        event = self.tracker.record_change('DEPARTED', now - 10, now, now, None)
+        self.assertIsNone(event['alert_seconds'])
+        self.assertEqual(self.tracker.snapshot()['undelivered'], 1)
+
+    def test_save_and_load(self):
+        """Test that histograms survive a round trip through the latency file"""
+        now = self.clock.time()
+        self.tracker.record_change('DEPARTED', now - 10, now, now, now + 1)
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            save_latency(path, {'bus': self.tracker})
+            restored = LatencyTracker(self.clock)
+            restored.load(load_latency(path)['bus'])
+        finally:
+            os.unlink(path)
+        self.assertEqual(restored.snapshot()['stages'], self.tracker.snapshot()['stages'])
+
+    def test_concurrent_savers_keep_each_other(self):
+        """Test that two shards saving at once both keep their monitors"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, 'latency.json')
+        both_reading = threading.Barrier(2, timeout=0.5)
+
+        def slow_load(path):
+            # Without the lock both savers read the old file before either replaces it
+            monitors = load_latency(path)
+            try:
+                both_reading.wait()
+            except threading.BrokenBarrierError:
+                pass
+            time.sleep(0.05)
+            return monitors
+
+        with patch('app.latency.load_latency', side_effect=slow_load):
+            savers = [threading.Thread(target=save_latency, args=(path, {monitor_id: self.tracker}))
+                      for monitor_id in ('bus', 'train')]
+            for saver in savers:
+                saver.start()
+            for saver in savers:
+                saver.join(5)
+        self.assertEqual(sorted(load_latency(path)), ['bus', 'train'])
+
+class TestSloReport(unittest.TestCase):
+    """Test suite for build_slo_report"""
+
+    def test_breaching_monitor(self):
+        """Test that a monitor with too many slow alerts is flagged"""
+        clock = VirtualClock(start=1704067200)
+        fast, slow = LatencyTracker(clock), LatencyTracker(clock)
+        now = clock.time()
+        for _ in range(20):
+            fast.record_change('DEPARTED', now - 20, now, now, now + 1)
+            slow.record_change('DEPARTED', now - 600, now, now, now + 1)
+        status = {'monitors': {
+            'fast': {'latency': fast.snapshot()},
+            'slow': {'latency': slow.snapshot()}
+        }}
+
+        report = build_slo_report(json.loads(json.dumps(status)), target_seconds=120)
+
+        self.assertEqual(report['breaching'], ['slow'])
+        self.assertEqual(report['monitors']['fast']['within_target'], 1.0)
+        self.assertEqual(report['monitors']['slow']['within_target'], 0.0)
+        self.assertEqual(report['totals']['alerts'], 40)
+        self.assertGreater(report['monitors']['slow']['stages']['alert']['p95'], 120)
+
+class TestMonitorLatency(unittest.TestCase):
+    """Test suite for latency recording in SheetMonitor"""
+
+    def test_check_cell_records_alert(self):
+        """Test that a detected departure records detection and delivery"""
+        clock = VirtualClock(start=1704067200)
+        client = MagicMock()
+        notifier = MagicMock()
+        notifier.send_notification.return_value = True
+        monitor = SheetMonitor({}, sheets_client=client, notification_manager=notifier, clock=clock)
+
+        client.get_cell_value_with_retry.return_value = {'value': 'ON TIME', 'is_new': True}
+        monitor.check_cell()
+        clock.advance(30)
+        client.get_cell_value_with_retry.return_value = {'value': 'BUS DEPARTED', 'is_new': True}
+        monitor.check_cell()
+
+        event = monitor.latency.snapshot()['last_event']
+        self.assertEqual(event['value'], 'BUS DEPARTED')
+        self.assertEqual(event['detection_seconds'], 15.0)
+        self.assertEqual(event['alert_seconds'], 15.0)
+
+if __name__ == '__main__':
+    unittest.main()
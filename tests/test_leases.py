@@ -0,0 +1,169 @@
+"""
+Tests for lease-based cluster ownership
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from app.leases import SQLiteLeaseBackend, ClusterMonitoringService, create_lease_backend
+
+class TestSQLiteLeaseBackend(unittest.TestCase):
+    """Test suite for SQLiteLeaseBackend class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.backend = SQLiteLeaseBackend(os.path.join(self.tmp_dir, 'cluster.db'))
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_exclusive_until_expiry(self):
+        """Test that a lease is exclusive until it expires"""
+        self.assertTrue(self.backend.acquire('m1', 'node-a', 0.2))
+        self.assertTrue(self.backend.acquire('m1', 'node-a', 0.2))  # renewal
+        self.assertFalse(self.backend.acquire('m1', 'node-b', 0.2))
+
+        time.sleep(0.25)
+        self.assertTrue(self.backend.acquire('m1', 'node-b', 0.2))
+        self.assertEqual(self.backend.owners(), {'m1': 'node-b'})
+
+    def test_release(self):
+        """Test that a released lease is immediately available"""
+        self.backend.acquire('m1', 'node-a', 10)
+        self.backend.release('m1', 'node-b')  # not the owner: no effect
+        self.assertFalse(self.backend.acquire('m1', 'node-b', 10))
+        self.backend.release('m1', 'node-a')
+        self.assertTrue(self.backend.acquire('m1', 'node-b', 10))
+
+    def test_live_nodes(self):
+        """Test heartbeat expiry"""
+        self.backend.heartbeat('node-a', 10)
+        self.backend.heartbeat('node-b', 0.1)
+        time.sleep(0.15)
+        self.assertEqual(self.backend.live_nodes(), ['node-a'])
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        with self.assertRaises(ValueError):
+            create_lease_backend({'cluster_backend': 'nope'})
+
+class TestClusterMonitoringService(unittest.TestCase):
+    """Test suite for ClusterMonitoringService class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.monitor_patcher = patch('app.monitor.SheetMonitor')
+        self.mock_monitor_class = self.monitor_patcher.start()
+        self.mock_monitor_class.side_effect = lambda config, **kwargs: MagicMock()
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.backend = SQLiteLeaseBackend(os.path.join(self.tmp_dir, 'cluster.db'))
+        self.config = {
+            'polling_interval': 60,
+            'lease_ttl': 0.3,
+            'monitors': [{'id': f"m{i}"} for i in range(6)]
+        }
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.monitor_patcher.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _node(self, node_id):
+        return ClusterMonitoringService(dict(self.config, node_id=node_id), backend=self.backend)
+
+    def test_monitors_split_between_nodes(self):
+        """Test that each monitor is owned by exactly one node"""
+        node_a = self._node('a')
+        node_b = self._node('b')
+
+        node_a.refresh_leases()
+        self.assertEqual(len(node_a.owned), 6)
+
+        # b joins; a hands back its surplus, then b picks it up
+        node_b.refresh_leases()
+        node_a.refresh_leases()
+        node_b.refresh_leases()
+
+        self.assertEqual(len(node_a.owned), 3)
+        self.assertEqual(len(node_b.owned), 3)
+        self.assertFalse(node_a.owned & node_b.owned)
+        self.assertEqual(node_a.lease_stats['released'], 3)
+
+    def test_only_owned_monitors_checked(self):
+        """Test that a node polls only the monitors it owns"""
+        node_a = self._node('a')
+        self.backend.acquire('m0', 'other', 60)
+        node_a.refresh_leases()
+
+        node_a.check_now()
+
+        node_a.monitors['m0'].check_cell.assert_not_called()
+        node_a.monitors['m1'].check_cell.assert_called_once()
+
+    def test_takeover_after_node_death(self):
+        """Test that a dead node's monitors are reassigned once its leases expire"""
+        node_a = self._node('a')
+        node_b = self._node('b')
+        node_a.refresh_leases()
+        node_b.refresh_leases()
+        self.assertEqual(len(node_b.owned), 0)
+
+        # a stops renewing; its heartbeat and leases expire
+        time.sleep(0.35)
+        node_b.refresh_leases()
+
+        self.assertEqual(len(node_b.owned), 6)
+        status = node_b.get_status()
+        self.assertEqual(status['cluster']['lease_stats']['acquired'], 6)
+        self.assertGreater(status['cluster']['lease_stats']['avg_op_seconds'], 0)
+
+    def test_failed_renewal_stops_polling(self):
+        """Test that a node whose backend fails stops polling before its leases could be taken over"""
+        node_a = self._node('a')
+        node_a.start()
+        self.addCleanup(node_a.stop)
+        self.assertEqual(len(node_a._checkable_monitors()), 6)
+
+        with patch.object(self.backend, 'heartbeat', side_effect=sqlite3.OperationalError('database is locked')):
+            time.sleep(node_a.renew_interval * 1.5)
+            self.assertEqual(node_a._checkable_monitors(), [])
+            for monitor in node_a.monitors.values():
+                monitor.check_cell.reset_mock()
+            node_a.check_now()
+            for monitor in node_a.monitors.values():
+                monitor.check_cell.assert_not_called()
+
+    def test_stalled_renewal_stops_polling(self):
+        """Test that leases stop being trusted while a renewal is stuck in the backend"""
+        node_a = self._node('a')
+        node_a.refresh_leases()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        acquire = self.backend.acquire
+
+        def stalled_acquire(*args):
+            release.wait(5)
+            return acquire(*args)
+
+        with patch.object(self.backend, 'acquire', side_effect=stalled_acquire):
+            renewal = threading.Thread(target=node_a.refresh_leases)
+            renewal.start()
+            self.assertEqual(len(node_a._checkable_monitors()), 6)
+            time.sleep(node_a.lease_ttl - node_a.lease_margin)
+            self.assertEqual(node_a._checkable_monitors(), [])
+            node_a.check_now()
+            for monitor in node_a.monitors.values():
+                monitor.check_cell.assert_not_called()
+            release.set()
+            renewal.join(5)
+        self.assertEqual(node_a.owned, set())  # the cycle ran over the TTL
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests for the metering module
+"""
+import unittest
+import httplib2
+from app.metering import MeteredHttp, thread_transfer
+from benchmarks.fake_sheets_server import FakeSheetsServer
+
+class TestMeteredHttp(unittest.TestCase):
+    """Test suite for MeteredHttp class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.server = FakeSheetsServer(port=0).start()
+        self.url = f"{self.server.url}v4/spreadsheets/s/values/Sheet1!A1:Z200"
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.server.stop()
+
+    def test_counts_compressed_bytes(self):
+        """Test that received bytes are counted before httplib2 decompresses the body"""
+        http = MeteredHttp(httplib2.Http())
+        before = thread_transfer()
+        response, content = http.request(self.url)  # httplib2 asks for gzip
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(http.compressed, 1)
+        self.assertEqual(http.bytes_decoded, len(content))
+        self.assertLess(http.bytes_received, http.bytes_decoded)
+        self.assertGreater(http.bytes_received, self.server.get_stats()['bytes_sent'])  # plus headers
+        self.assertEqual(thread_transfer()[1] - before[1], http.bytes_received)
+
+    def test_reused_connection(self):
+        """Test that requests on a kept-alive connection are each counted"""
+        http = MeteredHttp(httplib2.Http())
+        http.request(self.url)
+        first = http.bytes_received
+        http.request(self.url)
+        self.assertEqual(http.requests, 2)
+        self.assertEqual(http.compressed, 2)
+        self.assertEqual(http.bytes_received, 2 * first)
+
+if __name__ == '__main__':
+    unittest.main()
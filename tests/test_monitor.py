@@ -1,6 +1,8 @@
 """
 Tests for the monitor module
 """
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 from app.monitor import SheetMonitor, MonitoringService
@@ -132,6 +134,13 @@ class TestMonitoringService(unittest.TestCase):
         result = self.service.stop()
         self.assertFalse(result)  # Should return False as already stopped
     
+    def test_unset_polling_interval(self):
+        """Test that an unset interval (None from load_config) falls back to 30 seconds"""
+        service = MonitoringService({'polling_interval': None})
+        self.assertEqual(service.polling_interval, 30)
+        self.assertTrue(service.start())
+        service.stop()
+    
     def test_check_now(self):
         """Test immediate check"""
         # Configure mock
@@ -160,6 +169,102 @@ class TestMonitoringService(unittest.TestCase):
         self.assertIn('last_check_time', status)
         self.assertIn('history', status)
         self.assertEqual(status['last_result'], "Test result")
+    
+    def test_state_version(self):
+        """Test that checks, start and stop change the state version"""
+        versions = [self.service.get_state_version()]
+        self.service.check_now()
+        versions.append(self.service.get_state_version())
+        self.service.start()
+        versions.append(self.service.get_state_version())
+        self.service.stop()
+        versions.append(self.service.get_state_version())
+        
+        self.assertEqual(len(set(versions)), len(versions))
+        self.assertEqual(self.service.get_state_version(), versions[-1])
+
+class HangingMonitor:
+    """Monitor whose checks block once hang is set, like a fetch that ignores its timeout"""
+
+    def __init__(self, config):
+        self.config = config
+        self.checks = 0
+        self.hang = threading.Event()
+        self.release = threading.Event()
+
+    def check_cell(self):
+        self.checks += 1
+        if self.hang.is_set():
+            self.release.wait(10)
+        return False
+
+class TestWatchdog(unittest.TestCase):
+    """Test suite for the monitoring loop watchdog"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        config = {'polling_interval': 0.1, 'watchdog_timeout': 0.3, 'history_db': None, 'monitor_registry': None,
+                  'monitors': [{'id': 'hung'}, {'id': 'healthy'}]}
+        self.service = MonitoringService(config, monitor_factory=HangingMonitor)
+        self.hung = self.service.monitors['hung']
+        self.healthy = self.service.monitors['healthy']
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.hung.release.set()
+        if self.service.is_active:
+            self.service.stop()
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    def test_stalled_loop_is_restarted(self):
+        """Test that a hung check is abandoned and the other monitors keep being checked"""
+        self.service.start()
+        stalled_thread = self.service.thread
+        self.hung.hang.set()
+
+        self.assertTrue(self.wait_for(lambda: self.service.restarts >= 1))
+        self.assertIsNot(self.service.thread, stalled_thread)
+        self.assertEqual(self.service.get_watchdog_status()['stalled'], ['hung'])
+
+        # The new loop polls the healthy monitor and skips the hung one
+        checks = (self.healthy.checks, self.hung.checks)
+        self.assertTrue(self.wait_for(lambda: self.healthy.checks >= checks[0] + 3))
+        self.assertEqual(self.hung.checks, checks[1])
+        self.assertTrue(self.service.get_watchdog_status()['healthy'])
+        self.assertGreater(self.service.heartbeats['healthy'], time.time() - 1)
+
+        # Once the hung call returns, the old loop exits and the monitor rejoins
+        self.hung.hang.clear()
+        self.hung.release.set()
+        stalled_thread.join(timeout=2)
+        self.assertFalse(stalled_thread.is_alive())
+        self.assertTrue(self.wait_for(lambda: self.hung.checks > checks[1]))
+        self.assertEqual(self.service.get_watchdog_status()['stalled'], [])
+
+    def test_idle_loop_is_not_restarted(self):
+        """Test that waiting between polls longer than the timeout is not a stall"""
+        self.service.polling_interval = 1
+        self.service.start()
+        time.sleep(1.5)
+        self.assertEqual(self.service.restarts, 0)
+        self.assertTrue(self.service.get_watchdog_status()['healthy'])
+
+    def test_manual_check_does_not_move_deadline(self):
+        """Test that check_now() during a long wait neither restarts the loop nor resets its deadline"""
+        self.service.polling_interval = 3
+        self.service.start()
+        time.sleep(0.5)
+        deadline = self.service.loop_deadline
+        self.service.check_now()
+        self.assertEqual(self.service.loop_deadline, deadline)
+        time.sleep(1)
+        self.assertEqual(self.service.restarts, 0)
+        self.assertEqual(self.service.generation, 1)
 
 if __name__ == '__main__':
     unittest.main()
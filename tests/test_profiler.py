@@ -0,0 +1,72 @@
+"""
+Tests for the profiler module
+"""
+import threading
+import unittest
+from unittest.mock import MagicMock
+from app.profiler import SamplingProfiler, _profile_lock
+from app.web.app import create_app
+
+def busy_loop(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test suite for SamplingProfiler class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=busy_loop, args=(self.stop_event,), name='busy-worker')
+        self.thread.start()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.stop_event.set()
+        self.thread.join()
+
+    def test_collapsed_stacks(self):
+        """Test that other threads' stacks are aggregated root first, without the sampler"""
+        profiler = SamplingProfiler(interval=0.005)
+        profiler.run(0.2)
+
+        self.assertGreater(profiler.samples, 10)
+        lines = profiler.collapsed().splitlines()
+        busy = [line for line in lines if line.startswith('busy-worker;')]
+        self.assertTrue(busy)
+        self.assertIn('busy_loop (test_profiler.py:', busy[0])
+        self.assertFalse(any('SamplingProfiler.run' in line for line in lines))
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in busy), profiler.samples)
+
+class TestProfileEndpoint(unittest.TestCase):
+    """Test suite for the /admin/profile endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.client = create_app({'admin_token': 'secret', 'profile_max_seconds': 5}, MagicMock()).test_client()
+
+    def test_requires_token(self):
+        """Test that the endpoint needs the admin token, and is off without one"""
+        self.assertEqual(self.client.get('/admin/profile?seconds=0.1').status_code, 403)
+        disabled = create_app({}, MagicMock()).test_client()
+        self.assertEqual(disabled.get('/admin/profile', headers={'X-Admin-Token': ''}).status_code, 404)
+
+    def test_profile(self):
+        """Test a short profile and the duration cap"""
+        headers = {'X-Admin-Token': 'secret'}
+        response = self.client.get('/admin/profile?seconds=0.1&hz=200', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        self.assertGreater(int(response.headers['X-Profile-Samples']), 0)
+        self.assertIn('QueueListener._monitor', response.get_data(as_text=True))  # the log writer thread
+
+        self.assertEqual(self.client.get('/admin/profile?seconds=10', headers=headers).status_code, 400)
+
+    def test_one_profile_at_a_time(self):
+        """Test that a concurrent profile request is refused"""
+        with _profile_lock:
+            response = self.client.get('/admin/profile?seconds=0.1', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.status_code, 409)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests for push-based change detection
+"""
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from app.monitor import MonitoringService
+from app.push import PushChannelManager
+from app.web.app import create_app
+
+class TestPushChannelManager(unittest.TestCase):
+    """Test suite for PushChannelManager class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.config = {'push_register': False, 'push_token': 'secret'}
+        self.monitor_configs = [
+            {'id': 'a', 'spreadsheet_id': 'sheet-1'},
+            {'id': 'b', 'spreadsheet_id': 'sheet-1'},
+            {'id': 'c', 'spreadsheet_id': 'sheet-2'}
+        ]
+        self.manager = PushChannelManager(self.config, self.monitor_configs)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.manager.stop()
+
+    def test_one_channel_per_spreadsheet(self):
+        """Test that channels are opened per distinct spreadsheet"""
+        self.manager.start()
+        spreadsheets = sorted(c['spreadsheet_id'] for c in self.manager.channels.values())
+        self.assertEqual(spreadsheets, ['sheet-1', 'sheet-2'])
+        self.assertTrue(self.manager.is_live())
+
+    def test_resolve(self):
+        """Test token validation and channel lookup"""
+        self.manager.start()
+        channel_id = next(iter(self.manager.channels))
+        expected = self.manager.channels[channel_id]['spreadsheet_id']
+
+        self.assertEqual(self.manager.resolve(channel_id, 'secret'), expected)
+        self.assertIsNone(self.manager.resolve(channel_id, 'wrong'))
+        self.assertIsNone(self.manager.resolve('unknown', 'secret'))
+        self.assertEqual(self.manager.get_status()['notifications_received'], 1)
+
+    @patch('app.push.build')
+    def test_register_with_drive(self, mock_build):
+        """Test the files.watch request sent to Drive"""
+        mock_watch = mock_build.return_value.files.return_value.watch
+        mock_watch.return_value.execute.return_value = {'resourceId': 'res-1'}
+        manager = PushChannelManager(
+            {'push_token': 'secret', 'push_webhook_url': 'https://example.com/webhooks/drive'},
+            [{'spreadsheet_id': 'sheet-1'}]
+        )
+
+        manager.start()
+        manager.stop()
+
+        kwargs = mock_watch.call_args.kwargs
+        self.assertEqual(kwargs['fileId'], 'sheet-1')
+        self.assertEqual(kwargs['body']['type'], 'web_hook')
+        self.assertEqual(kwargs['body']['address'], 'https://example.com/webhooks/drive')
+        self.assertEqual(kwargs['body']['token'], 'secret')
+        mock_build.return_value.channels.return_value.stop.assert_called_once()
+
+    def test_registration_failure_not_live(self):
+        """Test that push is not live when registration fails"""
+        manager = PushChannelManager({'push_token': 'secret'}, [{'spreadsheet_id': 'sheet-1'}])
+        manager.start()  # no webhook URL configured
+        self.assertFalse(manager.is_live())
+        manager.stop()
+
+class TestPushMonitoring(unittest.TestCase):
+    """Test suite for push handling in MonitoringService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.monitor_patcher = patch('app.monitor.SheetMonitor')
+        mock_monitor_class = self.monitor_patcher.start()
+        mock_monitor_class.side_effect = lambda config, **kwargs: MagicMock(config=config)
+
+        self.config = {
+            'polling_interval': 60,
+            'push_mode': True,
+            'push_register': False,
+            'push_token': 'secret',
+            'push_fallback_interval': 600,
+            'monitors': [
+                {'id': 'a', 'spreadsheet_id': 'sheet-1'},
+                {'id': 'b', 'spreadsheet_id': 'sheet-2'}
+            ]
+        }
+        self.service = MonitoringService(self.config)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        if self.service.is_active:
+            self.service.stop()
+        self.monitor_patcher.stop()
+
+    def _channel_for(self, spreadsheet_id):
+        for channel_id, channel in self.service.push_channels.channels.items():
+            if channel['spreadsheet_id'] == spreadsheet_id:
+                return channel_id
+
+    def test_fallback_interval_while_live(self):
+        """Test that polling slows to the safety-net interval"""
+        self.assertEqual(self.service._poll_interval(), 60)
+        self.service.start()
+        self.assertEqual(self.service._poll_interval(), 600)
+
+    def test_notification_triggers_targeted_check(self):
+        """Test that a change notification checks only the changed spreadsheet"""
+        self.service.start()
+        monitor_a = self.service.monitors['a']
+        monitor_b = self.service.monitors['b']
+        monitor_a.check_cell.reset_mock()
+        monitor_b.check_cell.reset_mock()
+
+        accepted = self.service.handle_push_notification(self._channel_for('sheet-2'), 'secret', 'update')
+
+        self.assertTrue(accepted)
+        deadline = time.time() + 2
+        while not monitor_b.check_cell.called and time.time() < deadline:
+            time.sleep(0.01)
+        monitor_b.check_cell.assert_called_once()
+        monitor_a.check_cell.assert_not_called()
+
+    def test_sync_message_ignored(self):
+        """Test that the channel's initial sync message does not trigger a check"""
+        self.service.start()
+        accepted = self.service.handle_push_notification(self._channel_for('sheet-1'), 'secret', 'sync')
+        self.assertTrue(accepted)
+        self.assertEqual(self.service.pending_changes, set())
+
+    def test_webhook_route(self):
+        """Test the Drive webhook endpoint"""
+        service = MagicMock()
+        service.handle_push_notification.side_effect = lambda channel, token, state: token == 'secret'
+        client = create_app({}, service).test_client()
+
+        ok = client.post('/webhooks/drive', headers={
+            'X-Goog-Channel-ID': 'c1', 'X-Goog-Channel-Token': 'secret', 'X-Goog-Resource-State': 'update'
+        })
+        rejected = client.post('/webhooks/drive', headers={'X-Goog-Channel-Token': 'bad'})
+
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(rejected.status_code, 403)
+        service.handle_push_notification.assert_any_call('c1', 'secret', 'update')
+
+if __name__ == '__main__':
+    unittest.main()
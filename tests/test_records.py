@@ -0,0 +1,133 @@
+"""
+Tests for the records module
+"""
+import gc
+import logging
+import tracemalloc
+import unittest
+from unittest.mock import MagicMock
+from app.clock import VirtualClock
+from app.monitor import SheetMonitor
+from app.records import CheckResult, HistoryBuffer, format_epoch
+from app.web.app import create_app
+
+class FakeClient:
+    """Sheets client returning a settable result without recording calls"""
+
+    def __init__(self):
+        self.result = {'value': '', 'is_new': True}
+
+    def get_cell_value_with_retry(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class FakeNotifier:
+    def send_notification(self, message):
+        return True
+
+class TestCheckResult(unittest.TestCase):
+    """Test suite for CheckResult class"""
+
+    def test_dict_access(self):
+        """Test that results read like the dicts they replace"""
+        ok = CheckResult('ON TIME', True, 1704067200)
+        self.assertEqual(ok['value'], 'ON TIME')
+        self.assertEqual(ok.get('timestamp'), format_epoch(1704067200))
+        self.assertNotIn('error', ok)
+        self.assertIsNone(ok.get('error'))
+
+        failed = CheckResult('', False, 1704067200, 'HTTP error: 503')
+        self.assertIn('error', failed)
+        self.assertEqual(failed['error'], 'HTTP error: 503')
+        with self.assertRaises(KeyError):
+            failed['range']
+
+class TestHistoryBuffer(unittest.TestCase):
+    """Test suite for HistoryBuffer class"""
+
+    def test_ring(self):
+        """Test that the oldest entries are overwritten and reads return tuples"""
+        history = HistoryBuffer(capacity=3)
+        for index in range(5):
+            history.append(1704067200 + index, 'normal' if index % 2 else 'departed', f"value {index}")
+
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0], (format_epoch(1704067202), 'departed', 'value 2'))
+        self.assertEqual(history[-1][2], 'value 4')
+        self.assertEqual([entry[2] for entry in history.recent(2)], ['value 3', 'value 4'])
+        self.assertEqual(len(history.recent(10)), 3)
+        self.assertEqual(list(history), history[:])
+
+    def test_messages_are_shared(self):
+        """Test that repeated messages are stored once"""
+        history = HistoryBuffer(capacity=4)
+        for _ in range(4):
+            history.append(1704067200, 'normal', ''.join(["Current Status: ", "'ON TIME'"]))
+        self.assertEqual(len({id(message) for message in history.messages}), 1)
+
+class TestMonitorMemory(unittest.TestCase):
+    """Test suite for per-monitor memory"""
+
+    def test_memory_per_monitor_is_bounded(self):
+        """Test that a monitor's memory stops growing once its history is full"""
+        clock = VirtualClock(start=1704067200)
+        monitors = [SheetMonitor({'id': f"m{i}", 'history_db': None}, sheets_client=FakeClient(),
+                                 notification_manager=FakeNotifier(), clock=clock) for i in range(20)]
+
+        # Built up front so the fake client's results are not counted as growth
+        results = [{'value': f"ROUTE {step} ON TIME", 'is_new': True} for step in range(7)]
+
+        def run(checks):
+            for step in range(checks):
+                for monitor in monitors:
+                    monitor.sheets_client.result = results[step % 7]
+                    monitor.check_cell()
+                clock.advance(30)
+
+        run(60)  # fill the history
+        logging.disable(logging.INFO)  # captured log records would count as growth
+        tracemalloc.start()
+        try:
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            run(200)
+            gc.collect()
+            growth = (tracemalloc.get_traced_memory()[0] - before) / len(monitors)
+        finally:
+            tracemalloc.stop()
+            logging.disable(logging.NOTSET)
+        self.assertLess(growth, 1024)
+        self.assertEqual(len(monitors[0].status_history), monitors[0].max_history)
+        self.assertTrue(monitors[0].last_check_time.startswith('Last Checked: 2024-01-01'))
+
+class TestMemoryEndpoint(unittest.TestCase):
+    """Test suite for the /admin/memory endpoint"""
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_report(self):
+        """Test the report with and without tracing"""
+        service = MagicMock()
+        service.get_status.return_value = {'monitors': {'a': {}, 'b': {}}}
+        client = create_app({'admin_token': 'secret'}, service).test_client()
+        headers = {'X-Admin-Token': 'secret'}
+
+        report = client.get('/admin/memory', headers=headers).get_json()
+        self.assertFalse(report['tracing'])
+        self.assertEqual(report['monitors'], 2)
+
+        report = client.get('/admin/memory?trace=start&limit=5', headers=headers).get_json()
+        self.assertTrue(report['tracing'])
+        self.assertLessEqual(len(report['top_sites']), 5)
+        self.assertIn('subsystems', report)
+
+        self.assertFalse(client.get('/admin/memory?trace=stop', headers=headers).get_json()['tracing'])
+        self.assertEqual(client.get('/admin/memory').status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Tests for the registry module
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app.monitor import MonitoringService, expand_monitor_configs
+from app.registry import MonitorRegistry, RegistryError, _registries
+from app.web.app import create_app
+
+class TestMonitorRegistry(unittest.TestCase):
+    """Test suite for MonitorRegistry class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'monitors.db')
+        self.registry = MonitorRegistry(self.path)
+        self.registry.apply({'create': [
+            {'id': 'bus', 'spreadsheet_id': 's', 'range_name': 'A1'},
+            {'spreadsheet_id': 's', 'range_name': 'B1', 'notification_topic': 'train'}
+        ]})
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.registry.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_operations(self):
+        """Test update, pause, resume and delete in one batch"""
+        result = self.registry.apply({
+            'update': [{'id': 's/B1', 'range_name': 'B2', 'notification_topic': None}],
+            'pause': ['bus', 's/B1'],
+            'resume': ['s/B1'],
+            'delete': []
+        })
+        self.assertEqual(result['pause'], ['bus', 's/B1'])
+        self.assertEqual(self.registry.monitors(), [
+            {'spreadsheet_id': 's', 'range_name': 'A1', 'id': 'bus', 'paused': True},
+            {'spreadsheet_id': 's', 'range_name': 'B2', 'id': 's/B1'}
+        ])
+
+        self.registry.apply({'delete': ['bus']})
+        self.assertEqual([m['id'] for m in self.registry.monitors()], ['s/B1'])
+
+    def test_invalid_batch_is_not_applied(self):
+        """Test that one bad operation rejects the whole batch"""
+        with self.assertRaises(RegistryError) as context:
+            self.registry.apply({
+                'create': [{'id': 'ferry', 'spreadsheet_id': 's', 'range_name': 'C1'}, {'id': 'bus'}],
+                'delete': ['bus', 'missing']
+            })
+        self.assertEqual([(e['op'], e['index']) for e in context.exception.errors],
+                         [('create', 1), ('delete', 1)])
+        self.assertEqual([m['id'] for m in self.registry.monitors()], ['bus', 's/B1'])
+
+        with self.assertRaises(RegistryError):
+            self.registry.apply({'create': [{'spreadsheet_id': 's', 'range_name': 'D1', 'paused': True}]})
+        with self.assertRaises(RegistryError):
+            self.registry.apply({'rename': []})
+
+    def test_process_settings_rejected(self):
+        """Test that a monitor cannot override process-wide settings such as the API endpoint or file paths"""
+        for override in ({'sheets_api_endpoint': 'http://attacker.example/'}, {'history_db': '/etc/cron.d/x'},
+                         {'service_account_file': '/tmp/key.json'}, {'ntfy_server': 'http://attacker.example'}):
+            with self.assertRaises(RegistryError) as context:
+                self.registry.apply({'create': [dict(override, spreadsheet_id='s', range_name='E1')]})
+            self.assertIn(next(iter(override)), context.exception.errors[0]['message'])
+            with self.assertRaises(RegistryError):
+                self.registry.apply({'update': [dict(override, id='bus')]})
+
+        with self.assertRaises(RegistryError):
+            self.registry.apply({'create': [{'spreadsheet_id': 's', 'range_name': 7}]})
+        with self.assertRaises(RegistryError):
+            self.registry.apply({'create': [{'spreadsheet_id': 's', 'range_name': 'E1', 'holidays': [1]}]})
+        self.registry.apply({'create': [{'spreadsheet_id': 's', 'range_name': 'E1',
+                                         'active_windows': ['mon-fri 06:30-09:00'], 'holidays': '2025-02-17'}]})
+        self.assertEqual([m['id'] for m in self.registry.monitors()], ['bus', 's/B1', 's/E1'])
+
+    def test_stored_process_settings_ignored(self):
+        """Test that disallowed settings already stored in the database are not applied"""
+        self.registry.conn.execute("UPDATE monitors SET spec = ? WHERE id = 'bus'",
+                                   ('{"spreadsheet_id": "s", "range_name": "A1", "sheets_api_endpoint": "http://x/"}',))
+        self.registry.writes += 1
+        self.assertNotIn('sheets_api_endpoint', self.registry.monitors()[0])
+
+    def test_sees_writes_from_other_connections(self):
+        """Test that a write by another process invalidates the cached list"""
+        self.assertEqual(len(self.registry.monitors()), 2)
+        other = MonitorRegistry(self.path)
+        other.apply({'delete': ['bus']})
+        other.close()
+        self.assertEqual([m['id'] for m in self.registry.monitors()], ['s/B1'])
+
+    def test_expand_monitor_configs(self):
+        """Test that registered monitors follow the configured ones"""
+        _registries[self.path] = self.registry
+        try:
+            configs = expand_monitor_configs({'spreadsheet_id': 'x', 'range_name': 'Z1',
+                                              'monitor_registry': self.path})
+        finally:
+            del _registries[self.path]
+        self.assertEqual([c['id'] for c in configs], ['default', 'bus', 's/B1'])
+        self.assertEqual(configs[0]['range_name'], 'Z1')
+        self.assertEqual(configs[2]['notification_topic'], 'train')
+
+class TestMonitorsApi(unittest.TestCase):
+    """Test suite for the /api/monitors endpoint"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.mkdtemp()
+        self.config = {
+            'polling_interval': 30,
+            'spreadsheet_id': 'sheet',
+            'range_name': 'A1',
+            'api_key': 'key',
+            'admin_token': 'secret',
+            'monitor_registry': os.path.join(self.tmpdir, 'monitors.db')
+        }
+        self.service = MonitoringService(self.config)
+        self.client = create_app(self.config, self.service).test_client()
+        self.headers = {'X-Admin-Token': 'secret'}
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        for monitor in self.service.monitors.values():
+            monitor.sheets_client.close()
+        _registries.pop(self.config['monitor_registry']).close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_requires_admin_token(self):
+        """Test that listing and changing monitors need the admin token, and are off without one"""
+        batch = {'create': [{'id': 'bus', 'spreadsheet_id': 'sheet', 'range_name': 'B1'}]}
+        self.assertEqual(self.client.get('/api/monitors').status_code, 403)
+        self.assertEqual(self.client.post('/api/monitors', json=batch).status_code, 403)
+        wrong = {'X-Admin-Token': 'guess'}
+        self.assertEqual(self.client.post('/api/monitors', headers=wrong, json=batch).status_code, 403)
+        self.assertEqual(list(self.service.monitors), ['default'])
+
+        disabled = create_app(dict(self.config, admin_token=None), self.service).test_client()
+        self.assertEqual(disabled.post('/api/monitors', json=batch).status_code, 404)
+        self.assertEqual(list(self.service.monitors), ['default'])
+
+        response = self.client.post('/api/monitors', headers=self.headers, json=batch)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['applied']['added'], ['bus'])
+        self.assertEqual(self.client.get('/api/monitors', headers=self.headers).get_json()['count'], 1)
+
+    def test_bulk_onboarding(self):
+        """Test that 500 routes are registered and running within a second"""
+        routes = [{'id': f"route-{i}", 'spreadsheet_id': 'district', 'range_name': f"Routes!B{i}"}
+                  for i in range(500)]
+        started = time.perf_counter()
+        response = self.client.post('/api/monitors', headers=self.headers, json={'create': routes})
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['applied']['added']), 500)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(len(self.service.monitors), 501)
+        self.assertEqual(self.client.get('/api/monitors', headers=self.headers).get_json()['count'], 500)
+
+    def test_pause_keeps_monitor_but_skips_checks(self):
+        """Test that paused monitors stay registered and are not checked"""
+        self.client.post('/api/monitors', headers=self.headers, json={'create': [
+            {'id': 'bus', 'spreadsheet_id': 'sheet', 'range_name': 'B1'}]})
+        monitor = self.service.monitors['bus']
+        response = self.client.post('/api/monitors', headers=self.headers, json={'pause': ['bus']})
+        self.assertEqual(response.get_json()['applied']['changed'], ['bus'])
+        self.assertIs(self.service.monitors['bus'], monitor)
+        self.assertTrue(self.service.get_status()['monitors']['bus']['paused'])
+
+        monitor.check_cell = lambda: self.fail("Paused monitor was checked")
+        self.service.monitors['default'].check_cell = lambda: False
+        self.service.check_now()
+
+    def test_rejected_batch(self):
+        """Test that an invalid batch returns every error and changes nothing"""
+        response = self.client.post('/api/monitors', headers=self.headers, json={'create': [{'id': 'x'}], 'delete': ['y']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.get_json()['errors']), 2)
+        self.assertEqual(list(self.service.monitors), ['default'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the web routes
+"""
+import gzip
+import unittest
+from unittest.mock import MagicMock
+from app.web.app import create_app
+
+class TestPageCache(unittest.TestCase):
+    """Test suite for cached page rendering"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.service = MagicMock()
+        self.service.get_state_version.return_value = 1
+        self.service.get_status.return_value = {
+            'is_active': True,
+            'last_result': "Current Status: 'ON TIME'",
+            'last_check_time': 'Last Checked: 2024-01-01 07:00:00',
+            'history': [('2024-01-01 07:00:00', 'normal', "Current Status: 'ON TIME'")]
+        }
+
+    def test_production_mode(self):
+        """Test that production mode turns off template reloading"""
+        self.assertTrue(create_app({}, self.service).config['TEMPLATES_AUTO_RELOAD'])
+        self.assertFalse(create_app({'production_mode': True}, self.service).config['TEMPLATES_AUTO_RELOAD'])
+
+    def test_served_from_cache_until_state_changes(self):
+        """Test that pages are rendered once per state version"""
+        client = create_app({'production_mode': True}, self.service).test_client()
+
+        first = client.get('/')
+        second = client.get('/')
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertIn(b'ON TIME', first.get_data())
+        self.assertEqual(self.service.get_status.call_count, 1)
+
+        self.service.get_state_version.return_value = 2
+        client.get('/')
+        client.get('/history')
+        client.get('/history')
+        self.assertEqual(self.service.get_status.call_count, 3)
+
+    def test_cached_gzip(self):
+        """Test that compressed pages are cached alongside the plain ones"""
+        client = create_app({'production_mode': True}, self.service).test_client()
+        plain = client.get('/')
+        compressed = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.get_data()), plain.get_data())
+        self.assertNotEqual(compressed.headers['ETag'], plain.headers['ETag'])
+        self.assertEqual(self.service.get_status.call_count, 1)
+
+    def test_not_modified(self):
+        """Test that a client holding the current version gets a 304"""
+        client = create_app({'production_mode': True}, self.service).test_client()
+        etag = client.get('/').headers['ETag']
+
+        self.assertEqual(client.get('/', headers={'If-None-Match': etag}).status_code, 304)
+        self.service.get_state_version.return_value = 2
+        self.assertEqual(client.get('/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_development_mode_not_cached(self):
+        """Test that pages are rendered on every request outside production mode"""
+        client = create_app({}, self.service).test_client()
+        client.get('/')
+        client.get('/')
+        self.assertEqual(self.service.get_status.call_count, 2)
+        self.service.get_state_version.assert_not_called()
+
+    def test_poller_unavailable(self):
+        """Test that pages are rendered when the version is unknown"""
+        self.service.get_state_version.return_value = None
+        client = create_app({'production_mode': True}, self.service).test_client()
+        client.get('/')
+        client.get('/')
+        self.assertEqual(self.service.get_status.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for the schedule module
+"""
+import unittest
+from datetime import datetime
+from app.clock import VirtualClock
+from app.monitor import MonitoringService, SheetMonitor
+from app.schedule import PollingSchedule, compile_schedule, parse_window
+
+def at(text):
+    return datetime.fromisoformat(text).timestamp()
+
+class TestPollingSchedule(unittest.TestCase):
+    """Test suite for PollingSchedule class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        # 2024-01-01 is a Monday
+        self.schedule = PollingSchedule(['mon-fri 06:30-09:00', 'mon-fri 08:00-09:30', 'mon-fri 14:30-16:30'],
+                                        holidays=['2024-01-03', '2024-01-15..2024-02-02'])
+
+    def test_parse_window(self):
+        """Test day fields, overnight windows and errors"""
+        self.assertEqual(parse_window('fri-mon 22:00-02:00')[0], {4, 5, 6, 0})
+        self.assertEqual(parse_window('12:00-13:00')[0], set(range(7)))
+        self.assertEqual(parse_window({'days': 'sat,sun', 'start': '10:00', 'end': '24:00'})[2], None)
+        with self.assertRaises(ValueError):
+            parse_window('weekdays 06:30-09:00')
+        with self.assertRaises(ValueError):
+            parse_window('mon-fri 6.30-9')
+
+    def test_is_active(self):
+        """Test window bounds, merged overlaps, weekends and holidays"""
+        self.assertFalse(self.schedule.is_active(at('2024-01-01T06:29:59')))
+        self.assertTrue(self.schedule.is_active(at('2024-01-01T06:30:00')))
+        self.assertTrue(self.schedule.is_active(at('2024-01-01T09:15:00')))  # merged with 08:00-09:30
+        self.assertFalse(self.schedule.is_active(at('2024-01-01T09:30:00')))
+        self.assertFalse(self.schedule.is_active(at('2024-01-03T07:00:00')))  # holiday
+        self.assertFalse(self.schedule.is_active(at('2024-01-06T07:00:00')))  # Saturday
+        self.assertEqual(self.schedule.window_end(at('2024-01-01T07:00:00')), at('2024-01-01T09:30:00'))
+
+    def test_next_open(self):
+        """Test finding the next window across days, weekends and a holiday past the horizon"""
+        self.assertEqual(self.schedule.next_open(at('2024-01-01T10:00:00')), at('2024-01-01T14:30:00'))
+        self.assertEqual(self.schedule.next_open(at('2024-01-02T17:00:00')), at('2024-01-04T06:30:00'))
+        self.assertEqual(self.schedule.next_open(at('2024-01-05T17:00:00')), at('2024-01-08T06:30:00'))
+        self.assertEqual(self.schedule.next_open(at('2024-01-12T17:00:00')), at('2024-02-05T06:30:00'))
+        moment = at('2024-01-01T07:00:00')
+        self.assertEqual(self.schedule.next_open(moment), moment)
+
+    def test_overnight_window(self):
+        """Test a window running past midnight, including across a recompiled horizon"""
+        schedule = PollingSchedule(['fri 22:00-02:00'])
+        self.assertTrue(schedule.is_active(at('2024-01-05T23:00:00')))
+        self.assertTrue(schedule.is_active(at('2024-01-06T01:59:00')))
+        self.assertFalse(schedule.is_active(at('2024-01-06T02:00:00')))
+        self.assertTrue(schedule.is_active(at('2024-01-20T01:00:00')))  # compiled from the Saturday
+
+    def test_compile_schedule(self):
+        """Test building a schedule from configuration"""
+        self.assertIsNone(compile_schedule({}))
+        self.assertIsNone(compile_schedule({'active_windows': 'never 1-2'}))
+        schedule = compile_schedule({'active_windows': 'sat,sun 10:00-12:00; mon 08:00-09:00',
+                                     'holidays': '2024-01-06'})
+        self.assertTrue(schedule.is_active(at('2024-01-07T11:00:00')))
+        self.assertFalse(schedule.is_active(at('2024-01-06T11:00:00')))
+
+class FakeClient:
+    """Sheets client recording when it was asked to fetch and to prewarm"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.fetches = []
+        self.prewarms = []
+
+    def get_cell_value_with_retry(self):
+        self.fetches.append(self.clock.time())
+        return {'value': 'ON TIME', 'is_new': not self.fetches[:-1]}
+
+    def prewarm(self):
+        self.prewarms.append(self.clock.time())
+
+    def close(self):
+        pass
+
+class FakeNotifier:
+    def send_notification(self, message):
+        return True
+
+class TestScheduledPolling(unittest.TestCase):
+    """Test suite for polling windows in MonitoringService"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = VirtualClock(start=at('2024-01-01T00:00:00'))
+        self.clients = {}
+
+        def create_monitor(config):
+            client = self.clients[config['id']] = FakeClient(self.clock)
+            return SheetMonitor(config, sheets_client=client, notification_manager=FakeNotifier(),
+                                clock=self.clock)
+
+        config = {'polling_interval': 60, 'prewarm_seconds': 30, 'history_db': None, 'monitor_registry': None,
+                  'monitors': [{'id': 'school', 'active_windows': ['mon-fri 06:30-09:00', 'mon-fri 14:30-16:30']},
+                               {'id': 'evening', 'active_windows': 'mon-fri 18:00-18:30'}]}
+        self.service = MonitoringService(config, clock=self.clock, monitor_factory=create_monitor)
+
+    def run_until(self, text):
+        self.service._check_all()
+        self.service._reset_schedule()
+        end = at(text)
+        while self.clock.time() < end:
+            self.service._tick()
+
+    def test_polls_only_in_windows(self):
+        """Test that the loop sleeps between windows and prewarms before they open"""
+        self.run_until('2024-01-02T00:00:00')  # the last sleep runs to Tuesday's first prewarm
+
+        school = self.clients['school']
+        self.assertEqual(school.fetches[0], at('2024-01-01T06:30:00'))
+        self.assertTrue(all(self.service.monitors['school'].schedule.is_active(t) for t in school.fetches))
+        self.assertEqual(len(school.fetches), 150 + 120)
+        self.assertEqual(school.prewarms, [at('2024-01-01T06:29:30'), at('2024-01-01T14:29:30'),
+                                           at('2024-01-02T06:29:30')])
+        self.assertEqual(len(self.clients['evening'].fetches), 30)
+        self.assertEqual(self.clients['evening'].prewarms, [at('2024-01-01T17:59:30')])
+
+        window = self.service.get_status()['monitors']['school']['window']
+        self.assertEqual(window, {'active': False, 'until': at('2024-01-02T06:30:00')})
+
+    def test_check_now_ignores_windows(self):
+        """Test that a manual check polls monitors outside their windows"""
+        self.service._check_all()
+        self.assertEqual(self.clients['school'].fetches, [])
+        self.service.check_now()
+        self.assertEqual(len(self.clients['school'].fetches), 1)
+
+if __name__ == '__main__':
+    unittest.main()
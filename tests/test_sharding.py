@@ -0,0 +1,171 @@
+"""
+Tests for the sharded monitoring service
+"""
+import multiprocessing
+import os
+import queue
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from app.monitor import expand_monitor_configs
+from app.sharding import HashRing, ShardedMonitoringService, _Shard, _shard_main
+
+class TestHashRing(unittest.TestCase):
+    """Test suite for HashRing class"""
+
+    def test_all_shards_used(self):
+        """Test that keys spread over every shard"""
+        ring = HashRing(range(4))
+        owners = {ring.get_node(f"monitor-{i}") for i in range(1000)}
+        self.assertEqual(owners, {0, 1, 2, 3})
+
+    def test_minimal_movement(self):
+        """Test that adding a shard moves only a fraction of keys"""
+        keys = [f"monitor-{i}" for i in range(1000)]
+        before = HashRing(range(4))
+        after = HashRing(range(5))
+        moved = sum(1 for key in keys if before.get_node(key) != after.get_node(key))
+
+        # Ideal is 1/5 of the keys; a modulo scheme would move ~4/5
+        self.assertLess(moved, 350)
+        for key in keys:
+            if before.get_node(key) != after.get_node(key):
+                self.assertEqual(after.get_node(key), 4)
+
+class TestExpandMonitorConfigs(unittest.TestCase):
+    """Test suite for expand_monitor_configs"""
+
+    def test_single_monitor(self):
+        """Test that a plain config yields the default monitor"""
+        configs = expand_monitor_configs({'spreadsheet_id': 's', 'range_name': 'A1'})
+        self.assertEqual(len(configs), 1)
+        self.assertEqual(configs[0]['id'], 'default')
+
+    def test_monitor_list(self):
+        """Test that monitor entries override top-level settings"""
+        configs = expand_monitor_configs({
+            'spreadsheet_id': 's',
+            'polling_interval': 30,
+            'monitors': [{'id': 'a', 'range_name': 'A1'}, {'range_name': 'B2'}]
+        })
+        self.assertEqual([c['id'] for c in configs], ['a', 's/B2'])
+        self.assertEqual(configs[1]['polling_interval'], 30)
+        self.assertNotIn('monitors', configs[0])
+
+class TestShardedMonitoringService(unittest.TestCase):
+    """Test suite for ShardedMonitoringService class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.config = {
+            'spreadsheet_id': 's',
+            'shard_status_interval': 0.05,
+            'shard_restart_backoff': 0,
+            'monitors': [{'id': f"monitor-{i}", 'range_name': f"A{i}"} for i in range(20)]
+        }
+        self.spawn_patcher = patch.object(ShardedMonitoringService, '_spawn_shard', autospec=True,
+                                          side_effect=self._fake_spawn)
+        self.spawn_patcher.start()
+        self.spawned = []
+        self.service = ShardedMonitoringService(self.config, 3)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        if self.service.is_active:
+            self.service.stop()
+        self.spawn_patcher.stop()
+
+    def _fake_spawn(self, service, index, monitor_ids):
+        process = MagicMock()
+        process.is_alive.return_value = True
+        shard = _Shard(index, monitor_ids, process, MagicMock())
+        self.spawned.append(shard)
+        return shard
+
+    def test_every_monitor_assigned_once(self):
+        """Test that monitors are partitioned across shards"""
+        assignments = self.service.assignments()
+        assigned = [m for ids in assignments.values() for m in ids]
+        self.assertEqual(sorted(assigned), sorted(self.service.monitor_configs))
+
+    def test_resize_restarts_changed_shards_only(self):
+        """Test that rebalancing keeps shards whose monitors did not move"""
+        self.service.start()
+        before = dict(self.service.shards)
+
+        restarted = self.service.resize(4)
+
+        for index, shard in self.service.shards.items():
+            if index not in restarted:
+                self.assertIs(shard, before[index])
+        self.assertIn(3, self.service.shards)
+
+    def test_dead_shard_restarted(self):
+        """Test that the supervisor respawns a dead shard"""
+        self.service.start()
+        index, shard = next(iter(self.service.shards.items()))
+        shard.process.is_alive.return_value = False
+
+        self.service.stop_event.wait(0.3)
+
+        replacement = self.service.shards[index]
+        self.assertIsNot(replacement, shard)
+        self.assertEqual(replacement.monitor_ids, shard.monitor_ids)
+        self.assertEqual(replacement.restarts, 1)
+
+    def test_status_aggregated(self):
+        """Test that shard snapshots merge into one status"""
+        self.service.start()
+        self.service.shard_status = {
+            0: {'monitors': {'a': {'last_result': 'old', 'last_check_time': 'Last Checked: 2023-01-01 12:00:00',
+                                   'history': [('2023-01-01 12:00:00', 'normal', 'old')]}}},
+            1: {'monitors': {'b': {'last_result': 'new', 'last_check_time': 'Last Checked: 2023-01-01 12:05:00',
+                                   'history': [('2023-01-01 12:05:00', 'normal', 'new')]}}}
+        }
+
+        status = self.service.get_status()
+
+        self.assertTrue(status['is_active'])
+        self.assertEqual(status['last_result'], 'new')
+        self.assertEqual(set(status['monitors']), {'a', 'b'})
+        self.assertEqual(len(status['history']), 2)
+        self.assertEqual(len(status['shards']), len(self.service.shards))
+
+    def test_timing_fields_do_not_change_state_version(self):
+        """Test that reports differing only in heartbeats and next_poll keep the cached pages valid"""
+        self.service.status_queue = queue.Queue()
+        self.service.start()
+
+        def report(heartbeat, result='ON TIME'):
+            self.service.status_queue.put((0, {
+                'is_active': True, 'next_poll': heartbeat + 30, 'watchdog': {'heartbeat': heartbeat},
+                'monitors': {'a': {'last_result': result, 'last_check_time': 'Last Checked: 2023-01-01 12:00:00',
+                                   'history': [], 'heartbeat': heartbeat}}
+            }))
+            return self.service.get_state_version()
+
+        version = report(1)
+        self.assertEqual(report(2), version)
+        self.assertEqual(self.service.shard_status[0]['monitors']['a']['heartbeat'], 2)
+        self.assertNotEqual(report(3, result='*** DEPARTED ***'), version)
+
+class TestShardProcess(unittest.TestCase):
+    """Test suite for the shard process entry point"""
+
+    def test_shard_writes_own_log_file(self):
+        """Test that a spawned shard logs to its own file, not the shared app.log"""
+        context = multiprocessing.get_context('spawn')
+        commands, statuses = context.Queue(), context.Queue()
+        commands.put('stop')
+        config = {'monitors': [], 'history_db': None, 'monitor_registry': None}
+        with tempfile.TemporaryDirectory() as log_dir, patch.dict(os.environ, {'LOG_DIR': log_dir}):
+            process = context.Process(target=_shard_main, args=(3, config, commands, statuses, 0.05))
+            process.start()
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+            self.assertEqual(os.listdir(log_dir), ['app-shard-3.log'])
+            with open(os.path.join(log_dir, 'app-shard-3.log')) as f:
+                self.assertIn("Starting monitoring service", f.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
 """
 Tests for the Google Sheets client module
 """
+import socket
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
-from app.sheets_client import SheetsClient
+from app.sheets_client import SheetsClient, reset_shared_services
+from benchmarks.fake_sheets_server import FakeSheetsServer
 
 class TestSheetsClient(unittest.TestCase):
     """Test suite for SheetsClient class"""
@@ -15,8 +19,13 @@ class TestSheetsClient(unittest.TestCase):
             'spreadsheet_id': 'test_spreadsheet_id',
             'range_name': 'test_range'
         }
+        reset_shared_services()
         self.client = SheetsClient(self.config)
     
+    def tearDown(self):
+        """Tear down test fixtures"""
+        reset_shared_services()
+    
     @patch('app.sheets_client.build')
     def test_get_service(self, mock_build):
         """Test that get_service returns a service object"""
@@ -70,6 +79,34 @@ class TestSheetsClient(unittest.TestCase):
         self.assertEqual(result['value'], 'DEPARTED')
         self.assertFalse(result['is_new'])
     
+    @patch('app.sheets_client.build')
+    def test_service_shared(self, mock_build):
+        """Test that clients with the same key share one service and resource"""
+        mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+        other = SheetsClient(dict(self.config, range_name='other_range'))
+        different_key = SheetsClient(dict(self.config, api_key='other_key'))
+
+        for client in (self.client, other, different_key):
+            client._load_range(client.config['range_name'])
+
+        self.assertIs(self.client.get_service(), other.get_service())
+        self.assertIs(self.client.values_api, other.values_api)
+        self.assertIsNot(self.client.get_service(), different_key.get_service())
+        self.assertEqual(mock_build.call_count, 2)
+        self.client.values_api.get.assert_any_call(spreadsheetId='test_spreadsheet_id', range='other_range',
+                                                   fields='values', valueRenderOption='FORMATTED_VALUE',
+                                                   majorDimension='ROWS')
+    
+    @patch('app.sheets_client.build')
+    def test_api_endpoint(self, mock_build):
+        """Test that an alternate API endpoint is passed to the client library"""
+        client = SheetsClient(dict(self.config, sheets_api_endpoint='http://127.0.0.1:8099/'))
+        client.get_service()
+        mock_build.assert_called_once_with(
+            'sheets', 'v4', developerKey='test_api_key',
+            client_options={'api_endpoint': 'http://127.0.0.1:8099/'}
+        )
+    
     @patch('app.sheets_client.SheetsClient.get_service')
     def test_get_cell_value_error(self, mock_get_service):
         """Test error handling in get_cell_value"""
@@ -84,5 +121,56 @@ class TestSheetsClient(unittest.TestCase):
         self.assertEqual(result['value'], '')
         self.assertFalse(result['is_new'])
 
+    def test_fetch_timeout(self):
+        """Test that a server that never answers fails the check within fetch_timeout"""
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(5)
+        accepted = []
+        threading.Thread(target=lambda: accepted.append(server.accept()), daemon=True).start()
+        client = SheetsClient(dict(self.config, fetch_timeout=0.5,
+                                   sheets_api_endpoint=f"http://127.0.0.1:{server.getsockname()[1]}/"))
+        try:
+            started = time.monotonic()
+            result = client.get_cell_value()
+            self.assertLess(time.monotonic() - started, 3)
+            self.assertIn('timed out', result['error'])
+        finally:
+            server.close()
+            for connection, _ in accepted:
+                connection.close()
+
+    def test_minimal_payload(self):
+        """Test that a cell is fetched masked and compressed and the transfer is recorded"""
+        server = FakeSheetsServer(port=0).start()
+        try:
+            client = SheetsClient(dict(self.config, range_name='Sheet1!B7', sheets_api_endpoint=server.url))
+            result = client.get_cell_value()
+            self.assertEqual(result['value'], 'ON TIME')
+            self.assertEqual(server.get_stats()['cells_served'], 1)
+            self.assertEqual(server.last_query['fields'], ['values'])
+
+            transfer = client.last_transfer
+            self.assertGreater(transfer['bytes_received'], transfer['bytes_decoded'])  # headers included
+            self.assertEqual(transfer['bytes_decoded'], len(b'{"values": [["ON TIME"]]}'))
+            self.assertGreater(transfer['bytes_sent'], 0)
+            self.assertGreaterEqual(transfer['parse_seconds'], 0)
+            self.assertGreaterEqual(client.fetcher.get_stats()['bytes_received'], transfer['bytes_received'])
+        finally:
+            server.stop()
+
+    @patch('app.sheets_client.SheetsClient.get_service')
+    def test_configured_range_requested(self, mock_get_service):
+        """Test that a multi-cell range is requested as configured and an empty first row reads as ''"""
+        client = SheetsClient(dict(self.config, range_name='Sheet1!A1:B2'))
+        values_api = mock_get_service.return_value.spreadsheets.return_value.values.return_value
+        values_api.get.return_value.execute.return_value = {'values': [[], ['LATER ROW']]}
+
+        result = client.get_cell_value()
+
+        self.assertEqual(values_api.get.call_args[1]['range'], 'Sheet1!A1:B2')
+        self.assertEqual(result['value'], '')
+        self.assertNotIn('error', result)
+
 if __name__ == '__main__':
     unittest.main()
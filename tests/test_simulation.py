@@ -0,0 +1,109 @@
+"""
+Tests for the virtual clock and replay simulator
+"""
+import os
+import tempfile
+import threading
+import unittest
+from app.clock import VirtualClock
+from app.simulation import Timeline, load_timeline_csv, run_scenario, synthetic_timeline
+
+class TestVirtualClock(unittest.TestCase):
+    """Test suite for VirtualClock class"""
+
+    def test_wait_advances_time(self):
+        """Test that waiting jumps forward instead of blocking"""
+        clock = VirtualClock(start=1000)
+        event = threading.Event()
+
+        self.assertFalse(clock.wait(event, 30))
+        self.assertEqual(clock.monotonic(), 30)
+        self.assertEqual(clock.time(), 1030)
+
+    def test_wait_returns_immediately_when_set(self):
+        """Test that a set event does not advance time"""
+        clock = VirtualClock(start=0)
+        event = threading.Event()
+        event.set()
+        self.assertTrue(clock.wait(event, 30))
+        self.assertEqual(clock.monotonic(), 0)
+
+class TestTimeline(unittest.TestCase):
+    """Test suite for Timeline class"""
+
+    def test_value_at(self):
+        """Test value lookup between points"""
+        timeline = Timeline([[100, 'DEPARTED'], [200, 'ON TIME']])
+        self.assertEqual(timeline.value_at(0), 'ON TIME')
+        self.assertEqual(timeline.value_at(150), 'DEPARTED')
+        self.assertEqual(timeline.value_at(200), 'ON TIME')
+        self.assertEqual(timeline.changes(150), [1])
+
+    def test_csv_with_timestamps(self):
+        """Test loading a recorded timeline with ISO timestamps"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("time,value\n2024-01-01T07:00:00,ON TIME\n2024-01-01T07:32:00,DEPARTED\n")
+        try:
+            timeline = load_timeline_csv(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(timeline.times, [0.0, 1920.0])
+        self.assertEqual(timeline.value_at(2000), 'DEPARTED')
+
+    def test_synthetic_reproducible(self):
+        """Test that a seed reproduces the same synthetic timeline"""
+        first = synthetic_timeline(86400 * 3, changes_per_day=5, seed=4)
+        second = synthetic_timeline(86400 * 3, changes_per_day=5, seed=4)
+        self.assertEqual(first.times, second.times)
+        self.assertGreater(len(first.changes(86400 * 3)), 0)
+
+class TestSimulation(unittest.TestCase):
+    """Test suite for run_scenario"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scenario = {
+            'name': 'scripted',
+            'duration': 3600,
+            'config': {'polling_interval': 60},
+            'monitors': [{'id': 'bus', 'timeline': [[100, 'DEPARTED'], [1000, 'ON TIME']]}]
+        }
+
+    def test_detection_latency(self):
+        """Test latency, API calls and notifications for a scripted timeline"""
+        report = run_scenario(self.scenario)
+
+        self.assertEqual(report['changes'], 2)
+        self.assertEqual(report['detected'], 2)
+        self.assertEqual(report['departures'], 1)
+        self.assertEqual(report['notifications'], 1)
+        self.assertEqual(report['api_calls'], 61)  # t=0 and every 60s through t=3600
+        # Checks at 120s and 1020s observe the changes made at 100s and 1000s
+        self.assertEqual(report['detection_latency_seconds']['max'], 20.0)
+        self.assertEqual(report['alert_latency_seconds']['p50'], 20.0)
+
+    def test_missed_change(self):
+        """Test that a change reverted between polls is reported as missed"""
+        self.scenario['monitors'][0]['timeline'] = [[100, 'DEPARTED'], [110, 'ON TIME']]
+        report = run_scenario(self.scenario)
+        self.assertEqual(report['missed'], 1)
+        self.assertEqual(report['notifications'], 0)
+
+    def test_override_compares_intervals(self):
+        """Test that overrides change the simulated configuration"""
+        fast = run_scenario(self.scenario, {'polling_interval': 10})
+        slow = run_scenario(self.scenario)
+        self.assertLess(fast['detection_latency_seconds']['max'], slow['detection_latency_seconds']['max'])
+        self.assertGreater(fast['api_calls'], slow['api_calls'])
+
+    def test_deterministic(self):
+        """Test that repeated runs produce identical reports"""
+        scenario = {'days': 2, 'error_rate': 0.1, 'monitors': [{'id': 'a', 'synthetic': {'seed': 2}}]}
+        first = run_scenario(scenario)
+        second = run_scenario(scenario)
+        first.pop('wall_seconds')
+        second.pop('wall_seconds')
+        self.assertEqual(first, second)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,8 @@
 from app.config import load_config, setup_logging
-from app.monitor import MonitoringService
+from app.service import create_monitoring_service
 from app.web.app import create_app
 
 logger = setup_logging()
 config = load_config()
-monitoring_service = MonitoringService(config)
-app = create_app(config, monitoring_service)
\ No newline at end of file
+monitoring_service = create_monitoring_service(config)
+app = create_app(config, monitoring_service)